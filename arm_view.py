@@ -0,0 +1,150 @@
+import bisect
+import tkinter as tk
+from tkinter import ttk
+
+
+class ArmView:
+    """Arm 패널을 columns개씩 한 줄로 배치하는 세로 스크롤 영역
+
+    Arm 수가 많아도 화면에 보이는 줄(과 위아래 margin_rows줄)의 패널만 만들고, 화면에서
+    멀어진 줄은 없앤다. 패널은 build_arm(parent, arm_index)가 만들고 없앨 때는
+    release_arm(arm_index)를 호출하므로, 상태는 패널 밖(시뮬레이터의 상태 저장소)에
+    있어야 한다. 아직 만들지 않은 줄의 높이는 마지막으로 측정한 줄의 높이로 추정한다.
+    메인 스레드에서만 사용한다.
+    """
+
+    DEFAULT_ROW_HEIGHT = 400  # 줄 높이를 측정하기 전의 추정값 (픽셀)
+
+    def __init__(self, parent, num_arms, build_arm, release_arm=None, columns=4, margin_rows=1):
+        self.num_arms = num_arms
+        self.build_arm = build_arm
+        self.release_arm = release_arm
+        self.columns = columns
+        self.margin_rows = margin_rows
+
+        self.row_count = (num_arms + columns - 1) // columns
+        self.row_heights = [None] * self.row_count  # 측정한 줄 높이 (만든 적 없으면 None)
+        self.estimated_height = self.DEFAULT_ROW_HEIGHT
+        self.row_offsets = [0] * (self.row_count + 1)  # 줄의 시작 y (마지막은 전체 높이)
+        self.rows = {}  # row -> (줄 프레임, 캔버스 window 항목)
+        self.width = 1
+        self._update_pending = False
+
+        self.frame = ttk.Frame(parent)
+        self.canvas = tk.Canvas(self.frame, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.config(yscrollcommand=self.on_view_changed)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.canvas.bind('<Configure>', self.on_canvas_configure)
+        # 마우스가 영역 안에 있을 때만 휠로 스크롤
+        self.frame.bind('<Enter>', self.bind_wheel)
+        self.frame.bind('<Leave>', self.unbind_wheel)
+
+        self.layout()
+
+    # ------------------------------------------------------------ 배치
+
+    def layout(self):
+        """줄 위치와 스크롤 영역 다시 계산 (줄 높이가 바뀐 경우)"""
+        offset = 0
+        for row in range(self.row_count):
+            self.row_offsets[row] = offset
+            height = self.row_heights[row]
+            offset += height if height is not None else self.estimated_height
+        self.row_offsets[self.row_count] = offset
+
+        for row, (_, item) in self.rows.items():
+            self.canvas.coords(item, 0, self.row_offsets[row])
+        self.canvas.config(scrollregion=(0, 0, self.width, offset))
+
+    def visible_rows(self):
+        """화면에 보이는 줄 범위 [first, last)"""
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first = max(bisect.bisect_right(self.row_offsets, top) - 1, 0)
+        last = min(bisect.bisect_left(self.row_offsets, bottom), self.row_count)
+        return first, max(last, first + 1)
+
+    def update_rows(self):
+        """보이는 줄의 패널을 만들고 멀어진 줄의 패널을 없앰"""
+        self._update_pending = False
+        if not self.row_count:
+            return
+        first, last = self.visible_rows()
+        keep_first = max(first - self.margin_rows, 0)
+        keep_last = min(last + self.margin_rows, self.row_count)
+
+        for row in [row for row in self.rows if not keep_first <= row < keep_last]:
+            self.destroy_row(row)
+        for row in range(keep_first, keep_last):
+            if row not in self.rows:
+                self.create_row(row)
+
+    def schedule_update(self):
+        if not self._update_pending:
+            self._update_pending = True
+            self.frame.after_idle(self.update_rows)
+
+    def create_row(self, row):
+        row_frame = ttk.Frame(self.canvas)
+        for column in range(self.columns):
+            row_frame.grid_columnconfigure(column, weight=1, uniform='arm')
+        start = row * self.columns
+        for arm_index in range(start, min(start + self.columns, self.num_arms)):
+            arm_frame = self.build_arm(row_frame, arm_index)
+            arm_frame.grid(row=0, column=arm_index - start, padx=5, pady=5, sticky='nsew')
+
+        item = self.canvas.create_window(0, self.row_offsets[row], window=row_frame, anchor='nw', width=self.width)
+        self.rows[row] = (row_frame, item)
+        row_frame.bind('<Configure>', lambda event, r=row: self.on_row_configure(r, event.height))
+
+    def destroy_row(self, row):
+        row_frame, item = self.rows.pop(row)
+        self.canvas.delete(item)
+        row_frame.destroy()
+        if self.release_arm:
+            start = row * self.columns
+            for arm_index in range(start, min(start + self.columns, self.num_arms)):
+                self.release_arm(arm_index)
+
+    # ------------------------------------------------------------ 이벤트
+
+    def on_row_configure(self, row, height):
+        if self.row_heights[row] != height:
+            self.row_heights[row] = height
+            self.estimated_height = height
+            self.layout()
+            self.schedule_update()
+
+    def on_canvas_configure(self, event):
+        self.width = event.width
+        for _, item in self.rows.values():
+            self.canvas.itemconfigure(item, width=event.width)
+        self.layout()
+        self.schedule_update()
+
+    def on_view_changed(self, first, last):
+        self.scrollbar.set(first, last)
+        self.schedule_update()
+
+    def on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.canvas.yview_scroll(-1, 'units')
+        else:
+            self.canvas.yview_scroll(1, 'units')
+
+    def bind_wheel(self, _event):
+        self.canvas.bind_all('<MouseWheel>', self.on_wheel)
+        self.canvas.bind_all('<Button-4>', self.on_wheel)
+        self.canvas.bind_all('<Button-5>', self.on_wheel)
+
+    def unbind_wheel(self, event):
+        # 자식 위젯(Arm 패널)으로 들어간 경우에도 Leave가 오므로 포인터 위치로 확인
+        widget = self.frame.winfo_containing(event.x_root, event.y_root)
+        if widget is not None and str(widget).startswith(str(self.frame)):
+            return
+        self.canvas.unbind_all('<MouseWheel>')
+        self.canvas.unbind_all('<Button-4>')
+        self.canvas.unbind_all('<Button-5>')
@@ -0,0 +1,392 @@
+"""시뮬레이터 송수신 경로 벤치마크
+
+loopback에서 시뮬레이터 서버와 테스트용 클라이언트를 띄워 인코딩, 프레이밍, 송신,
+수신 단계별 처리량(messages/s, bytes/s)과 지연(p50/p99/p99.9)을 측정한다.
+결과는 JSON으로 저장하고 --compare로 이전 결과와 비교할 수 있다.
+
+    python bench.py --output bench_results.json
+    python bench.py --quick --compare bench_results.json
+    python bench.py --transports  # TCP(Nagle/NODELAY/quick-ack)와 Unix 도메인 소켓 지연 비교
+"""
+import argparse
+import json
+import platform
+import random
+import socket
+import subprocess
+import threading
+import time
+
+from framing import FrameDecoder, create_message_with_header, send_frames
+from scheduler import sleep_until
+from simulator import Simulator
+from transport import HAS_QUICKACK, HAS_UNIX, SocketTransport
+
+MESSAGE_SIZES = [64, 512, 4096, 65536]  # payload 크기 (바이트)
+SEND_RATES = [1000, 10000, 0]  # 송신 속도 (messages/s, 0은 최대 속도)
+
+# 지연 측정용 payload: 앞부분에 송신 시각(ns)을 고정 길이 숫자로 기록
+TIMESTAMP_PREFIX = b'{"bench_ts": '
+TIMESTAMP_DIGITS = 20
+
+# --transports에서 비교할 크기와 속도 (작은 REPORT_TO_GUI 크기, 일정 속도에서 Nagle 영향이 드러남)
+TRANSPORT_SIZES = [64, 512]
+TRANSPORT_RATES = [1000, 10000, 0]
+
+
+def percentile(sorted_samples, fraction):
+    if not sorted_samples:
+        return 0.0
+    index = min(int(len(sorted_samples) * fraction), len(sorted_samples) - 1)
+    return sorted_samples[index]
+
+
+def summarize(samples_ns):
+    """ns 단위 지연 샘플을 us 단위 통계로 요약"""
+    samples = sorted(samples_ns)
+    count = len(samples)
+    return {
+        "count": count,
+        "mean_us": (sum(samples) / count / 1000.0) if count else 0.0,
+        "p50_us": percentile(samples, 0.50) / 1000.0,
+        "p99_us": percentile(samples, 0.99) / 1000.0,
+        "p999_us": percentile(samples, 0.999) / 1000.0,
+        "max_us": (samples[-1] / 1000.0) if count else 0.0,
+    }
+
+
+def make_payload(size):
+    """송신 시각 자리를 포함한 size 바이트의 JSON payload 틀"""
+    head = TIMESTAMP_PREFIX + b"0" * TIMESTAMP_DIGITS + b', "pad": "'
+    tail = b'"}'
+    return head + b"x" * max(size - len(head) - len(tail), 0) + tail
+
+
+def stamp_frame(payload_template, timestamp_ns):
+    """payload에 송신 시각을 넣고 헤더를 붙인 프레임 생성"""
+    digits = str(timestamp_ns).zfill(TIMESTAMP_DIGITS).encode()
+    start = len(TIMESTAMP_PREFIX)
+    payload = payload_template[:start] + digits + payload_template[start + TIMESTAMP_DIGITS:]
+    return create_message_with_header(payload.decode())
+
+
+def read_timestamp(payload):
+    start = len(TIMESTAMP_PREFIX)
+    return int(bytes(payload[start:start + TIMESTAMP_DIGITS]))
+
+
+def result(name, count, total_bytes, elapsed, latencies_ns=None, **params):
+    entry = {
+        "name": name,
+        **params,
+        "messages": count,
+        "elapsed_s": elapsed,
+        "messages_per_sec": count / elapsed if elapsed else 0.0,
+        "bytes_per_sec": total_bytes / elapsed if elapsed else 0.0,
+    }
+    if latencies_ns is not None:
+        entry["latency"] = summarize(latencies_ns)
+    return entry
+
+
+# ------------------------------------------------------------------ 단위 벤치마크
+
+def bench_encode(count):
+    """send_arm_state: 상태 선택 + 메시지 조립 (소비하는 쪽이 없으므로 병합하지 않는 정책으로 측정)"""
+    simulator = Simulator(queue_size=count, queue_policy="drop_newest")
+    simulator.enable_all()
+    queue = simulator.message_queue
+    arms = [random.randrange(simulator.num_arms) for _ in range(count)]
+    latencies = []
+    total_bytes = 0
+    start = time.perf_counter()
+    for arm_index in arms:
+        t0 = time.perf_counter_ns()
+        simulator.send_arm_state(arm_index)
+        latencies.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - start
+    for frame in queue.drain(count):
+        total_bytes += len(frame)
+    return result("encode", count, total_bytes, elapsed, latencies)
+
+
+def bench_framing(count, size):
+    """create_message_with_header"""
+    json_data = make_payload(size).decode()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(count):
+        t0 = time.perf_counter_ns()
+        create_message_with_header(json_data)
+        latencies.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - start
+    return result("framing", count, count * (size + 5), elapsed, latencies, size=size)
+
+
+def bench_decode(count, size):
+    """FrameDecoder: 임의 크기로 잘린 스트림에서 프레임 추출"""
+    frame = create_message_with_header(make_payload(size).decode())
+    stream = frame * count
+    chunks = []
+    position = 0
+    rng = random.Random(0)
+    while position < len(stream):
+        length = rng.randint(1, 65536)
+        chunks.append(stream[position:position + length])
+        position += length
+
+    decoder = FrameDecoder()
+    decoded = 0
+    start = time.perf_counter()
+    for chunk in chunks:
+        decoder.feed(chunk)
+        for _ in decoder.frames():
+            decoded += 1
+    elapsed = time.perf_counter() - start
+    return result("decode", decoded, len(stream), elapsed, size=size)
+
+
+# ------------------------------------------------------------------ 소켓 벤치마크
+
+class StandInClient:
+    """GUI 대신 연결하여 수신 프레임의 지연을 기록하는 테스트 클라이언트"""
+
+    def __init__(self, ip, port, transport=None):
+        if transport is None:
+            self.sock = socket.create_connection((ip, port))
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        else:
+            self.sock = transport.connect(ip, port)
+        self.latencies = []
+        self.frames = 0
+        self.bytes = 0
+        self.thread = threading.Thread(target=self._reader)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _reader(self):
+        decoder = FrameDecoder()
+        while True:
+            try:
+                received = decoder.recv_from(self.sock)
+            except OSError:
+                return
+            if not received:
+                return
+            now = time.perf_counter_ns()
+            self.bytes += received
+            for _, payload in decoder.frames():
+                self.frames += 1
+                if payload[:len(TIMESTAMP_PREFIX)] == TIMESTAMP_PREFIX:
+                    self.latencies.append(now - read_timestamp(payload))
+
+    def wait_for(self, frames, timeout):
+        deadline = time.perf_counter() + timeout
+        while self.frames < frames and time.perf_counter() < deadline:
+            time.sleep(0.001)
+
+    def close(self):
+        self.sock.close()
+
+
+def start_simulator(ip, port, transport=None):
+    # 클라이언트가 하나뿐이고 모든 메시지의 지연을 재야 하므로 버리지 않는 block 정책
+    simulator = Simulator(slow_client_policy="block", transport=transport)
+    simulator.start_server_thread(ip, port)
+    transport = simulator.server.socket_transport
+    deadline = time.perf_counter() + 5.0
+    while time.perf_counter() < deadline:
+        try:
+            transport.connect(ip, port).close()
+            break
+        except OSError:
+            time.sleep(0.01)
+    return simulator
+
+
+def bench_send(ip, port, count, size, rate, transport=None):
+    """송신 큐 -> 서버 -> 클라이언트 (큐에 넣은 시각부터 클라이언트 수신까지의 지연)"""
+    simulator = start_simulator(ip, port, transport)
+    client = StandInClient(ip, port, transport)
+    client.wait_for(1, 5.0)  # SOCKET_ENABLE
+    client.frames = 0
+    client.latencies.clear()
+
+    template = make_payload(size)
+    put = simulator.message_queue.put
+    start = time.perf_counter()
+    for index in range(count):
+        if rate:
+            sleep_until(start + index / rate)
+        put(stamp_frame(template, time.perf_counter_ns()))
+    client.wait_for(count, 30.0)
+    elapsed = time.perf_counter() - start
+
+    params = {"size": size, "rate": rate}
+    if transport is not None:
+        params["transport"] = transport.label()
+    entry = result("send", client.frames, client.frames * (size + 5), elapsed, client.latencies, **params)
+    client.close()
+    simulator.shutdown()
+    return entry
+
+
+def transport_modes(unix_path, send_buffer=None, receive_buffer=None):
+    """비교할 전송 방식 목록 (지원하지 않는 플랫폼의 방식은 제외)"""
+    modes = [
+        SocketTransport("tcp", nodelay=False),
+        SocketTransport("tcp"),
+    ]
+    if HAS_QUICKACK:
+        modes.append(SocketTransport("tcp", quickack=True))
+    if send_buffer or receive_buffer:
+        modes.append(SocketTransport("tcp", send_buffer=send_buffer, receive_buffer=receive_buffer))
+    if HAS_UNIX:
+        modes.append(SocketTransport("unix", path=unix_path))
+    return modes
+
+
+def bench_transports(ip, port, count, unix_path, send_buffer=None, receive_buffer=None):
+    """전송 방식별 송신 지연 (같은 크기/속도에서 tcp 기준 p50/p99 차이 출력)"""
+    results = []
+    modes = transport_modes(unix_path, send_buffer, receive_buffer)
+    for size in TRANSPORT_SIZES:
+        for rate in TRANSPORT_RATES:
+            messages = min(count, rate * 2) if rate else count
+            entries = [bench_send(ip, port, messages, size, rate, mode) for mode in modes]
+            results.extend(entries)
+
+            baseline = next(entry for entry in entries if entry["transport"] == "tcp")["latency"]
+            print(f"\nsize {size} rate {rate or 'max'}")
+            print(f"  {'transport':<20} {'msg/s':>10} {'p50 us':>9} {'Δ':>8} {'p99 us':>9} {'Δ':>8} {'p99.9 us':>9}")
+            for entry in entries:
+                latency = entry["latency"]
+                p50_delta = (latency["p50_us"] / baseline["p50_us"] - 1.0) * 100.0 if baseline["p50_us"] else 0.0
+                p99_delta = (latency["p99_us"] / baseline["p99_us"] - 1.0) * 100.0 if baseline["p99_us"] else 0.0
+                print(f"  {entry['transport']:<20} {entry['messages_per_sec']:>10.0f} {latency['p50_us']:>9.1f}"
+                      f" {p50_delta:>+7.1f}% {latency['p99_us']:>9.1f} {p99_delta:>+7.1f}% {latency['p999_us']:>9.1f}")
+    return results
+
+
+def bench_receive(ip, port, count, size, rate):
+    """클라이언트 -> 서버 수신 처리 (클라이언트 송신 시각부터 수신 콜백까지의 지연)"""
+    simulator = start_simulator(ip, port)
+    latencies = []
+    received = [0]
+
+    def on_frame(client, flag, payload):
+        latencies.append(time.perf_counter_ns() - read_timestamp(payload))
+        received[0] += 1
+
+    simulator.server.on_frame = on_frame
+    sock = socket.create_connection((ip, port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    template = make_payload(size)
+    batch = 1 if rate else 64
+    start = time.perf_counter()
+    sent = 0
+    while sent < count:
+        if rate:
+            sleep_until(start + sent / rate)
+        frames = [stamp_frame(template, time.perf_counter_ns()) for _ in range(min(batch, count - sent))]
+        send_frames(sock, frames)
+        sent += len(frames)
+    deadline = time.perf_counter() + 30.0
+    while received[0] < count and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+
+    sock.close()
+    simulator.shutdown()
+    return result("receive", received[0], received[0] * (size + 5), elapsed, latencies, size=size, rate=rate)
+
+
+# ------------------------------------------------------------------ 실행 / 비교
+
+def result_key(entry):
+    return (entry["name"], entry.get("transport"), entry.get("size"), entry.get("rate"))
+
+
+def compare(results, baseline_path):
+    """이전 결과 파일과 처리량, p99 지연 비교 출력"""
+    with open(baseline_path) as f:
+        baseline = {result_key(entry): entry for entry in json.load(f)["results"]}
+
+    print(f"\n{'benchmark':<32} {'msg/s':>12} {'Δ':>8} {'p99 us':>10} {'Δ':>8}")
+    for entry in results:
+        old = baseline.get(result_key(entry))
+        label = " ".join(str(part) for part in result_key(entry) if part is not None)
+        rate = entry["messages_per_sec"]
+        p99 = entry.get("latency", {}).get("p99_us", 0.0)
+        if old is None:
+            print(f"{label:<32} {rate:>12.0f} {'new':>8} {p99:>10.1f}")
+            continue
+        rate_delta = (rate / old["messages_per_sec"] - 1.0) * 100.0 if old["messages_per_sec"] else 0.0
+        old_p99 = old.get("latency", {}).get("p99_us", 0.0)
+        p99_delta = (p99 / old_p99 - 1.0) * 100.0 if old_p99 else 0.0
+        print(f"{label:<32} {rate:>12.0f} {rate_delta:>+7.1f}% {p99:>10.1f} {p99_delta:>+7.1f}%")
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulator pipeline benchmarks")
+    parser.add_argument("--ip", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=19839)
+    parser.add_argument("--count", type=int, default=100000, help="단위 벤치마크 반복 횟수")
+    parser.add_argument("--socket-count", type=int, default=20000, help="소켓 벤치마크 메시지 수")
+    parser.add_argument("--quick", action="store_true", help="반복 횟수를 1/10로 줄여 실행")
+    parser.add_argument("--transports", action="store_true", help="전송 방식별 송신 지연만 비교")
+    parser.add_argument("--unix-path", default="/tmp/gui_event_simulator_bench.sock", help="--transports의 Unix 소켓 경로")
+    parser.add_argument("--sndbuf", type=int, help="--transports에 송신 버퍼 크기를 바꾼 TCP 추가 (바이트)")
+    parser.add_argument("--rcvbuf", type=int, help="--transports에 수신 버퍼 크기를 바꾼 TCP 추가 (바이트)")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    count = args.count // 10 if args.quick else args.count
+    socket_count = args.socket_count // 10 if args.quick else args.socket_count
+
+    if args.transports:
+        results = bench_transports(args.ip, args.port, socket_count, args.unix_path, args.sndbuf, args.rcvbuf)
+    else:
+        results = [bench_encode(count)]
+        for size in MESSAGE_SIZES:
+            results.append(bench_framing(count, size))
+            results.append(bench_decode(count // 10 if size >= 4096 else count, size))
+        for size in MESSAGE_SIZES:
+            for rate in SEND_RATES:
+                messages = min(socket_count, rate * 2) if rate else socket_count
+                results.append(bench_send(args.ip, args.port, messages, size, rate))
+                results.append(bench_receive(args.ip, args.port, messages, size, rate))
+
+    for entry in results:
+        label = " ".join(str(part) for part in result_key(entry) if part is not None)
+        latency = entry.get("latency")
+        line = f"{label:<32} {entry['messages_per_sec']:>12.0f} msg/s {entry['bytes_per_sec'] / 1e6:>9.1f} MB/s"
+        if latency:
+            line += f"  p50 {latency['p50_us']:.1f}us  p99 {latency['p99_us']:.1f}us  p99.9 {latency['p999_us']:.1f}us"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": results,
+            }, f, indent=2)
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
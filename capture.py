@@ -0,0 +1,128 @@
+import collections
+import mmap
+import struct
+import threading
+import time
+
+from framing import HEADER_FORMAT, HEADER_SIZE
+
+# 캡처 파일 형식
+#   파일 헤더: MAGIC (8바이트)
+#   레코드: '<dB' (단조 시각 초, 방향) + 통신 프레임 그대로 (5바이트 헤더 + payload)
+MAGIC = b"GSIMCAP1"
+RECORD_FORMAT = '<dB'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+OUTGOING = 0  # 시뮬레이터 -> GUI
+INCOMING = 1  # GUI -> 시뮬레이터
+
+_record = struct.Struct(RECORD_FORMAT)
+_header = struct.Struct(HEADER_FORMAT)
+
+
+class CaptureWriter:
+    """송수신 프레임을 바이너리 파일에 기록
+
+    파일 하나는 한 세션이다. 레코드의 시각은 time.monotonic() 기준이라 다른 실행과 섞이면
+    재생 간격이 틀어지므로, 같은 경로가 있으면 이어 쓰지 않고 새로 만든다.
+
+    record_*()는 (시각, 방향, 프레임)을 deque에 넣기만 하고, 파일 쓰기는 별도 스레드가
+    모아서 한다. 송신 경로에서 드는 비용은 deque append 한 번이다.
+    """
+
+    def __init__(self, path, flush_interval=0.05):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC)
+        self.flush_interval = flush_interval
+
+        self.pending = collections.deque()
+        self.records = 0
+        self.bytes_written = 0
+
+        self.is_running = True
+        self._wakeup = threading.Event()
+        self.thread = threading.Thread(target=self._writer_thread)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def record_frames(self, direction, frames):
+        """헤더가 붙은 프레임 목록 기록"""
+        self.pending.append((time.monotonic(), direction, frames))
+
+    def record_payload(self, direction, flag, payload):
+        """수신한 payload에 헤더를 다시 붙여 기록 (payload는 복사됨)"""
+        frame = _header.pack(len(payload), flag) + payload
+        self.pending.append((time.monotonic(), direction, (frame,)))
+
+    def _write_pending(self):
+        parts = []
+        popleft = self.pending.popleft
+        try:
+            while True:
+                timestamp, direction, frames = popleft()
+                record_header = _record.pack(timestamp, direction)
+                for frame in frames:
+                    parts.append(record_header)
+                    parts.append(frame)
+                    self.records += 1
+                    self.bytes_written += RECORD_SIZE + len(frame)
+        except IndexError:
+            pass
+        if parts:
+            self.file.writelines(parts)
+
+    def _writer_thread(self):
+        while self.is_running:
+            self._wakeup.wait(self.flush_interval)
+            self._write_pending()
+        self._write_pending()
+        self.file.flush()
+
+    def close(self):
+        self.is_running = False
+        self._wakeup.set()
+        self.thread.join(timeout=5.0)
+        self.file.close()
+
+
+class CaptureReader:
+    """캡처 파일을 mmap으로 열어 레코드를 순서대로 읽기
+
+    파일 전체를 메모리에 올리지 않고, 각 레코드의 프레임을 mmap 위의 memoryview로
+    돌려준다. 기록 도중 잘린 마지막 레코드는 무시한다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mm)
+        if self.mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"캡처 파일 형식이 아닙니다: {path}")
+
+    def records(self, direction=None):
+        """(단조 시각, 방향, 프레임 memoryview)를 순서대로 반환"""
+        mm = self.mm
+        size = len(mm)
+        position = len(MAGIC)
+        while position + RECORD_SIZE + HEADER_SIZE <= size:
+            timestamp, record_direction = _record.unpack_from(mm, position)
+            frame_start = position + RECORD_SIZE
+            length, _ = _header.unpack_from(mm, frame_start)
+            frame_end = frame_start + HEADER_SIZE + length
+            if frame_end > size:
+                break
+            if direction is None or record_direction == direction:
+                yield timestamp, record_direction, self.view[frame_start:frame_end]
+            position = frame_end
+
+    def close(self):
+        try:
+            self.view.release()
+            self.mm.close()
+        except BufferError:
+            # 아직 사용 중인 memoryview가 있으면 가비지 컬렉션 때 정리됨
+            pass
+        self.file.close()
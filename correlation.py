@@ -0,0 +1,152 @@
+import collections
+import threading
+import time
+
+from metrics import Histogram, format_duration
+
+# GUI 응답에서 원래 메시지의 seq를 찾을 필드 (앞의 것부터 확인)
+REPLY_FIELDS = ("ack", "seq")
+
+
+def rtt_key(message_type, arm_index):
+    """통계 키 (arm_index가 None이면 메시지 종류 전체)"""
+    if arm_index is None or arm_index < 0:
+        return message_type
+    return f"{message_type}/arm{arm_index + 1}"
+
+
+class RoundTripTracker:
+    """seq를 붙여 보낸 메시지와 GUI 응답을 짝지어 왕복 시간(RTT) 측정
+
+    register()가 돌려준 seq를 메시지에 넣어 보내고, 같은 seq를 "ack"(또는 "seq")
+    필드에 담은 응답을 받으면 match()로 RTT를 계산한다. 대기 중인 요청은 seq -> 항목
+    딕셔너리와 보낸 순서의 deque로 관리하므로 등록, 응답 매칭, 타임아웃 정리가 모두
+    O(1)(정리는 분할 상환)이다. RTT는 메시지 종류별, 종류와 Arm별 히스토그램에 기록된다.
+    """
+
+    def __init__(self, timeout=5.0, max_pending=65536):
+        self.timeout_ns = int(timeout * 1e9)
+        self.max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._next_seq = 1
+        self.pending = {}  # seq -> (보낸 시각 ns, 메시지 종류, arm_index)
+        self._order = collections.deque()  # 보낸 순서의 seq (타임아웃 정리용)
+
+        self.histograms = {}  # rtt_key -> Histogram (ns)
+        self.timeouts = collections.Counter()  # rtt_key -> 응답 없이 만료된 수
+        self.matched = 0
+        self.unmatched = 0  # 대기 목록에 없는 seq의 응답 (만료 후 응답, 중복 응답 등)
+
+    def register(self, message_type, arm_index):
+        """보낼 메시지를 대기 목록에 등록하고 seq 반환"""
+        now = time.perf_counter_ns()
+        with self._lock:
+            self._expire(now)
+            seq = self._next_seq
+            self._next_seq += 1
+            self.pending[seq] = (now, message_type, arm_index)
+            self._order.append(seq)
+            if len(self.pending) > self.max_pending:
+                self._evict(self._order.popleft())
+        return seq
+
+    def match(self, seq):
+        """응답을 받은 seq의 RTT(ns) 기록 후 반환 (대기 중이 아니면 None)"""
+        now = time.perf_counter_ns()
+        with self._lock:
+            entry = self.pending.pop(seq, None)
+            if entry is None:
+                self.unmatched += 1
+                return None
+            sent_at, message_type, arm_index = entry
+            rtt = now - sent_at
+            self._histogram(rtt_key(message_type, None)).record(rtt)
+            if arm_index is not None and arm_index >= 0:
+                self._histogram(rtt_key(message_type, arm_index)).record(rtt)
+            self.matched += 1
+            self._expire(now)
+        return rtt
+
+    def match_reply(self, message):
+        """수신한 JSON 객체에서 seq를 찾아 match() (seq가 없으면 None)"""
+        if not isinstance(message, dict):
+            return None
+        for field in REPLY_FIELDS:
+            seq = message.get(field)
+            if isinstance(seq, int):
+                return self.match(seq)
+        return None
+
+    def expire(self):
+        with self._lock:
+            self._expire(time.perf_counter_ns())
+
+    def _expire(self, now):
+        # deque 앞쪽은 가장 먼저 보낸 요청 (이미 응답받은 seq는 건너뜀)
+        order = self._order
+        pending = self.pending
+        deadline = now - self.timeout_ns
+        while order:
+            entry = pending.get(order[0])
+            if entry is not None and entry[0] > deadline:
+                break
+            self._evict(order.popleft())
+
+    def _evict(self, seq):
+        entry = self.pending.pop(seq, None)
+        if entry is not None:
+            _, message_type, arm_index = entry
+            self.timeouts[rtt_key(message_type, None)] += 1
+            if arm_index is not None and arm_index >= 0:
+                self.timeouts[rtt_key(message_type, arm_index)] += 1
+
+    def _histogram(self, key):
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        return histogram
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.timeouts.clear()
+            self.matched = 0
+            self.unmatched = 0
+
+    def stats(self):
+        """RTT(us) 분포와 응답/타임아웃 수"""
+        self.expire()
+        with self._lock:
+            keys = sorted(set(self.histograms) | set(self.timeouts))
+            return {
+                "matched": self.matched,
+                "unmatched": self.unmatched,
+                "pending": len(self.pending),
+                "rtt_us": {
+                    key: dict(
+                        self.histograms[key].summary(1e-3) if key in self.histograms else Histogram().summary(),
+                        timeouts=self.timeouts[key],
+                    )
+                    for key in keys
+                },
+            }
+
+    def format_lines(self):
+        """메시지 종류별 RTT 요약 (상태 표시줄 출력용)"""
+        lines = []
+        with self._lock:
+            for key in sorted(self.histograms):
+                if "/" in key:
+                    continue
+                histogram = self.histograms[key]
+                lines.append(
+                    f"RTT {key:<12} p50 {format_duration(histogram.percentile(50)):>9}"
+                    f"  p99 {format_duration(histogram.percentile(99)):>9}"
+                    f"  max {format_duration(histogram.max):>9}"
+                    f"  ({histogram.count}, 타임아웃 {self.timeouts[key]})"
+                )
+            if not lines:
+                timeouts = sum(count for key, count in self.timeouts.items() if "/" not in key)
+                lines.append(f"RTT 응답 대기 {len(self.pending)}개, 타임아웃 {timeouts}개")
+        return lines
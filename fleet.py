@@ -0,0 +1,335 @@
+"""여러 시뮬레이터 서버를 별도 프로세스로 실행하는 부하 생성기
+
+작업 프로세스마다 독립된 시뮬레이터(로봇 서버)를 자기 포트(base_port + 번호)에서
+실행하고, 각자의 시나리오와 seed로 메시지를 보낸다. 프로세스마다 GIL이 따로 있으므로
+코어 수만큼 송신량을 늘릴 수 있다. 작업 프로세스는 report_interval마다 송신 통계와
+지연/RTT 히스토그램을 조정 프로세스(이 프로세스)로 보내고, 조정 프로세스는 이를 합쳐
+주기적으로 출력하고 종료 시 전체 보고서를 만든다.
+
+    python fleet.py --workers 8 --base-port 20000 --scenario scenarios/rehearsal.yaml --seed 1
+    python fleet.py --workers 4 --auto-send --interval 1 --duration 60 --report fleet.json
+"""
+import argparse
+import json
+import multiprocessing
+import queue
+import signal
+import time
+
+from messages import NUM_ARMS
+from metrics import LATENCY_STAGES, Histogram, format_duration
+from server import QUEUE_POLICIES
+
+
+class WorkerConfig:
+    """작업 프로세스 하나의 설정 (pickle로 전달)"""
+
+    def __init__(self, index, ip, port, scenario=None, scenario_speed=1.0, seed=None, auto_send=False,
+                 interval=1.0, topology=None, num_arms=None, arms_per_robot=None, queue_policy="conflate",
+                 rtt=False, report_interval=1.0):
+        self.index = index
+        self.ip = ip
+        self.port = port
+        self.scenario = scenario
+        self.scenario_speed = scenario_speed
+        self.seed = seed
+        self.auto_send = auto_send
+        self.interval = interval  # 자동 전송 간격 (초)
+        self.topology = topology
+        self.num_arms = num_arms
+        self.arms_per_robot = arms_per_robot
+        self.queue_policy = queue_policy
+        self.rtt = rtt
+        self.report_interval = report_interval
+
+
+def run_worker(config, reports, stop_event):
+    """작업 프로세스 본체: 시뮬레이터 서버를 실행하고 주기적으로 통계 보고"""
+    import topology
+    from simulator import Simulator
+
+    # Ctrl+C는 조정 프로세스가 받아 stop_event로 알림 (마지막 보고를 보내고 종료하도록)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    def send_status(text):
+        reports.put({"worker": config.index, "status": text})
+
+    try:
+        arm_topology = topology.from_args(config.topology, config.num_arms, config.arms_per_robot)
+        simulator = Simulator(topology=arm_topology, queue_policy=config.queue_policy)
+        simulator.on_status = send_status
+        # 송신 로그와 배치마다의 상태 갱신은 필요 없으므로 생략 (보고는 주기 통계로)
+        simulator.server.on_sent = None
+        if config.rtt:
+            simulator.start_round_trip()
+
+        compiled_scenario = None
+        if config.scenario:
+            import scenario
+
+            compiled_scenario = scenario.compile_file(config.scenario, seed=config.seed, topology=arm_topology)
+    except (OSError, ValueError) as e:
+        reports.put({"worker": config.index, "status": f"시작할 수 없습니다: {str(e)}", "final": True})
+        return
+
+    simulator.start_server_thread(config.ip, config.port)
+    if compiled_scenario is not None:
+        simulator.start_scenario(compiled_scenario, config.scenario_speed)
+    if config.auto_send:
+        simulator.enable_all()
+        if config.seed is not None:
+            simulator.start_timeline(simulator.generate_timeline(1000000, seed=config.seed), config.interval)
+        else:
+            simulator.start_auto_send(config.interval)
+
+    try:
+        while not stop_event.wait(config.report_interval):
+            reports.put(worker_report(config, simulator))
+    finally:
+        simulator.shutdown()
+        reports.put(worker_report(config, simulator, final=True))
+
+
+def worker_report(config, simulator, final=False):
+    """조정 프로세스로 보낼 통계 (히스토그램은 그대로 보내 합산)"""
+    server = simulator.server
+    round_trip = simulator.round_trip
+    report = {
+        "worker": config.index,
+        "port": config.port,
+        "time": time.time(),
+        "messages": server.messages_sent,
+        "bytes": server.bytes_sent,
+        "clients": len(server.clients),
+        "queue": simulator.message_queue.stats(),
+        "playing": simulator.is_replaying,
+        "latency": dict(simulator.metrics.latency),
+        "final": final,
+    }
+    if round_trip is not None:
+        report["rtt"] = {key: histogram for key, histogram in round_trip.histograms.items() if "/" not in key}
+        report["rtt_timeouts"] = {key: count for key, count in round_trip.timeouts.items() if "/" not in key}
+    return report
+
+
+class Coordinator:
+    """작업 프로세스를 띄우고 보고를 모아 합산"""
+
+    def __init__(self, configs):
+        self.configs = configs
+        self.context = multiprocessing.get_context("spawn")  # Windows 실험실 PC와 같은 방식
+        self.reports = self.context.Queue()
+        self.stop_event = self.context.Event()
+        self.processes = []
+        self.latest = {}  # worker -> 마지막 보고
+        self.previous = {}  # worker -> 그 전 보고 (속도 계산용)
+        self.finished = set()
+        self.started_at = None
+
+    def start(self):
+        self.started_at = time.time()
+        for config in self.configs:
+            process = self.context.Process(
+                target=run_worker, args=(config, self.reports, self.stop_event), name=f"fleet-worker-{config.index}"
+            )
+            process.daemon = True
+            process.start()
+            self.processes.append(process)
+
+    def stop(self, timeout=10.0):
+        """작업 프로세스에 중지를 알리고 마지막 보고를 기다림"""
+        self.stop_event.set()
+        deadline = time.time() + timeout
+        while len(self.finished) < len(self.configs) and time.time() < deadline:
+            self.poll(0.1)
+        for process in self.processes:
+            process.join(timeout=max(deadline - time.time(), 0.1))
+            if process.is_alive():
+                process.terminate()
+
+    def poll(self, timeout):
+        """보고를 하나 이상 받아 반영 (상태 메시지는 반환)"""
+        statuses = []
+        try:
+            report = self.reports.get(timeout=timeout)
+            while True:
+                if "status" in report:
+                    statuses.append(f"[worker {report['worker']}] {report['status']}")
+                else:
+                    worker = report["worker"]
+                    if worker in self.latest:
+                        self.previous[worker] = self.latest[worker]
+                    self.latest[worker] = report
+                if report.get("final"):
+                    self.finished.add(report["worker"])
+                report = self.reports.get_nowait()
+        except queue.Empty:
+            pass
+        return statuses
+
+    def rates(self, worker):
+        """마지막 두 보고 사이의 (messages/s, bytes/s)"""
+        latest = self.latest.get(worker)
+        previous = self.previous.get(worker)
+        if latest is None or previous is None or latest["time"] <= previous["time"]:
+            return 0.0, 0.0
+        elapsed = latest["time"] - previous["time"]
+        return (latest["messages"] - previous["messages"]) / elapsed, (latest["bytes"] - previous["bytes"]) / elapsed
+
+    def aggregate(self):
+        """모든 작업 프로세스의 마지막 보고 합산"""
+        latency = {name: Histogram() for name in LATENCY_STAGES}
+        rtt = {}
+        rtt_timeouts = {}
+        messages = total_bytes = clients = dropped = conflated = 0
+        rate = byte_rate = 0.0
+        for worker, report in self.latest.items():
+            messages += report["messages"]
+            total_bytes += report["bytes"]
+            clients += report["clients"]
+            dropped += report["queue"]["dropped"]
+            conflated += report["queue"]["conflated"]
+            worker_rate, worker_byte_rate = self.rates(worker)
+            rate += worker_rate
+            byte_rate += worker_byte_rate
+            for name, histogram in report["latency"].items():
+                latency[name].merge(histogram)
+            for key, histogram in report.get("rtt", {}).items():
+                rtt.setdefault(key, Histogram()).merge(histogram)
+            for key, count in report.get("rtt_timeouts", {}).items():
+                rtt_timeouts[key] = rtt_timeouts.get(key, 0) + count
+
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        return {
+            "workers": len(self.latest),
+            "elapsed_s": elapsed,
+            "messages": messages,
+            "bytes": total_bytes,
+            "messages_per_sec": rate,
+            "bytes_per_sec": byte_rate,
+            "mean_messages_per_sec": messages / elapsed if elapsed else 0.0,
+            "clients": clients,
+            "queue_dropped": dropped,
+            "queue_conflated": conflated,
+            "latency_us": {name: histogram.summary(1e-3) for name, histogram in latency.items()},
+            "rtt_us": {
+                key: dict(histogram.summary(1e-3), timeouts=rtt_timeouts.get(key, 0))
+                for key, histogram in sorted(rtt.items())
+            },
+        }
+
+    def report(self):
+        """전체 보고서 (합산 + 작업 프로세스별 요약)"""
+        workers = []
+        for config in self.configs:
+            latest = self.latest.get(config.index)
+            if latest is None:
+                workers.append({"worker": config.index, "port": config.port, "reported": False})
+                continue
+            workers.append({
+                "worker": config.index,
+                "port": config.port,
+                "scenario": config.scenario,
+                "seed": config.seed,
+                "messages": latest["messages"],
+                "bytes": latest["bytes"],
+                "clients": latest["clients"],
+                "queue": latest["queue"],
+                "end_to_end_us": latest["latency"]["end_to_end"].summary(1e-3),
+            })
+        return {
+            "started_at": self.started_at,
+            "aggregate": self.aggregate(),
+            "workers": workers,
+        }
+
+    def format_line(self):
+        """주기 출력용 한 줄 요약"""
+        total = self.aggregate()
+        end_to_end = total["latency_us"]["end_to_end"]
+        line = (f"{total['workers']}/{len(self.configs)} workers, {total['clients']} clients, "
+                f"{total['messages_per_sec']:.0f} msg/s ({total['bytes_per_sec'] / 1e6:.2f} MB/s), "
+                f"전체 {total['messages']}개, p99 {format_duration(end_to_end['p99'] * 1e3)}")
+        if total["rtt_us"]:
+            worst = max(summary["p99"] for summary in total["rtt_us"].values())
+            line += f", RTT p99 {format_duration(worst * 1e3)}"
+        if total["queue_dropped"]:
+            line += f", 버림 {total['queue_dropped']}"
+        return line
+
+
+def make_configs(args):
+    """명령행 옵션으로 작업 프로세스 설정 목록 생성 (시나리오는 번호 순서대로 돌려 배정)"""
+    configs = []
+    for index in range(args.workers):
+        configs.append(WorkerConfig(
+            index,
+            args.ip,
+            args.base_port + index,
+            scenario=args.scenario[index % len(args.scenario)] if args.scenario else None,
+            scenario_speed=args.scenario_speed,
+            seed=args.seed + index if args.seed is not None else None,
+            auto_send=args.auto_send,
+            interval=args.interval / 1000.0,
+            topology=args.topology,
+            num_arms=args.arms,
+            arms_per_robot=args.arms_per_robot,
+            queue_policy=args.queue_policy,
+            rtt=args.rtt,
+            report_interval=args.report_interval,
+        ))
+    return configs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process simulator fleet")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="작업 프로세스 수")
+    parser.add_argument("--ip", default="127.0.0.1")
+    parser.add_argument("--base-port", type=int, default=19738, help="첫 작업 프로세스의 포트 (이후 1씩 증가)")
+    parser.add_argument("--scenario", action="append", default=[],
+                        help="시나리오 파일 (여러 번 지정하면 작업 프로세스에 차례로 배정)")
+    parser.add_argument("--scenario-speed", type=float, default=1.0, help="시나리오 배속 (0이면 최대한 빠르게)")
+    parser.add_argument("--seed", type=int, help="첫 작업 프로세스의 seed (이후 1씩 증가)")
+    parser.add_argument("--auto-send", action="store_true", help="모든 Arm 상태 자동 전송")
+    parser.add_argument("--interval", type=float, default=1000.0, help="자동 전송 간격 (ms)")
+    parser.add_argument("--topology", help="Arm과 로봇 구성 파일 (.json, topology.py 참고)")
+    parser.add_argument("--arms", type=int, help=f"Arm 개수 (기본값 {NUM_ARMS}, --topology가 없을 때)")
+    parser.add_argument("--arms-per-robot", type=int, help="로봇 한 대의 Arm 수 (기본값 2, --topology가 없을 때)")
+    parser.add_argument("--queue-policy", choices=QUEUE_POLICIES, default="conflate", help="송신 큐 정책")
+    parser.add_argument("--rtt", action="store_true", help="GUI 응답 왕복 시간 측정")
+    parser.add_argument("--duration", type=float, help="실행 시간 (초, 없으면 Ctrl+C까지)")
+    parser.add_argument("--report-interval", type=float, default=1.0, help="작업 프로세스 보고 간격 (초)")
+    parser.add_argument("--report", help="종료 시 전체 보고서를 저장할 JSON 경로")
+    args = parser.parse_args()
+
+    if args.workers <= 0:
+        parser.error("--workers는 1 이상이어야 합니다.")
+
+    coordinator = Coordinator(make_configs(args))
+    coordinator.start()
+    print(f"{args.workers}개 작업 프로세스 시작 (포트 {args.base_port}~{args.base_port + args.workers - 1})")
+
+    next_print = time.time() + args.report_interval
+    deadline = time.time() + args.duration if args.duration else None
+    try:
+        while deadline is None or time.time() < deadline:
+            for status in coordinator.poll(0.1):
+                print(status)
+            if time.time() >= next_print:
+                next_print += args.report_interval
+                print(coordinator.format_line())
+            if len(coordinator.finished) == len(coordinator.configs):
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        coordinator.stop()
+        print(coordinator.format_line())
+        if args.report:
+            with open(args.report, "w") as f:
+                json.dump(coordinator.report(), f, indent=2)
+            print(f"보고서를 저장했습니다: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import os
+import struct
+
+# 헤더: 4바이트 길이 (리틀 엔디안) + 1바이트 플래그
+HEADER_FORMAT = '<IB'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+MAX_FRAME_SIZE = 16 * 1024 * 1024  # 이보다 큰 길이는 프레임이 깨진 것으로 판단
+
+# sendmsg 한 번에 넘길 수 있는 최대 버퍼 수
+try:
+    IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
+if IOV_MAX <= 0:
+    IOV_MAX = 1024
+
+
+def create_message_with_header(json_data):
+    # JSON 데이터를 UTF-8로 인코딩
+    json_bytes = json_data.encode('utf-8')
+    # 데이터 길이 계산
+    data_length = len(json_bytes)
+    # 헤더 생성: 4바이트 길이 + 1바이트 0
+    # '<I' 는 리틀 엔디안 부호없는 정수(4바이트)
+    # 'B' 는 부호없는 char(1바이트)
+    header = struct.pack(HEADER_FORMAT, data_length, 0)
+    # 헤더와 데이터 합치기
+    return header + json_bytes
+
+
+def send_frames(sock, frames):
+    """여러 프레임을 sendmsg 한 번(부분 전송 시 나머지 이어서)으로 전송"""
+    if not hasattr(sock, "sendmsg"):
+        sock.sendall(b"".join(frames))
+        return
+
+    views = [memoryview(frame) for frame in frames]
+    index = 0
+    while index < len(views):
+        sent = sock.sendmsg(views[index:index + IOV_MAX])
+        # 완전히 전송된 프레임은 건너뛰고, 일부만 전송된 프레임은 남은 부분부터 다시 전송
+        while index < len(views) and sent >= len(views[index]):
+            sent -= len(views[index])
+            index += 1
+        if sent:
+            views[index] = views[index][sent:]
+
+
+class FrameDecoder:
+    """수신 바이트 스트림에서 '<I' 길이 + 플래그 바이트 프레임을 잘라내는 디코더
+
+    재사용하는 bytearray에 recv_into로 읽고, 완성된 프레임의 payload는 복사 없이
+    memoryview로 돌려준다. 돌려받은 memoryview는 다음 recv_from/feed 호출 전까지만
+    유효하므로 그 전에 디코딩하거나 bytes로 복사해야 한다. TCP 세그먼트가 어떻게
+    나뉘어 도착하든 완성된 프레임만 순서대로 반환한다.
+    """
+
+    def __init__(self, initial_size=65536, min_read=4096, max_frame_size=MAX_FRAME_SIZE):
+        self.buffer = bytearray(initial_size)
+        self.view = memoryview(self.buffer)
+        self.start = 0  # 아직 처리하지 않은 데이터의 시작 위치
+        self.end = 0  # 수신된 데이터의 끝 위치
+        self.min_read = min_read
+        self.max_frame_size = max_frame_size
+        self._needed = 0  # 다음 프레임을 완성하는 데 필요한 바이트 수
+
+    def pending_bytes(self):
+        return self.end - self.start
+
+    def _reserve(self, size):
+        """버퍼 끝에 최소 size 바이트의 빈 공간 확보"""
+        if len(self.buffer) - self.end >= size:
+            return
+
+        remaining = self.end - self.start
+        if len(self.buffer) - remaining >= size:
+            # 처리된 앞부분을 버리고 남은 데이터를 앞으로 당김
+            self.buffer[:remaining] = self.buffer[self.start:self.end]
+        else:
+            # 공간이 부족하면 더 큰 버퍼를 새로 할당 (이전 버퍼의 memoryview는 그대로 유효)
+            new_size = len(self.buffer)
+            while new_size - remaining < size:
+                new_size *= 2
+            new_buffer = bytearray(new_size)
+            new_buffer[:remaining] = self.view[self.start:self.end]
+            self.buffer = new_buffer
+            self.view = memoryview(new_buffer)
+        self.start = 0
+        self.end = remaining
+
+    def get_buffer(self, sizehint=-1):
+        """다음 수신 데이터를 쓸 빈 공간을 memoryview로 반환 (asyncio.BufferedProtocol과 같은 규약)"""
+        self._reserve(max(self.min_read, sizehint, self._needed - self.pending_bytes()))
+        return self.view[self.end:]
+
+    def buffer_updated(self, nbytes):
+        """get_buffer로 받은 공간에 nbytes가 채워졌음을 반영"""
+        self.end += nbytes
+
+    def recv_from(self, sock):
+        """소켓에서 읽어 버퍼에 추가하고 읽은 바이트 수를 반환 (0이면 연결 종료)"""
+        received = sock.recv_into(self.get_buffer())
+        self.buffer_updated(received)
+        return received
+
+    def feed(self, data):
+        """이미 받은 바이트를 버퍼에 추가 (소켓을 직접 읽지 않는 경우)"""
+        self._reserve(len(data))
+        self.buffer[self.end:self.end + len(data)] = data
+        self.end += len(data)
+
+    def frames(self):
+        """완성된 프레임을 (flag, payload memoryview)로 순서대로 반환"""
+        while self.end - self.start >= HEADER_SIZE:
+            length, flag = struct.unpack_from(HEADER_FORMAT, self.buffer, self.start)
+            if length > self.max_frame_size:
+                raise ValueError(f"프레임 길이가 너무 큽니다: {length} 바이트")
+
+            total = HEADER_SIZE + length
+            if self.end - self.start < total:
+                self._needed = total
+                return
+
+            payload = self.view[self.start + HEADER_SIZE:self.start + total]
+            self.start += total
+            yield flag, payload
+
+        self._needed = 0
+        if self.start == self.end:
+            # 남은 데이터가 없으면 버퍼를 처음부터 다시 사용
+            self.start = self.end = 0
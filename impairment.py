@@ -0,0 +1,267 @@
+"""송신 경로의 네트워크 장애 주입 (프레임 분할, 쓰기 병합, 지연/지터, 대역폭 제한, 일시 정지)
+
+실제 로봇 연결은 프레임이 잘려서 도착하거나, 여러 프레임이 한 번에 도착하거나, 지연이
+흔들리거나, 잠시 멈추기도 한다. Impairment를 서버에 주면 클라이언트마다 송신 큐와 소켓
+사이에 ImpairedLink가 들어가 이런 조건에서 GUI의 프레임 파서와 화면 갱신을 확인할 수 있다.
+
+무작위 선택(지터, 분할 위치, 일시 정지)은 프레임마다 순서대로 하고 클라이언트마다 seed에
+연결 순번을 더한 random.Random을 쓰므로, 같은 seed와 같은 프레임 순서면 배치 크기와
+관계없이 같은 결과가 나온다 (실제 시각은 이벤트 루프 스케줄링만큼 흔들린다).
+"""
+import asyncio
+import collections
+import math
+import random
+import time
+
+
+class Impairment:
+    """장애 설정 (시간은 초, bandwidth는 bytes/s)
+
+    latency, jitter: 프레임마다 latency + uniform(0, jitter) 뒤에 쓴다 (순서는 유지).
+    split_probability: 프레임을 임의 바이트 위치에서 최대 max_splits번 잘라 따로 쓸 확률,
+        조각 사이에는 split_gap만큼 쉰다.
+    merge_window: 이 간격 단위로 쓰기 시각을 올림해 그 사이의 프레임을 한 번에 쓴다.
+    bandwidth: 초당 최대 바이트 수 (None이면 제한 없음).
+    stall_probability, stall_min, stall_max: 프레임마다 이 확률로 uniform(stall_min,
+        stall_max) 동안 연결 전체를 멈춘다 (뒤의 프레임도 함께 밀림).
+    max_pending_bytes: 장애 단계에 쌓아 둘 최대 바이트 수, 넘으면 클라이언트 송신 큐에서
+        대기하므로 느린 클라이언트 정책이 적용된다.
+    """
+
+    def __init__(self, seed=0, latency=0.0, jitter=0.0, split_probability=0.0, max_splits=3, split_gap=0.0,
+                 merge_window=0.0, bandwidth=None, stall_probability=0.0, stall_min=0.0, stall_max=0.0,
+                 max_pending_bytes=1 << 20):
+        if not 0.0 <= split_probability <= 1.0 or not 0.0 <= stall_probability <= 1.0:
+            raise ValueError("확률은 0에서 1 사이여야 합니다.")
+        if min(latency, jitter, split_gap, merge_window, stall_min, stall_max) < 0:
+            raise ValueError("시간은 0 이상이어야 합니다.")
+        if stall_max < stall_min:
+            raise ValueError("stall_max는 stall_min 이상이어야 합니다.")
+        if bandwidth is not None and bandwidth <= 0:
+            raise ValueError("대역폭은 0보다 커야 합니다.")
+        if max_splits < 1:
+            raise ValueError("max_splits는 1 이상이어야 합니다.")
+        self.seed = seed
+        self.latency = latency
+        self.jitter = jitter
+        self.split_probability = split_probability
+        self.max_splits = max_splits
+        self.split_gap = split_gap
+        self.merge_window = merge_window
+        self.bandwidth = bandwidth
+        self.stall_probability = stall_probability
+        self.stall_min = stall_min
+        self.stall_max = stall_max
+        self.max_pending_bytes = max_pending_bytes
+
+    @property
+    def enabled(self):
+        return bool(self.latency or self.jitter or self.split_probability or self.merge_window
+                    or self.bandwidth or self.stall_probability)
+
+    def to_dict(self):
+        return {
+            "seed": self.seed,
+            "latency_ms": self.latency * 1000.0,
+            "jitter_ms": self.jitter * 1000.0,
+            "split_probability": self.split_probability,
+            "max_splits": self.max_splits,
+            "split_gap_ms": self.split_gap * 1000.0,
+            "merge_window_ms": self.merge_window * 1000.0,
+            "bandwidth": self.bandwidth,
+            "stall_probability": self.stall_probability,
+            "stall_ms": [self.stall_min * 1000.0, self.stall_max * 1000.0],
+        }
+
+
+class _Write:
+    """장애 단계에서 쓰기를 기다리는 바이트 (stamps는 이 쓰기로 끝나는 프레임의 송신 큐 시각)"""
+
+    __slots__ = ("deliver_at", "data", "stamps", "mergeable")
+
+    def __init__(self, deliver_at, data, stamps, mergeable):
+        self.deliver_at = deliver_at
+        self.data = data
+        self.stamps = stamps
+        self.mergeable = mergeable
+
+
+class ImpairedLink:
+    """클라이언트 한 개의 송신 큐와 transport 사이에서 장애를 적용해 쓰는 단계
+
+    send()는 클라이언트 송신 태스크에서 프레임마다 쓰기 시각과 분할 위치를 정해 대기열에
+    넣기만 하고, 자체 태스크가 시각이 되면 대역폭 제한과 transport의 쓰기 가능 여부를
+    지키며 순서대로 쓴다. 이벤트 루프 스레드에서만 사용한다.
+    """
+
+    def __init__(self, connection, impairment, seed):
+        self.connection = connection
+        self.impairment = impairment
+        self.rng = random.Random(seed)
+        self.loop = asyncio.get_running_loop()
+
+        self.pending = collections.deque()  # _Write
+        self.pending_bytes = 0
+        self.last_deliver_at = 0.0  # 순서 유지를 위해 다음 쓰기가 이보다 앞설 수 없음
+        self.link_free_at = 0.0  # 대역폭 제한: 앞의 쓰기를 다 보내는 시각
+        self._has_items = asyncio.Event()
+        self._has_space = asyncio.Event()
+        self._has_space.set()
+
+        # 통계
+        self.writes = 0
+        self.split_frames = 0
+        self.merged_frames = 0
+        self.stalls = 0
+        self.stalled_s = 0.0
+
+        self.task = self.loop.create_task(self._writer())
+
+    def send(self, frames, stamps):
+        """프레임 목록의 쓰기 시각과 분할 위치를 정해 대기열에 추가"""
+        impairment = self.impairment
+        rng = self.rng
+        pending = self.pending
+        now = self.loop.time()
+
+        for frame, stamp in zip(frames, stamps):
+            deliver_at = now + impairment.latency
+            if impairment.jitter:
+                deliver_at += rng.uniform(0.0, impairment.jitter)
+            if impairment.stall_probability and rng.random() < impairment.stall_probability:
+                stall = rng.uniform(impairment.stall_min, impairment.stall_max)
+                self.last_deliver_at = max(self.last_deliver_at, deliver_at) + stall
+                self.stalls += 1
+                self.stalled_s += stall
+            if impairment.merge_window:
+                window = impairment.merge_window
+                deliver_at = math.ceil(deliver_at / window) * window
+            if deliver_at < self.last_deliver_at:
+                deliver_at = self.last_deliver_at
+            self.last_deliver_at = deliver_at
+
+            if impairment.split_probability and len(frame) > 1 and rng.random() < impairment.split_probability:
+                # 프레임 길이와 관계없이 같은 개수의 난수를 쓰도록 위치는 비율로 정함
+                count = 1 + int(rng.random() * impairment.max_splits)
+                cuts = sorted({1 + int(rng.random() * (len(frame) - 1)) for _ in range(count)})
+                pieces = [frame[start:end] for start, end in zip([0] + cuts, cuts + [len(frame)])]
+                for index, piece in enumerate(pieces):
+                    last = index == len(pieces) - 1
+                    piece_at = deliver_at + index * impairment.split_gap
+                    pending.append(_Write(piece_at, bytearray(piece), [stamp] if last else [], False))
+                self.last_deliver_at = deliver_at + (len(pieces) - 1) * impairment.split_gap
+                self.split_frames += 1
+            elif pending and pending[-1].mergeable and pending[-1].deliver_at == deliver_at:
+                # 같은 시각에 쓸 프레임은 한 번에 씀
+                last = pending[-1]
+                last.data += frame
+                last.stamps.append(stamp)
+                self.merged_frames += 1
+            else:
+                pending.append(_Write(deliver_at, bytearray(frame), [stamp], True))
+            self.pending_bytes += len(frame)
+
+        if self.pending_bytes > impairment.max_pending_bytes:
+            self._has_space.clear()
+        self._has_items.set()
+
+    async def wait_space(self):
+        await self._has_space.wait()
+
+    async def _writer(self):
+        pending = self.pending
+        connection = self.connection
+        bandwidth = self.impairment.bandwidth
+        loop = self.loop
+        while True:
+            while not pending:
+                self._has_items.clear()
+                await self._has_items.wait()
+
+            write = pending[0]
+            start = write.deliver_at
+            if bandwidth and self.link_free_at > start:
+                start = self.link_free_at
+            delay = start - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            # 쓰기 버퍼가 가득 차 있으면 비워질 때까지 대기
+            await connection.wait_writable()
+            if connection.is_closing():
+                return
+
+            pending.popleft()
+            data = write.data
+            written_started = time.perf_counter_ns()
+            connection.transport.write(data)
+            written_at = time.perf_counter_ns()
+            self.writes += 1
+            if bandwidth:
+                self.link_free_at = max(loop.time(), self.link_free_at) + len(data) / bandwidth
+
+            self.pending_bytes -= len(data)
+            if self.pending_bytes <= self.impairment.max_pending_bytes:
+                self._has_space.set()
+
+            metrics = connection.server.metrics
+            if metrics:
+                metrics.latency["write"].record(written_at - written_started)
+                if write.stamps:
+                    metrics.latency["end_to_end"].record_since(written_at, write.stamps)
+
+    def close(self):
+        self.task.cancel()
+        self.pending.clear()
+        self.pending_bytes = 0
+        self._has_space.set()
+
+    def stats(self):
+        return {
+            "pending_writes": len(self.pending),
+            "pending_bytes": self.pending_bytes,
+            "writes": self.writes,
+            "split_frames": self.split_frames,
+            "merged_frames": self.merged_frames,
+            "stalls": self.stalls,
+            "stalled_ms": self.stalled_s * 1000.0,
+        }
+
+
+def add_arguments(parser):
+    """장애 주입 명령행 옵션 추가 (main.py, simulator.py 공통, 시간은 ms)"""
+    parser.add_argument("--impair-seed", type=int, default=0, help="장애 주입 seed (클라이언트마다 연결 순번을 더함)")
+    parser.add_argument("--impair-latency", type=float, default=0.0, help="추가 지연 (ms)")
+    parser.add_argument("--impair-jitter", type=float, default=0.0, help="지연에 더할 0~N ms의 지터")
+    parser.add_argument("--impair-split", type=float, default=0.0, help="프레임을 임의 위치에서 나눠 쓸 확률 (0~1)")
+    parser.add_argument("--impair-max-splits", type=int, default=3, help="프레임 하나를 자르는 최대 횟수")
+    parser.add_argument("--impair-split-gap", type=float, default=0.0, help="나눈 조각 사이의 간격 (ms)")
+    parser.add_argument("--impair-merge", type=float, default=0.0, help="이 간격(ms) 안의 프레임을 한 번에 씀")
+    parser.add_argument("--impair-bandwidth", type=float, help="대역폭 제한 (bytes/s)")
+    parser.add_argument("--impair-stall", type=float, default=0.0, help="프레임마다 연결을 멈출 확률 (0~1)")
+    parser.add_argument("--impair-stall-ms", default="50:200", metavar="MIN:MAX", help="멈추는 시간 범위 (ms)")
+
+
+def from_args(args):
+    """add_arguments()로 추가한 옵션으로 Impairment 생성 (장애가 없으면 None)"""
+    stall_min, _, stall_max = args.impair_stall_ms.partition(":")
+    try:
+        stall_min = float(stall_min) / 1000.0
+        stall_max = float(stall_max) / 1000.0 if stall_max else stall_min
+    except ValueError:
+        raise ValueError(f"--impair-stall-ms는 MIN:MAX 형식(ms)이어야 합니다: {args.impair_stall_ms}")
+    impairment = Impairment(
+        seed=args.impair_seed,
+        latency=args.impair_latency / 1000.0,
+        jitter=args.impair_jitter / 1000.0,
+        split_probability=args.impair_split,
+        max_splits=args.impair_max_splits,
+        split_gap=args.impair_split_gap / 1000.0,
+        merge_window=args.impair_merge / 1000.0,
+        bandwidth=args.impair_bandwidth,
+        stall_probability=args.impair_stall,
+        stall_min=stall_min,
+        stall_max=stall_max,
+    )
+    return impairment if impairment.enabled else None
@@ -0,0 +1,91 @@
+import collections
+import time
+import tkinter as tk
+from tkinter import ttk
+from datetime import datetime
+
+
+class LogPane:
+    """송수신 메시지 로그 영역
+
+    append()는 어느 스레드에서나 호출할 수 있으며 (단조 시각, 텍스트)를 제한된 링 버퍼에
+    넣기만 한다. 실제 위젯 갱신은 메인 스레드의 flush()가 주기적으로 모아서 한 번에 하고,
+    시각 문자열과 바이트 메시지의 디코딩도 그때 한다. 위젯의 줄 수는 max_lines로 제한된다.
+    """
+
+    def __init__(self, parent, title, max_lines=5000, height=10):
+        self.max_lines = max_lines
+        self.pending = collections.deque(maxlen=max_lines)  # 아직 화면에 출력하지 않은 메시지
+        self.appended = 0  # append된 메시지 수
+        self.flushed = 0  # 출력했거나 링 버퍼에서 밀려난 메시지 수
+        self.lines = 0  # 위젯에 있는 줄 수
+
+        # 단조 시각을 실제 시각으로 바꾸기 위한 차이값
+        self._clock_offset = time.time() - time.monotonic()
+
+        self.frame = ttk.LabelFrame(parent, text=title)
+
+        # 일시정지 / 자동 스크롤 토글
+        toolbar = ttk.Frame(self.frame)
+        toolbar.pack(side=tk.TOP, fill='x', padx=5)
+        self.paused = tk.BooleanVar(value=False)
+        ttk.Checkbutton(toolbar, text="일시정지", variable=self.paused).pack(side=tk.LEFT)
+        self.follow = tk.BooleanVar(value=True)
+        ttk.Checkbutton(toolbar, text="자동 스크롤", variable=self.follow).pack(side=tk.LEFT, padx=5)
+        self.count_label = ttk.Label(toolbar, text="0")
+        self.count_label.pack(side=tk.RIGHT)
+
+        self.text = tk.Text(self.frame, height=height)
+        self.text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        scrollbar = ttk.Scrollbar(self.frame, command=self.text.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.config(yscrollcommand=scrollbar.set)
+
+    def append(self, text):
+        self.pending.append((time.monotonic(), text))
+        self.appended += 1
+
+    def format_time(self, timestamp):
+        wall = datetime.fromtimestamp(self._clock_offset + timestamp)
+        return wall.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+    def flush(self):
+        """쌓인 메시지를 위젯에 한 번에 출력 (메인 스레드에서 호출)"""
+        if self.paused.get():
+            return
+
+        entries = []
+        popleft = self.pending.popleft
+        try:
+            while True:
+                entries.append(popleft())
+        except IndexError:
+            pass
+
+        # 출력이 따라가지 못해 링 버퍼에서 밀려난 메시지 수
+        skipped = self.appended - self.flushed - len(entries)
+        if not entries and skipped <= 0:
+            return
+        self.flushed += len(entries) + max(skipped, 0)
+
+        lines = []
+        if skipped > 0:
+            lines.append(f"... {skipped}개 메시지 생략 ...")
+        for timestamp, text in entries:
+            if not isinstance(text, str):
+                # 바이트로 전달된 메시지는 출력할 때 디코딩
+                text = str(text, 'utf-8', 'replace')
+            lines.append(f"[{self.format_time(timestamp)}] {text}")
+
+        self.text.insert(tk.END, "\n".join(lines) + "\n")
+        self.lines += len(lines)
+
+        # 최대 줄 수를 넘는 오래된 줄 삭제
+        if self.lines > self.max_lines:
+            excess = self.lines - self.max_lines
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self.lines = self.max_lines
+
+        if self.follow.get():
+            self.text.see(tk.END)
+        self.count_label.config(text=str(self.appended))
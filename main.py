@@ -1,255 +1,243 @@
-import tkinter as tk
-from tkinter import ttk
-import socket
-import threading
-import json
-import struct
-import queue
+import argparse
 import time
-import select
-import random
+import tkinter as tk
+from tkinter import ttk, filedialog
 from datetime import datetime
 
+import impairment
+import topology
+import transport
+from arm_view import ArmView
+from log_pane import LogPane
+from received_view import ReceivedView
+from simulator import Simulator, NUM_ARMS, STATE_OPTIONS
+from state_panel import StateSection
+
 class Application:
-    # 상태 옵션을 클래스 변수로 정의
-    NUM_ARMS = 4  # Arm의 개수 정의
-    state_options = {
-        "is_connected": ["change", "random", "false", "true"],
-        "is_selected": ["change", "random", "false", "true"],
-        "is_tracking": ["change", "random", "false", "true"],
-        "is_instrument": ["change", "random", "false", "true"],
-        "instrument_type": ["change", "random", "none", "fene forceps", "mary dissector", "pre dissector", "clinch forceps", "clip applier", "needle holder", "pre needle", "suture needle", "mono hook", "mono spatular", "mono pre dissector", "mono scissors", "bi fene forceps", "bi mary dissector", "bi pre dissector", "bi blunt dissector"],
-        "endoscope_type": ["change", "random", "none", "0 endoscope", "30 endoscope"],
-        "homing_type": ["change", "random", "unknown", "done", "drape", "end effector", "slide"],
-        "is_clutched": ["change", "random", "false", "true"],
-        "esu_state": ["change", "random", "none", "coag", "cut"],
-        "manual_type": ["change", "random", "none", "op", "su", "slide"],
-        "is_drape": ["change", "random", "false", "true"],
-        "is_trocar": ["change", "random", "false", "true"]
-    }
-
-    def __init__(self):
+    # 상태 옵션은 시뮬레이터 코어(simulator.py)에 정의
+    NUM_ARMS = NUM_ARMS  # 기본 Arm의 개수 (topology를 주지 않은 경우)
+    ARM_COLUMNS = 4  # 한 줄에 표시할 Arm 패널 수
+    ROBOT_BUTTON_LIMIT = 4  # 로봇이 이보다 많으면 로봇별 버튼 대신 목록에서 선택
+    state_options = STATE_OPTIONS
+    LOG_MAX_LINES = 5000  # 송수신 로그 영역의 최대 줄 수
+    UI_REFRESH_MS = 33  # 화면 갱신 주기 (약 30fps)
+    METRICS_REFRESH_MS = 500  # 송신 지연 지표 갱신 주기
+
+    def __init__(self, arm_topology=None, socket_transport=None, send_impairment=None):
+        self.started_at = time.perf_counter()
         self.root = tk.Tk()
         self.root.title("simulaotr for GUI")
         self.root.geometry("1600x1200")  # 윈도우 크기 설정
-        
-        # 서버 상태
-        self.is_server_running = False
-        self.server_socket = None
-        self.is_auto_sending = False  # 자동 전송 상태
-        self.auto_send_thread = None  # 자동 전송 스레드
-        self.is_swap_pedal_auto = False  # 스왑페달 자동 시작 상태
-        self.swap_pedal_auto_thread = None  # 스왑페달 자동 시작 스레드
-        self.headin = 0  # headin 초기값
-        
-        # 메시지 큐 생성
-        self.message_queue = queue.Queue()
-        
-        # 현재 연결된 클라이언트 소켓 저장
-        self.current_client = None
-        self.client_lock = threading.Lock()
-        
+
+        # 시뮬레이터 코어 (상태, 메시지 생성, 서버)
+        self.simulator = Simulator(
+            self.NUM_ARMS, topology=arm_topology, transport=socket_transport, impairment=send_impairment
+        )
+        self.topology = self.simulator.topology
+        self.simulator.on_status = self.update_label
+        self.simulator.on_sent = self.update_sent_text
+        self.simulator.on_received = self.update_received_text
+        self.simulator.on_headin_changed = self.update_headin_button
+
         # 상단 컨트롤 프레임
         control_frame = ttk.Frame(self.root)
         control_frame.pack(pady=(10,0))  # 위쪽만 패딩 적용
-        
+
         # 서버 설정 프레임
         server_config_frame = ttk.Frame(control_frame)
         server_config_frame.pack(side=tk.LEFT, padx=5)
-        
+
         # IP 주소 입력
         ip_label = ttk.Label(server_config_frame, text="IP:")
         ip_label.pack(side=tk.LEFT, padx=(0,2))
         self.ip_var = tk.StringVar(value="127.0.0.1")
         self.ip_entry = ttk.Entry(server_config_frame, textvariable=self.ip_var, width=15)
         self.ip_entry.pack(side=tk.LEFT, padx=(0,5))
-        
+
         # 포트 번호 입력
         port_label = ttk.Label(server_config_frame, text="Port:")
         port_label.pack(side=tk.LEFT, padx=(0,2))
         self.port_var = tk.StringVar(value="19738")
         self.port_entry = ttk.Entry(server_config_frame, textvariable=self.port_var, width=6)
         self.port_entry.pack(side=tk.LEFT, padx=(0,5))
-        
+
         # 버튼을 담을 프레임
         button_frame = ttk.Frame(control_frame)
         button_frame.pack(side=tk.LEFT)
-        
-        # 레이블 생성
-        self.label = ttk.Label(button_frame, text="서버 대기중...")
-        self.label.pack(side=tk.LEFT, pady=(0,2), padx=5)  # 왼쪽 정렬
-        
+
         # 시작/중지 버튼 생성
         self.button = ttk.Button(button_frame, text="서버 시작", command=self.toggle_server)
         self.button.pack(side=tk.LEFT, padx=5)
-        
-        # SR-A호기 설정 버튼 생성
-        self.sr_a_button = ttk.Button(button_frame, text="SR-A호기 설정", command=self.send_sr_a_config)
-        self.sr_a_button.pack(side=tk.LEFT, padx=5)
-        
-        # SR-B호기 설정 버튼 생성
-        self.sr_b_button = ttk.Button(button_frame, text="SR-B호기 설정", command=self.send_sr_b_config)
-        self.sr_b_button.pack(side=tk.LEFT, padx=5)
-        
+
+        # 로봇(SR-A호기, SR-B호기, ...) 설정 버튼 생성
+        robots = self.topology.robots
+        self.robot_buttons = []
+        if len(robots) <= self.ROBOT_BUTTON_LIMIT:
+            for robot in robots:
+                robot_button = ttk.Button(
+                    button_frame, text=f"{robot.name}호기 설정", command=lambda r=robot: self.simulator.send_robot(r)
+                )
+                robot_button.pack(side=tk.LEFT, padx=5)
+                self.robot_buttons.append(robot_button)
+        else:
+            # 로봇이 많으면 목록에서 골라서 설정
+            self.robot_var = tk.StringVar(value=robots[0].name)
+            ttk.Combobox(
+                button_frame, textvariable=self.robot_var, values=[robot.name for robot in robots],
+                width=8, state='readonly'
+            ).pack(side=tk.LEFT, padx=(5,0))
+            robot_button = ttk.Button(button_frame, text="호기 설정", command=self.send_selected_robot_config)
+            robot_button.pack(side=tk.LEFT, padx=5)
+            self.robot_buttons.append(robot_button)
+        if len(robots) > 1:
+            all_robots_button = ttk.Button(
+                button_frame, text="전체 호기 설정", command=self.simulator.send_all_robot_configs
+            )
+            all_robots_button.pack(side=tk.LEFT, padx=5)
+            self.robot_buttons.append(all_robots_button)
+
         # 자동 전송 버튼 생성
         self.auto_send_button = ttk.Button(button_frame, text="메시지 자동전송", command=self.toggle_auto_send)
         self.auto_send_button.pack(side=tk.LEFT, padx=5)
-        
+
+        # 모든 Arm의 모든 상태를 전송 대상으로 설정 (Arm이 많을 때 자동 전송 준비용)
+        self.enable_all_button = ttk.Button(button_frame, text="전체 활성화", command=self.simulator.enable_all)
+        self.enable_all_button.pack(side=tk.LEFT, padx=5)
+
         # 스왑페달 버튼 생성
-        self.swap_pedal_button = ttk.Button(button_frame, text="스왑페달", command=self.swap_pedal)
+        self.swap_pedal_button = ttk.Button(button_frame, text="스왑페달", command=self.simulator.swap_pedal)
         self.swap_pedal_button.pack(side=tk.LEFT, padx=5)
-        
+
         # 스왑페달 자동 시작 버튼 생성
         self.swap_pedal_auto_button = ttk.Button(button_frame, text="스왑페달자동시작", command=self.toggle_swap_pedal_auto)
         self.swap_pedal_auto_button.pack(side=tk.LEFT, padx=5)
-        
+
         # headin 버튼 생성
         self.headin_button = ttk.Button(button_frame, text="headin: 0", command=self.toggle_headin)
         self.headin_button.pack(side=tk.LEFT, padx=5)
-        
+
+        # 캡처 시작/중지 버튼 생성
+        self.capture_button = ttk.Button(button_frame, text="캡처 시작", command=self.toggle_capture)
+        self.capture_button.pack(side=tk.LEFT, padx=5)
+
+        # 캡처 재생 버튼 생성
+        self.replay_button = ttk.Button(button_frame, text="캡처 재생", command=self.toggle_replay)
+        self.replay_button.pack(side=tk.LEFT, padx=5)
+
+        # 시나리오 실행 버튼 생성
+        self.scenario_button = ttk.Button(button_frame, text="시나리오 실행", command=self.toggle_scenario)
+        self.scenario_button.pack(side=tk.LEFT, padx=5)
+        self.playing_button = None  # 재생/실행 중인 쪽의 버튼
+
+        # 부하 테스트 버튼 생성
+        self.ramp_button = ttk.Button(button_frame, text="부하 테스트", command=self.toggle_load_ramp)
+        self.ramp_button.pack(side=tk.LEFT, padx=5)
+        self.load_ramp = None
+
+        # 수신 메시지 검색 버튼 생성
+        ttk.Button(button_frame, text="수신 검색", command=self.open_received_view).pack(side=tk.LEFT, padx=5)
+        self.received_view = None
+
         # Interval 입력 프레임
         interval_frame = ttk.Frame(button_frame)
         interval_frame.pack(side=tk.LEFT, padx=5)
-        
+
         # Interval 레이블
         interval_label = ttk.Label(interval_frame, text="Interval (ms):")
         interval_label.pack(side=tk.LEFT, padx=(0,5))
-        
+
         # Interval 입력 필드
         self.interval_var = tk.StringVar(value="1000")  # 기본값 1000ms
         self.interval_entry = ttk.Entry(interval_frame, textvariable=self.interval_var, width=8)
         self.interval_entry.pack(side=tk.LEFT)
-        
+
+        # 상태 표시줄 (마지막 상태 메시지 + 송신 지연/큐 깊이 지표)
+        status_frame = ttk.LabelFrame(self.root, text="상태")
+        status_frame.pack(fill='x', padx=20, pady=(10,0))
+
+        # 레이블 생성
+        self.label = ttk.Label(status_frame, text="서버 대기중...")
+        self.label.grid(row=0, column=0, sticky='w', padx=5)
+
+        # 지표 저장/초기화 버튼
+        metrics_buttons = ttk.Frame(status_frame)
+        metrics_buttons.grid(row=0, column=1, rowspan=2, sticky='ne', padx=5)
+        ttk.Button(metrics_buttons, text="지표 저장", command=self.dump_metrics).pack(side=tk.TOP, pady=2)
+        ttk.Button(metrics_buttons, text="지표 초기화", command=self.reset_metrics).pack(side=tk.TOP, pady=2)
+
+        # GUI 응답 왕복 시간 측정 (메시지에 seq 추가)
+        self.round_trip_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            metrics_buttons, text="RTT 측정", variable=self.round_trip_var, command=self.toggle_round_trip
+        ).pack(side=tk.TOP, pady=2)
+
+        # 단계별 지연과 큐 깊이 (고정폭 글꼴로 열 맞춤)
+        self.metrics_label = ttk.Label(status_frame, text="", font="TkFixedFont", justify=tk.LEFT)
+        self.metrics_label.grid(row=1, column=0, sticky='w', padx=5, pady=(0,5))
+        status_frame.grid_columnconfigure(0, weight=1)
+
         # 상태 표시를 위한 프레임
         state_frame = ttk.Frame(self.root)
         state_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
-        
-        # 4개의 Arm을 위한 컨테이너 프레임
-        arms_container = ttk.Frame(state_frame)
-        arms_container.pack(fill=tk.BOTH, expand=True)
-        
-        # weight를 1로 설정하여 4개의 열을 동일한 너비로 설정
-        for i in range(4):
-            arms_container.grid_columnconfigure(i, weight=1)
-        
-        # 상태 레이블 생성
-        self.state_vars = {}  # 라디오 버튼 변수들을 저장할 딕셔너리
-        self.previous_states = {}  # 각 Arm의 이전 상태를 저장할 딕셔너리
-        self.state_enabled = {}  # 각 상태의 활성화 여부를 저장할 딕셔너리
-        self.state_expanded = {}  # 각 상태의 확장 여부를 저장할 딕셔너리
-        
+
+        # Arm별 상태 영역 (화면 표시용, 실제 상태는 self.simulator.states에 보관)
+        self.state_sections = {}  # arm_index -> state_name -> StateSection (화면에 만든 Arm만)
+        self.states_version = self.simulator.states.version  # 마지막으로 화면에 맞춘 상태 버전
+
         # 스타일 설정
         style = ttk.Style()
         style.configure('Tray.TButton', padding=0)
         style.configure('StateHeader.TFrame', relief='raised', borderwidth=1)
-        
-        # 4개의 Arm 생성
-        for arm_idx in range(4):
-            # Arm을 위한 LabelFrame 생성
-            arm_frame = ttk.LabelFrame(arms_container, text=f"Arm {arm_idx + 1}")
-            arm_frame.grid(row=0, column=arm_idx, padx=5, pady=5, sticky='nsew')
-            
-            # 각 Arm의 상태 변수 저장을 위한 중첩 딕셔너리 생성
-            self.state_vars[f"Arm {arm_idx + 1}"] = {}
-            self.previous_states[f"Arm {arm_idx + 1}"] = {}
-            self.state_enabled[f"Arm {arm_idx + 1}"] = {}
-            self.state_expanded[f"Arm {arm_idx + 1}"] = {}
-            
-            # 각 상태 옵션에 대한 라디오 버튼 그룹 생성
-            for state_name, options in self.state_options.items():
-                # 상태 컨테이너 프레임
-                state_container = ttk.Frame(arm_frame)
-                state_container.pack(pady=(0,2), padx=5, fill='x')
-                
-                # 상태 헤더 프레임 (스타일 적용)
-                state_header = ttk.Frame(state_container, style='StateHeader.TFrame')
-                state_header.pack(fill='x')
-                
-                # 트레이 아이콘 버튼 (활성화/비활성화 상태도 함께 표시)
-                self.state_enabled[f"Arm {arm_idx + 1}"][state_name] = tk.BooleanVar(value=False)  # 초기값 False로 변경
-                self.state_expanded[f"Arm {arm_idx + 1}"][state_name] = tk.BooleanVar(value=False)  # 초기값 False로 변경
-                tray_button = ttk.Button(
-                    state_header,
-                    text="[+]",  # 초기 상태는 접혀있으므로 "[+]"로 표시
-                    width=3,
-                    style='Tray.TButton',
-                    command=lambda a=f"Arm {arm_idx + 1}", s=state_name, c=state_container: 
-                        self.toggle_state_expansion(a, s, c)
-                )
-                tray_button.pack(side=tk.LEFT, padx=(5,0))
-                
-                # 상태 레이블
-                label = ttk.Label(state_header, text=state_name)
-                label.pack(side=tk.LEFT, padx=5)
-                
-                # 라디오 버튼을 포함할 컨텐츠 프레임
-                content_frame = ttk.Frame(state_container)
-                # 초기 상태에서는 pack하지 않음 (접힌 상태로 시작)
-                
-                # 라디오 버튼용 변수 생성 - 'random'을 기본값으로 설정
-                self.state_vars[f"Arm {arm_idx + 1}"][state_name] = tk.StringVar(value="random")
-                self.previous_states[f"Arm {arm_idx + 1}"][state_name] = None
-                
-                # 라디오 버튼 생성
-                for i, option in enumerate(options):
-                    radio = ttk.Radiobutton(
-                        content_frame,
-                        text=option,
-                        value=option,
-                        variable=self.state_vars[f"Arm {arm_idx + 1}"][state_name]
-                    )
-                    radio.grid(row=i//3, column=i%3, padx=5, sticky='w')
-                    # 초기 상태는 비활성화
-                    radio.state(['disabled'])
-                
-                # content_frame을 state_name으로 태그
-                content_frame.radio_buttons = content_frame.winfo_children()
-            
-            # 메시지 전송 버튼 추가
-            send_button = ttk.Button(
-                arm_frame,
-                text="메시지 전송",
-                command=lambda arm=f"Arm {arm_idx + 1}": self.send_arm_state(arm)
-            )
-            send_button.pack(pady=10)
-        
+
+        # Arm 패널을 ARM_COLUMNS개씩 줄 단위로 배치하는 스크롤 영역 (보이는 줄의 패널만 생성)
+        self.arm_view = ArmView(
+            state_frame,
+            self.simulator.num_arms,
+            self.build_arm_panel,
+            release_arm=self.release_arm_panel,
+            columns=self.ARM_COLUMNS,
+        )
+        self.arm_view.frame.pack(fill=tk.BOTH, expand=True)
+
         # 하단 메시지 영역 프레임 (전체 높이의 1/3)
         text_frame = ttk.Frame(self.root)
         text_frame.pack(fill=tk.BOTH, expand=False, padx=10, pady=10)
-        
+
         # 텍스트 영역을 감싸는 컨테이너 프레임
         text_container = ttk.Frame(text_frame)
         text_container.pack(fill=tk.BOTH, expand=True)
-        
+
         # weight를 1로 설정하여 두 열의 너비를 동일하게 설정
         text_container.grid_columnconfigure(0, weight=1)
         text_container.grid_columnconfigure(1, weight=1)
-        
+
         # 송신 메시지 영역
-        send_frame = ttk.LabelFrame(text_container, text="송신 메시지")
-        send_frame.grid(row=0, column=0, sticky='nsew', padx=5)
-        
-        # 송신 텍스트 영역의 높이를 창 높이의 1/3로 설정
-        self.sent_text = tk.Text(send_frame, height=10)
-        self.sent_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        sent_scrollbar = ttk.Scrollbar(send_frame, command=self.sent_text.yview)
-        sent_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.sent_text.config(yscrollcommand=sent_scrollbar.set)
-        
+        self.sent_log = LogPane(text_container, "송신 메시지", max_lines=self.LOG_MAX_LINES)
+        self.sent_log.frame.grid(row=0, column=0, sticky='nsew', padx=5)
+        self.sent_text = self.sent_log.text
+
         # 수신 메시지 영역
-        recv_frame = ttk.LabelFrame(text_container, text="수신 메시지")
-        recv_frame.grid(row=0, column=1, sticky='nsew', padx=5)
-        
-        # 수신 텍스트 영역의 높이를 창 높이의 1/3로 설정
-        self.received_text = tk.Text(recv_frame, height=10)
-        self.received_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        recv_scrollbar = ttk.Scrollbar(recv_frame, command=self.received_text.yview)
-        recv_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.received_text.config(yscrollcommand=recv_scrollbar.set)
+        self.received_log = LogPane(text_container, "수신 메시지", max_lines=self.LOG_MAX_LINES)
+        self.received_log.frame.grid(row=0, column=1, sticky='nsew', padx=5)
+        self.received_text = self.received_log.text
 
         # 창 크기 변경 시 텍스트 영역 높이 조정
         self.root.bind('<Configure>', self.on_window_configure)
-    
+
+        # 상태 표시줄과 로그 영역은 일정한 주기로 한 번에 갱신
+        self.pending_label = None
+        self.root.after(self.UI_REFRESH_MS, self.refresh_ui)
+        self.root.after(self.METRICS_REFRESH_MS, self.refresh_metrics)
+
+        # 시작 시간 측정 (위젯 생성까지, 첫 화면 배치가 끝날 때까지)
+        self.build_time = time.perf_counter() - self.started_at
+        self.root.after_idle(self.report_startup_time)
+
+    def report_startup_time(self):
+        startup_time = time.perf_counter() - self.started_at
+        self.root.title(f"{self.root.title()} - 시작 {startup_time * 1000:.0f}ms")  # 상태 표시줄이 바뀌어도 남도록
+        self.update_label(f"시작 시간: {startup_time * 1000:.0f}ms (위젯 생성 {self.build_time * 1000:.0f}ms)")
+
     def on_window_configure(self, event):
         if event.widget == self.root:
             # 창 높이의 1/3을 텍스트 영역의 높이로 설정
@@ -257,142 +245,113 @@ class Application:
             text_height = int(window_height / 3 / 20)  # 대략적인 라인 수로 변환
             self.sent_text.config(height=text_height)
             self.received_text.config(height=text_height)
-    
-    def get_current_time(self):
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-    
+
     def update_label(self, text):
-        # GUI 업데이트는 메인 스레드에서 실행
-        self.root.after(0, lambda: self.label.config(text=text))
-    
+        # 마지막 상태만 다음 화면 갱신 때 표시
+        self.pending_label = text
+
     def update_received_text(self, text):
-        timestamp = self.get_current_time()
-        self.root.after(0, lambda: self.received_text.insert(tk.END, f"[{timestamp}] {text}\n"))
-        self.root.after(0, lambda: self.received_text.see(tk.END))
-    
+        self.received_log.append(text)
+
     def update_sent_text(self, text):
-        timestamp = self.get_current_time()
-        self.root.after(0, lambda: self.sent_text.insert(tk.END, f"[{timestamp}] {text}\n"))
-        self.root.after(0, lambda: self.sent_text.see(tk.END))
-    
-    def read_message_with_header(self, sock):
-        # 헤더 읽기 (5바이트)
-        header_data = sock.recv(5)
-        if not header_data or len(header_data) < 5:
-            return None
-        
-        # 헤더에서 메시지 길이 추출 (첫 4바이트)
-        message_length = struct.unpack('<I', header_data[:4])[0]
-        
-        # 메시지 읽기
-        message_data = sock.recv(message_length)
-        if not message_data or len(message_data) < message_length:
-            return None
-        
-        return message_data.decode('utf-8')
-    
-    def message_receiver_thread(self):
-        while self.is_server_running:
-            try:
-                with self.client_lock:
-                    if not self.current_client:
-                        time.sleep(0.01)  # 클라이언트가 없으면 10ms 대기
-                        continue
-                    
-                    # select를 사용하여 데이터 있는지 확인 (10ms 타임아웃)
-                    readable, _, _ = select.select([self.current_client], [], [], 0.01)
-                    
-                    if readable:
-                        # 데이터가 있는 동안 계속 읽기
-                        while True:
-                            try:
-                                # 소켓을 non-blocking 모드로 설정
-                                self.current_client.setblocking(False)
-                                json_str = self.read_message_with_header(self.current_client)
-                                
-                                if json_str:
-                                    try:
-                                        # JSON 파싱 및 처리
-                                        json_data = json.loads(json_str)
-                                        self.update_received_text(f"{json_str}")
-                                    except json.JSONDecodeError as e:
-                                        self.update_received_text(f"잘못된 JSON 형식: {json_str}")
-                                else:
-                                    break
-                                    
-                            except BlockingIOError:
-                                # 더 이상 읽을 데이터가 없음
-                                break
-                            except Exception as e:
-                                self.update_label(f"메시지 수신 중 오류: {str(e)}")
-                                break
-                        
-                        # 소켓을 다시 blocking 모드로 설정
-                        self.current_client.setblocking(True)
-                
-            except Exception as e:
-                self.update_label(f"수신 스레드 오류: {str(e)}")
-                time.sleep(0.01)  # 에러 발생 시 10ms 대기
-    
-    def create_message_with_header(self, json_data):
-        # JSON 데이터를 UTF-8로 인코딩
-        json_bytes = json_data.encode('utf-8')
-        # 데이터 길이 계산
-        data_length = len(json_bytes)
-        # 헤더 생성: 4바이트 길이 + 1바이트 0
-        # '<I' 는 리틀 엔디안 부호없는 정수(4바이트)
-        # 'B' 는 부호없는 char(1바이트)
-        header = struct.pack('<IB', data_length, 0)
-        # 헤더와 데이터 합치기
-        return header + json_bytes
-    
-    def message_sender_thread(self):
-        while self.is_server_running:
-            try:
-                try:
-                    json_message = self.message_queue.get(timeout=0.01)
-                    
-                    with self.client_lock:
-                        if self.current_client:
-                            full_message = self.create_message_with_header(json_message)
-                            self.current_client.send(full_message)
-                            self.update_sent_text(f"{json_message}")
-                            self.update_label(f"메시지 전송 완료 (크기: {len(json_message.encode('utf-8'))} 바이트)")
-                
-                except queue.Empty:
-                    continue
-                    
-            except Exception as e:
-                self.update_label(f"메시지 전송 중 오류 발생: {str(e)}")
-                with self.client_lock:
-                    if self.current_client:
-                        self.current_client.close()
-                        self.current_client = None
-    
-    def handle_client(self, client_socket, addr):
-        try:
-            with self.client_lock:
-                self.current_client = client_socket
-            
-            message = {
-                "SOCKET_ENABLE": True
-            }
-            json_message = json.dumps(message)
-            self.message_queue.put(json_message)
-            
-            while self.is_server_running:
-                time.sleep(0.1)
-                
-        except Exception as e:
-            self.update_label(f"클라이언트 처리 중 오류 발생: {str(e)}")
-        finally:
-            with self.client_lock:
-                if self.current_client == client_socket:
-                    self.current_client = None
-            client_socket.close()
-    
-    def start_server(self):
-        try:
+        self.sent_log.append(text)
+
+    def refresh_ui(self):
+        """상태 표시줄과 로그 영역을 모아서 갱신 (UI_REFRESH_MS마다 메인 스레드에서 실행)"""
+        text = self.pending_label
+        if text is not None:
+            self.pending_label = None
+            self.label.config(text=text)
+        self.sent_log.flush()
+        self.received_log.flush()
+        if not self.simulator.is_replaying:
+            self.playing_button = None
+        for button, idle_text, stop_text in (
+            (self.replay_button, "캡처 재생", "재생 중지"),
+            (self.scenario_button, "시나리오 실행", "시나리오 중지"),
+        ):
+            text = stop_text if self.playing_button is button else idle_text
+            if button.cget("text") != text:
+                button.config(text=text)
+        self.sync_state_sections()
+        self.root.after(self.UI_REFRESH_MS, self.refresh_ui)
+
+    def refresh_metrics(self):
+        """송신 지연과 큐 깊이 지표 갱신 (METRICS_REFRESH_MS마다 메인 스레드에서 실행)"""
+        self.metrics_label.config(text="\n".join(self.simulator.metrics_lines()))
+        self.root.after(self.METRICS_REFRESH_MS, self.refresh_metrics)
+
+    def reset_metrics(self):
+        self.simulator.metrics.reset()
+        if self.simulator.round_trip is not None:
+            self.simulator.round_trip.reset()
+
+    def toggle_round_trip(self):
+        """왕복 시간 측정 시작/중지"""
+        if self.round_trip_var.get():
+            self.simulator.start_round_trip()
+        else:
+            self.simulator.stop_round_trip()
+
+    def dump_metrics(self):
+        """현재 지표를 JSON 파일로 저장"""
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            initialfile=datetime.now().strftime("metrics_%Y%m%d_%H%M%S.json"),
+            filetypes=[("JSON", "*.json"), ("All files", "*.*")]
+        )
+        if path:
+            self.simulator.dump_metrics(path)
+
+    def open_received_view(self):
+        """수신 메시지 검색 창 열기 (이미 열려 있으면 앞으로)"""
+        if self.received_view is not None and self.received_view.window.winfo_exists():
+            self.received_view.window.lift()
+            self.received_view.search()
+            return
+        self.received_view = ReceivedView(self.root, self.simulator)
+
+    def build_arm_panel(self, parent, arm_idx):
+        """Arm 한 개의 패널 생성 (ArmView가 화면에 보일 때 호출)"""
+        # Arm을 위한 LabelFrame 생성 (로봇에 속한 Arm은 로봇 이름도 표시)
+        robot = self.topology.robot_of(arm_idx)
+        title = f"Arm {arm_idx + 1}" + (f" ({robot.name})" if robot is not None else "")
+        arm_frame = ttk.LabelFrame(parent, text=title)
+
+        # 각 상태 옵션에 대한 접이식 영역 생성 (라디오 버튼은 처음 펼칠 때 생성)
+        self.state_sections[arm_idx] = {
+            state_name: StateSection(arm_frame, self.simulator, arm_idx, state_name, options)
+            for state_name, options in self.state_options.items()
+        }
+
+        # 메시지 전송 버튼 추가
+        send_button = ttk.Button(
+            arm_frame,
+            text="메시지 전송",
+            command=lambda i=arm_idx: self.simulator.send_arm_state(i)
+        )
+        send_button.pack(pady=10)
+        return arm_frame
+
+    def release_arm_panel(self, arm_idx):
+        """화면에서 멀어져 없앤 Arm 패널의 상태 영역 정리"""
+        self.state_sections.pop(arm_idx, None)
+
+    def send_selected_robot_config(self):
+        self.simulator.send_named_robot_config(self.robot_var.get())
+
+    def sync_state_sections(self):
+        """시뮬레이터에서 바뀐 상태(스왑페달, 전체 활성화 등)를 상태 영역에 반영 (메인 스레드에서 실행)"""
+        states = self.simulator.states
+        if states.version == self.states_version:
+            return
+        self.states_version, modes, enabled, _ = states.snapshot()
+        for sections in self.state_sections.values():
+            for section in sections.values():
+                section.sync(states, modes, enabled)
+
+    def toggle_server(self):
+        if not self.simulator.is_server_running:
             # IP와 포트 번호 가져오기
             ip = self.ip_var.get()
             try:
@@ -400,332 +359,150 @@ class Application:
             except ValueError:
                 self.update_label("잘못된 포트 번호입니다.")
                 return
-
-            # 이전 연결 정리
-            try:
-                temp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                temp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-                temp_socket.bind((ip, port))
-                temp_socket.close()
-            except Exception as e:
-                self.update_label(f"이전 연결 정리 중 오류: {str(e)}")
-
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # 소켓 재사용 옵션 추가
-            self.server_socket.bind((ip, port))
-            self.server_socket.listen(1)
-            self.is_server_running = True
-            self.update_label(f"서버가 시작되었습니다. ({ip}:{port}) 연결 대기중...")
-            
-            # 메시지 송수신 스레드 시작
-            sender_thread = threading.Thread(target=self.message_sender_thread)
-            sender_thread.daemon = True
-            sender_thread.start()
-            
-            receiver_thread = threading.Thread(target=self.message_receiver_thread)
-            receiver_thread.daemon = True
-            receiver_thread.start()
-            
-            while self.is_server_running:
-                try:
-                    self.server_socket.settimeout(1.0)
-                    client_socket, addr = self.server_socket.accept()
-                    client_thread = threading.Thread(
-                        target=self.handle_client,
-                        args=(client_socket, addr)
-                    )
-                    client_thread.start()
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    if self.is_server_running:
-                        self.update_label(f"연결 처리 중 오류 발생: {str(e)}")
-                    break
-            
-        except Exception as e:
-            self.update_label(f"서버 시작 실패: {str(e)}")
-            self.is_server_running = False
-    
-    def toggle_server(self):
-        if not self.is_server_running:
             self.button.config(text="서버 중지")
-            server_thread = threading.Thread(target=self.start_server)
-            server_thread.daemon = True
-            server_thread.start()
+            self.simulator.start_server_thread(ip, port)
         else:
-            self.is_server_running = False
-            if self.server_socket:
-                self.server_socket.close()
+            self.simulator.stop_server()
             self.button.config(text="서버 시작")
             self.update_label("서버가 중지되었습니다.")
-    
+
     def run(self):
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)  # 창 닫기 이벤트 처리
         self.root.mainloop()
-   
+
     def on_closing(self):
-        self.is_auto_sending = False  # 자동 전송 중지
-        if self.auto_send_thread:
-            self.auto_send_thread.join(timeout=1.1)
-        
-        self.is_swap_pedal_auto = False  # 스왑페달 자동 시작 중지
-        if self.swap_pedal_auto_thread:
-            self.swap_pedal_auto_thread.join(timeout=1.1)
-        
-        self.is_server_running = False
-        if self.server_socket:
-            self.server_socket.close()
+        self.simulator.shutdown()  # 자동 전송, 스왑페달 자동 시작, 서버 중지
         self.root.destroy()
 
-    def toggle_state_expansion(self, arm, state_name, container):
-        """상태 영역 확장/축소 및 활성화/비활성화 토글"""
-        is_expanded = self.state_expanded[arm][state_name].get()
-        self.state_expanded[arm][state_name].set(not is_expanded)
-        self.state_enabled[arm][state_name].set(not is_expanded)
-        
-        # 컨테이너의 모든 자식 위젯 중 content_frame 찾기
-        content_frame = None
-        for child in container.winfo_children():
-            if isinstance(child, ttk.Frame) and child.winfo_children() and \
-               isinstance(child.winfo_children()[0], ttk.Radiobutton):
-                content_frame = child
-                break
-        
-        if content_frame:
-            if not is_expanded:  # 현재 접혀있으면 펼치기
-                content_frame.pack(fill='x', padx=20)
-                # 트레이 아이콘 업데이트
-                for child in container.winfo_children()[0].winfo_children():  # header frame의 자식들
-                    if isinstance(child, ttk.Button):
-                        child.configure(text="[-]")
-                        break
-                # 라디오 버튼 활성화
-                for radio in content_frame.winfo_children():
-                    radio.state(['!disabled'])
-            else:  # 현재 펼쳐있으면 접기
-                content_frame.pack_forget()
-                # 트레이 아이콘 업데이트
-                for child in container.winfo_children()[0].winfo_children():  # header frame의 자식들
-                    if isinstance(child, ttk.Button):
-                        child.configure(text="[+]")
-                        break
-                # 라디오 버튼 비활성화
-                for radio in content_frame.winfo_children():
-                    radio.state(['disabled'])
-
-    def send_arm_state(self, arm):
-        """특정 Arm의 변경된 상태만 전송하는 메서드"""
-        changed_states = {}
-        arm_index = int(arm.split()[-1]) - 1
-
-        for state_name in self.state_options.keys():
-            # 상태가 비활성화되어 있으면 건너뛰기
-            if not self.state_expanded[arm][state_name].get():
-                continue
-                
-            current_value = self.state_vars[arm][state_name].get()
-            options = self.state_options[state_name]
-            
-            if current_value == "change":
-                # 이전 상태와 다른 값을 선택하기 위해 가능한 값들의 리스트 생성
-                possible_values = list(range(len(options[2:])))  # change와 random을 제외한 실제 값들의 인덱스 리스트
-                
-                # 이전 상태가 있으면 해당 값 제외
-                if self.previous_states[arm].get(state_name) is not None:
-                    try:
-                        possible_values.remove(self.previous_states[arm][state_name])
-                    except ValueError:
-                        pass
-                
-                # 남은 값들 중에서 무작위 선택
-                if possible_values:
-                    value = random.choice(possible_values)
-                else:
-                    # 가능한 값이 하나밖에 없는 경우 (이전 상태가 유일한 값이었을 경우)
-                    value = 0
-                
-                changed_states[state_name.lower()] = value
-                self.previous_states[arm][state_name] = value
-                
-            elif current_value == "random":
-                value = random.randint(0, len(options[2:]) - 1)  # change와 random을 제외한 값들 중에서 선택
-                
-                # 이전 상태와 비교하여 변경된 경우에만 추가
-                if value != self.previous_states[arm].get(state_name):
-                    changed_states[state_name.lower()] = value
-                    self.previous_states[arm][state_name] = value
-                    
-            else:
-                # change와 random을 제외한 실제 값들 중에서 인덱스 찾기
-                value = options[2:].index(current_value)
-                
-                # 이전 상태와 비교하여 변경된 경우에만 추가
-                if value != self.previous_states[arm].get(state_name):
-                    changed_states[state_name.lower()] = value
-                    self.previous_states[arm][state_name] = value
-
-        # 변경된 상태가 있는 경우에만 메시지 전송
-        if changed_states:
-            message = {
-                "REPORT_TO_GUI": 0,
-                "arm_index": arm_index,
-                **changed_states
-            }
-            
-            json_message = json.dumps(message)
-            self.message_queue.put(json_message)
-
-    def toggle_auto_send(self):
-        """자동 전송 시작/중지 토글"""
-        if not self.is_auto_sending:
-            self.is_auto_sending = True
-            self.auto_send_button.config(text="자동전송 중지")
-            
-            # 자동 전송 스레드 시작
-            self.auto_send_thread = threading.Thread(target=self.auto_send_messages)
-            self.auto_send_thread.daemon = True
-            self.auto_send_thread.start()
-        else:
-            self.is_auto_sending = False
-            self.auto_send_button.config(text="메시지 자동전송")
-            if self.auto_send_thread:
-                self.auto_send_thread.join(timeout=1.1)  # 스레드가 완전히 종료될 때까지 대기
-                self.auto_send_thread = None
-
-    def auto_send_messages(self):
-        """자동으로 각 Arm의 메시지 전송 버튼을 무작위로 클릭"""
+    def get_interval(self):
+        """Interval 입력값을 초 단위로 반환"""
         try:
             # interval 값 가져오기 (ms 단위를 초 단위로 변환)
-            interval = float(self.interval_var.get()) / 1000.0
+            return float(self.interval_var.get()) / 1000.0
         except ValueError:
             # interval 값이 잘못된 경우 기본값(1초) 사용
             self.interval_var.set("1000")
-            interval = 1.0
-
-        # 활성화된 상태가 있는 Arm들 찾기
-        active_arms = []
-        for arm_idx in range(1, self.NUM_ARMS + 1):  # 1부터 NUM_ARMS까지
-            arm = f"Arm {arm_idx}"
-            # 해당 Arm의 활성화된 상태가 있는지 확인
-            if any(self.state_expanded[arm][state_name].get() 
-                  for state_name in self.state_options.keys()):
-                active_arms.append(arm)
-        
-        if not active_arms:
-            self.is_auto_sending = False
-            self.auto_send_button.config(text="메시지 자동전송")
-            return
+            return 1.0
 
-        while self.is_auto_sending:
-            # 활성화된 Arm들 중에서 무작위로 선택
-            arm = random.choice(active_arms)
-            
-            # 선택된 Arm의 상태 전송
-            self.send_arm_state(arm)
-            
-            # interval 시간만큼 대기
-            time.sleep(interval)
-
-    def swap_pedal(self):
-        """Arm1과 Arm2의 is_selected 상태를 서로 교환하고 메시지 전송"""
-        # Arm1과 Arm2의 is_selected 상태 가져오기
-        arm1_selected = self.state_vars["Arm 1"]["is_selected"].get()
-        arm2_selected = self.state_vars["Arm 2"]["is_selected"].get()
-        
-        # 상태 교환
-        self.state_vars["Arm 1"]["is_selected"].set(arm2_selected)
-        self.state_vars["Arm 2"]["is_selected"].set(arm1_selected)
-        
-        # Arm1 메시지 전송
-        self.send_arm_state("Arm 1")
-        
-        # Arm3 메시지 전송
-        self.send_arm_state("Arm 2")
+    def toggle_auto_send(self):
+        """자동 전송 시작/중지 토글"""
+        if not self.simulator.is_auto_sending:
+            # 활성화된 상태가 있는 Arm이 없으면 시작하지 않음
+            try:
+                started = self.simulator.start_auto_send(self.get_interval())
+            except ValueError as e:
+                self.update_label(f"자동 전송을 시작할 수 없습니다: {str(e)}")
+                return
+            if started:
+                self.auto_send_button.config(text="자동전송 중지")
+        else:
+            self.simulator.stop_auto_send()
+            self.auto_send_button.config(text="메시지 자동전송")
 
     def toggle_swap_pedal_auto(self):
         """스왑페달 자동 시작/중지 토글"""
-        if not self.is_swap_pedal_auto:
-            self.is_swap_pedal_auto = True
+        if not self.simulator.is_swap_pedal_auto:
+            try:
+                self.simulator.start_swap_pedal_auto(self.get_interval())
+            except ValueError as e:
+                self.update_label(f"스왑페달 자동 시작을 할 수 없습니다: {str(e)}")
+                return
             self.swap_pedal_auto_button.config(text="스왑페달자동중지")
-            
-            # 스왑페달 자동 시작 스레드 시작
-            self.swap_pedal_auto_thread = threading.Thread(target=self.auto_swap_pedal)
-            self.swap_pedal_auto_thread.daemon = True
-            self.swap_pedal_auto_thread.start()
         else:
-            self.is_swap_pedal_auto = False
+            self.simulator.stop_swap_pedal_auto()
             self.swap_pedal_auto_button.config(text="스왑페달자동시작")
-            if self.swap_pedal_auto_thread:
-                self.swap_pedal_auto_thread.join(timeout=1.1)
-                self.swap_pedal_auto_thread = None
 
-    def auto_swap_pedal(self):
-        """자동으로 스왑페달 동작을 반복"""
-        try:
-            # interval 값 가져오기 (ms 단위를 초 단위로 변환)
-            interval = float(self.interval_var.get()) / 1000.0
-        except ValueError:
-            # interval 값이 잘못된 경우 기본값(1초) 사용
-            self.interval_var.set("1000")
-            interval = 1.0
+    def toggle_capture(self):
+        """송수신 프레임 캡처 시작/중지 토글"""
+        if not self.simulator.capture:
+            path = filedialog.asksaveasfilename(
+                defaultextension=".gsc",
+                initialfile=datetime.now().strftime("capture_%Y%m%d_%H%M%S.gsc"),
+                filetypes=[("Capture", "*.gsc"), ("All files", "*.*")]
+            )
+            if not path:
+                return
+            self.simulator.start_capture(path)
+            self.capture_button.config(text="캡처 중지")
+        else:
+            self.simulator.stop_capture()
+            self.capture_button.config(text="캡처 시작")
+
+    def toggle_replay(self):
+        """캡처 파일 재생 시작/중지 (Interval 값과 무관하게 기록된 시각대로 재생)"""
+        if not self.simulator.is_replaying:
+            path = filedialog.askopenfilename(filetypes=[("Capture", "*.gsc"), ("All files", "*.*")])
+            if not path:
+                return
+            self.simulator.start_replay(path)
+            self.playing_button = self.replay_button
+        else:
+            self.simulator.stop_replay()
 
-        while self.is_swap_pedal_auto:
-            # 스왑페달 동작 실행
-            self.swap_pedal()
-            
-            # interval 시간만큼 대기
-            time.sleep(interval)
+    def toggle_scenario(self):
+        """시나리오 파일을 컴파일하여 실행/중지"""
+        if not self.simulator.is_replaying:
+            path = filedialog.askopenfilename(
+                filetypes=[("Scenario", "*.yaml *.yml *.json"), ("All files", "*.*")]
+            )
+            if not path:
+                return
+            import scenario
+
+            try:
+                compiled_scenario = scenario.compile_file(path, topology=self.topology)
+            except (OSError, ValueError) as e:
+                self.update_label(f"시나리오를 읽을 수 없습니다: {str(e)}")
+                return
+            self.simulator.start_scenario(compiled_scenario)
+            self.playing_button = self.scenario_button
+        else:
+            self.simulator.stop_replay()
+
+    def toggle_load_ramp(self):
+        """Interval 값에 해당하는 속도부터 전송 속도를 올리며 GUI 포화점 측정 시작/중지"""
+        import ramp
+
+        if self.load_ramp is not None and self.load_ramp.is_running:
+            self.load_ramp.stop()
+            return
+        interval = self.get_interval()
+        # Interval이 0이면 (최대한 빨리 전송) 기본 시작 속도 사용
+        start_rate = 1.0 / interval if interval > 0 else ramp.LoadRamp.DEFAULT_START_RATE
+        self.load_ramp = ramp.LoadRamp(self.simulator, start_rate=start_rate)
+        self.ramp_button.config(text="부하 테스트 중지")
+        ramp.start_in_thread(self.load_ramp, on_done=self.load_ramp_done)
+
+    def load_ramp_done(self, load_ramp):
+        """부하 테스트 보고서를 현재 폴더에 저장 (부하 테스트 스레드에서 호출)"""
+        path = datetime.now().strftime("ramp_%Y%m%d_%H%M%S.json")
+        load_ramp.save(path)
+        self.update_label(f"부하 테스트 완료: 최대 {load_ramp.report['sustainable_rate']:.0f} msg/s, 보고서 {path}")
+        self.root.after(0, lambda: self.ramp_button.config(text="부하 테스트"))
 
     def toggle_headin(self):
         """headin 값을 0, 1, 2, 3 사이에서 순환하고 메시지 전송"""
-        self.headin = (self.headin + 1) % 4
-        self.headin_button.config(text=f"headin: {self.headin}")
-        
-        # headin 메시지 전송
-        message = {
-            "REPORT_TO_GUI": 1,
-            "arm_index": -1,
-            "head_in": self.headin
-        }
-        json_message = json.dumps(message)
-        self.message_queue.put(json_message)
-
-    def send_sr_a_config(self):
-        """SR-A호기 설정 메시지 전송"""
-        message1 = {
-            "REPORT_TO_GUI": 0,
-            "robot_number": 1,
-            "arm_index": 0
-        }
-        json_message1 = json.dumps(message1)
-        self.message_queue.put(json_message1)
-        
-        message2 = {
-            "REPORT_TO_GUI": 0,
-            "robot_number": 1,
-            "arm_index": 1
-        }
-        json_message2 = json.dumps(message2)
-        self.message_queue.put(json_message2)
-
-    def send_sr_b_config(self):
-        """SR-B호기 설정 메시지 전송"""
-        message1 = {
-            "REPORT_TO_GUI": 0,
-            "robot_number": 2,
-            "arm_index": 2
-        }
-        json_message1 = json.dumps(message1)
-        self.message_queue.put(json_message1)
-        
-        message2 = {
-            "REPORT_TO_GUI": 0,
-            "robot_number": 2,
-            "arm_index": 3
-        }
-        json_message2 = json.dumps(message2)
-        self.message_queue.put(json_message2)
+        self.simulator.toggle_headin()
+
+    def update_headin_button(self, headin):
+        self.root.after(0, lambda: self.headin_button.config(text=f"headin: {headin}"))
 
 if __name__ == "__main__":
-    app = Application()
-    app.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Service message simulator for GUI testing")
+    parser.add_argument("--topology", help="Arm과 로봇 구성 파일 (.json, topology.py 참고)")
+    parser.add_argument("--arms", type=int, help=f"Arm 개수 (기본값 {NUM_ARMS}, --topology가 없을 때)")
+    parser.add_argument("--arms-per-robot", type=int, help="로봇 한 대의 Arm 수 (기본값 2, --topology가 없을 때)")
+    transport.add_arguments(parser)
+    impairment.add_arguments(parser)
+    args = parser.parse_args()
+    try:
+        link_impairment = impairment.from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    app = Application(
+        topology.from_args(args.topology, args.arms, args.arms_per_robot),
+        transport.from_args(args),
+        link_impairment,
+    )
+    app.run()
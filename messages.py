@@ -0,0 +1,97 @@
+import json
+import struct
+
+from framing import HEADER_FORMAT, HEADER_SIZE, create_message_with_header
+
+# 상태 옵션 정의 (앞의 두 항목 "change", "random"은 값 선택 모드)
+NUM_ARMS = 4  # Arm의 개수 정의
+STATE_OPTIONS = {
+    "is_connected": ["change", "random", "false", "true"],
+    "is_selected": ["change", "random", "false", "true"],
+    "is_tracking": ["change", "random", "false", "true"],
+    "is_instrument": ["change", "random", "false", "true"],
+    "instrument_type": ["change", "random", "none", "fene forceps", "mary dissector", "pre dissector", "clinch forceps", "clip applier", "needle holder", "pre needle", "suture needle", "mono hook", "mono spatular", "mono pre dissector", "mono scissors", "bi fene forceps", "bi mary dissector", "bi pre dissector", "bi blunt dissector"],
+    "endoscope_type": ["change", "random", "none", "0 endoscope", "30 endoscope"],
+    "homing_type": ["change", "random", "unknown", "done", "drape", "end effector", "slide"],
+    "is_clutched": ["change", "random", "false", "true"],
+    "esu_state": ["change", "random", "none", "coag", "cut"],
+    "manual_type": ["change", "random", "none", "op", "su", "slide"],
+    "is_drape": ["change", "random", "false", "true"],
+    "is_trocar": ["change", "random", "false", "true"]
+}
+
+_header = struct.Struct(HEADER_FORMAT)
+
+
+def with_seq(frame, seq):
+    """JSON 객체 프레임의 끝에 "seq" 필드를 추가한 새 프레임 (왕복 시간 측정용)"""
+    _, flag = _header.unpack_from(frame)
+    payload = b"%s, \"seq\": %d}" % (frame[HEADER_SIZE:-1], seq)
+    return _header.pack(len(payload), flag) + payload
+
+
+class MessageCache:
+    """미리 인코딩한 메시지 조각과 값 -> 인덱스 표
+
+    REPORT_TO_GUI 메시지는 json.dumps 결과와 바이트 단위로 같은 형식을 조각 단위로
+    미리 만들어 두고, 전송 시에는 조각을 이어 붙이기만 한다. robot_number 설정, headin,
+    SOCKET_ENABLE처럼 값이 몇 개뿐인 메시지는 헤더까지 붙인 프레임을 그대로 저장한다.
+    """
+
+    def __init__(self, num_arms=NUM_ARMS, state_options=STATE_OPTIONS):
+        self.num_arms = num_arms
+
+        # 상태별 실제 값 목록 ("change", "random" 제외)과 값 -> 인덱스 표
+        self.state_values = {name: options[2:] for name, options in state_options.items()}
+        self.value_count = {name: len(values) for name, values in self.state_values.items()}
+        self.value_index = {
+            name: {value: index for index, value in enumerate(values)}
+            for name, values in self.state_values.items()
+        }
+
+        # ', "state_name": index' 조각
+        self.field_fragments = {
+            name: [f', {json.dumps(name.lower())}: {index}'.encode('utf-8') for index in range(len(values))]
+            for name, values in self.state_values.items()
+        }
+
+        # '{"REPORT_TO_GUI": 0, "arm_index": n' 조각
+        self.arm_prefixes = [self.arm_prefix(arm_index) for arm_index in range(num_arms)]
+
+        self.socket_enable_frame = create_message_with_header(json.dumps({"SOCKET_ENABLE": True}))
+        self.headin_frames = [
+            create_message_with_header(json.dumps({"REPORT_TO_GUI": 1, "arm_index": -1, "head_in": headin}))
+            for headin in range(4)
+        ]
+        self._robot_config_frames = {}
+
+    def arm_prefix(self, arm_index):
+        return f'{{"REPORT_TO_GUI": 0, "arm_index": {arm_index}'.encode('utf-8')
+
+    def arm_state_frame(self, arm_index, fragments):
+        """field_fragments에서 고른 조각들로 Arm 상태 프레임 생성"""
+        if arm_index < len(self.arm_prefixes):
+            prefix = self.arm_prefixes[arm_index]
+        else:
+            prefix = self.arm_prefix(arm_index)
+        payload = b"".join((prefix, *fragments, b"}"))
+        return _header.pack(len(payload), 0) + payload
+
+    def arm_state_fields_frame(self, arm_index, fields):
+        """{state_name: 조각}으로 Arm 상태 프레임 생성 (필드 순서는 STATE_OPTIONS 순서)"""
+        return self.arm_state_frame(arm_index, [fields[name] for name in self.state_values if name in fields])
+
+    def robot_config_frame(self, robot_number, arm_index):
+        key = (robot_number, arm_index)
+        frame = self._robot_config_frames.get(key)
+        if frame is None:
+            frame = create_message_with_header(json.dumps({
+                "REPORT_TO_GUI": 0,
+                "robot_number": robot_number,
+                "arm_index": arm_index
+            }))
+            self._robot_config_frames[key] = frame
+        return frame
+
+    def headin_frame(self, headin):
+        return self.headin_frames[headin]
@@ -0,0 +1,221 @@
+import json
+import time
+
+# 송신 경로의 단계별 지연 (ns)
+LATENCY_STAGES = {
+    "dispatch": "디스패치",  # 송신 큐에 넣은 뒤 디스패처가 꺼낼 때까지
+    "queue_wait": "큐 대기",  # 송신 큐에 넣은 뒤 클라이언트 송신 태스크가 꺼낼 때까지
+    "write": "소켓 쓰기",  # transport.writelines 호출 시간 (배치당 1회)
+    "end_to_end": "전체",  # 송신 큐에 넣은 뒤 소켓 쓰기가 끝날 때까지
+}
+
+# 큐 깊이 (메시지 수)
+DEPTH_STAGES = {
+    "queue_depth": "송신 큐",  # 디스패처가 꺼낼 때의 송신 큐 길이
+    "client_queue_depth": "클라이언트 큐",  # 클라이언트 송신 태스크가 꺼낼 때의 큐 길이
+}
+
+
+class Histogram:
+    """HDR 방식(로그-선형 버킷)의 정수 값 히스토그램
+
+    2진 자릿수마다 2**sub_bucket_bits개의 선형 버킷으로 나누므로 상대 오차가
+    1/2**sub_bucket_bits 이내이고, 버킷 수는 값의 범위에 대해 로그로만 늘어난다.
+    record()는 정수 연산 몇 번과 리스트 원소 증가 한 번이다. max_value보다 큰 값은
+    max_value로 기록한다.
+    """
+
+    def __init__(self, sub_bucket_bits=5, max_value=1 << 40):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.max_value = max_value
+        self.counts = [0] * (self._index(max_value) + 1)
+        self.reset()
+
+    def reset(self):
+        for index in range(len(self.counts)):
+            self.counts[index] = 0
+        self.count = 0
+        self.total = 0
+        self.min = self.max_value
+        self.max = 0
+
+    def _index(self, value):
+        bits = value.bit_length()
+        if bits <= self.sub_bucket_bits + 1:
+            return value
+        shift = bits - self.sub_bucket_bits - 1
+        return (shift << self.sub_bucket_bits) + (value >> shift)
+
+    def _bucket_range(self, index):
+        """버킷에 들어가는 값의 (최솟값, 최댓값)"""
+        if index < 2 << self.sub_bucket_bits:
+            return index, index
+        shift = (index >> self.sub_bucket_bits) - 1
+        mantissa = index - (shift << self.sub_bucket_bits)
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, value):
+        if value < 0:
+            value = 0
+        elif value > self.max_value:
+            value = self.max_value
+
+        bits = value.bit_length()
+        if bits <= self.sub_bucket_bits + 1:
+            index = value
+        else:
+            shift = bits - self.sub_bucket_bits - 1
+            index = (shift << self.sub_bucket_bits) + (value >> shift)
+        self.counts[index] += 1
+
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def record_since(self, now, stamps):
+        """stamps의 각 시각부터 now까지의 경과 시간을 한 번에 기록 (배치 단위 기록용)"""
+        if not stamps:
+            return
+        counts = self.counts
+        sub_bits = self.sub_bucket_bits
+        linear_bits = sub_bits + 1
+        max_value = self.max_value
+        total = 0
+        for stamp in stamps:
+            value = now - stamp
+            if value < 0:
+                value = 0
+            elif value > max_value:
+                value = max_value
+            total += value
+            bits = value.bit_length()
+            if bits <= linear_bits:
+                counts[value] += 1
+            else:
+                shift = bits - linear_bits
+                counts[(shift << sub_bits) + (value >> shift)] += 1
+
+        self.count += len(stamps)
+        self.total += total
+        smallest = min(max(now - max(stamps), 0), max_value)
+        largest = min(max(now - min(stamps), 0), max_value)
+        if smallest < self.min:
+            self.min = smallest
+        if largest > self.max:
+            self.max = largest
+
+    def merge(self, other):
+        """같은 설정의 다른 히스토그램 값을 더함 (여러 프로세스의 통계 합산용)"""
+        if other.sub_bucket_bits != self.sub_bucket_bits or other.max_value != self.max_value:
+            raise ValueError("버킷 설정이 다른 히스토그램은 합칠 수 없습니다.")
+        if not other.count:
+            return
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.min < self.min:
+            self.min = other.min
+        if other.max > self.max:
+            self.max = other.max
+
+    def percentile(self, percent):
+        """percent(0~100) 백분위 값 (버킷의 최댓값, 실제 최댓값을 넘지 않음)"""
+        if not self.count:
+            return 0
+        target = max(1, int(self.count * percent / 100.0 + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                seen += count
+                if seen >= target:
+                    return min(self._bucket_range(index)[1], self.max)
+        return self.max
+
+    def buckets(self):
+        """비어 있지 않은 버킷의 (최솟값, 개수) 목록"""
+        return [(self._bucket_range(index)[0], count) for index, count in enumerate(self.counts) if count]
+
+    def summary(self, scale=1.0):
+        """개수, 평균, 백분위 통계 (값에 scale을 곱해서 반환)"""
+        return {
+            "count": self.count,
+            "min": (self.min if self.count else 0) * scale,
+            "mean": (self.total / self.count if self.count else 0.0) * scale,
+            "p50": self.percentile(50) * scale,
+            "p90": self.percentile(90) * scale,
+            "p99": self.percentile(99) * scale,
+            "p999": self.percentile(99.9) * scale,
+            "max": self.max * scale,
+        }
+
+
+def format_duration(ns):
+    if ns >= 1000000:
+        return f"{ns / 1000000.0:.2f}ms"
+    return f"{ns / 1000.0:.1f}us"
+
+
+class PipelineMetrics:
+    """송신 경로의 단계별 지연과 큐 깊이 히스토그램
+
+    메시지는 송신 큐에 넣을 때(enqueue), 클라이언트 송신 태스크가 꺼낼 때(dequeue),
+    소켓에 쓴 직후(write)에 시각이 기록되고, 기록은 모두 이벤트 루프 스레드에서 한다.
+    GUI가 오래된 상태를 보일 때 시뮬레이터 안에서 밀린 것인지 확인하는 데 쓴다.
+    """
+
+    def __init__(self):
+        self.latency = {name: Histogram() for name in LATENCY_STAGES}
+        self.depth = {name: Histogram() for name in DEPTH_STAGES}
+        self.started_at = time.time()
+
+    def reset(self):
+        for histogram in list(self.latency.values()) + list(self.depth.values()):
+            histogram.reset()
+        self.started_at = time.time()
+
+    def snapshot(self, buckets=False):
+        """지연(us)과 큐 깊이 통계 (buckets=True이면 원본 버킷 포함)"""
+        result = {
+            "started_at": self.started_at,
+            "elapsed_s": time.time() - self.started_at,
+            "latency_us": {name: histogram.summary(1e-3) for name, histogram in self.latency.items()},
+            "depth": {name: histogram.summary() for name, histogram in self.depth.items()},
+        }
+        if buckets:
+            result["latency_buckets_ns"] = {name: histogram.buckets() for name, histogram in self.latency.items()}
+            result["depth_buckets"] = {name: histogram.buckets() for name, histogram in self.depth.items()}
+        return result
+
+    def dump(self, path, **extra):
+        """현재 통계를 JSON 파일로 저장"""
+        data = self.snapshot(buckets=True)
+        data["dumped_at"] = time.time()
+        data.update(extra)
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    def format_lines(self, queue_depth=None):
+        """상태 표시줄에 출력할 요약 문자열 목록"""
+        lines = []
+        for name, label in LATENCY_STAGES.items():
+            histogram = self.latency[name]
+            lines.append(
+                f"{label:<6} p50 {format_duration(histogram.percentile(50)):>9}"
+                f"  p99 {format_duration(histogram.percentile(99)):>9}"
+                f"  p99.9 {format_duration(histogram.percentile(99.9)):>9}"
+                f"  max {format_duration(histogram.max):>9}  ({histogram.count})"
+            )
+        depths = []
+        if queue_depth is not None:
+            depths.append(f"현재 {queue_depth}")
+        for name, label in DEPTH_STAGES.items():
+            histogram = self.depth[name]
+            depths.append(f"{label} p99 {histogram.percentile(99)} / 최대 {histogram.max}")
+        lines.append("큐 깊이  " + ", ".join(depths))
+        return lines
@@ -0,0 +1,263 @@
+import json
+import random
+import threading
+import time
+
+
+class LoadRamp:
+    """전송 속도를 단계적으로 올려 GUI가 따라오지 못하는 지점(포화점)을 찾는 부하 테스트
+
+    각 단계마다 rate(messages/s)로 step_duration초 동안 활성화된 Arm들의 상태를 보내면서
+    포화 신호를 관찰한다:
+      - 송신 큐 + 클라이언트 큐 깊이가 계속 늘어남
+      - 소켓에 쓰지 못한 transport 쓰기 버퍼가 max_write_buffer를 넘음
+      - 쓰기 버퍼가 가득 차 송신을 멈춘 시간 비율이 max_blocked_fraction을 넘음
+      - 송신 지연(end_to_end p99) 또는 GUI 응답 왕복 시간(RTT p99)이 한도를 넘음
+      - 송신 큐나 클라이언트 큐에서 버리거나 병합한 메시지가 생김 (보낸 만큼 GUI가 받지 못함)
+      - 만든 속도(generated_rate)가 목표의 min_achieved 미만 (시뮬레이터 자체의 한계)
+    처리량은 실제로 보낸 메시지 수(sent_rate)로 재며, 병합된 메시지가 처리량으로 잡히지
+    않도록 실행하는 동안에는 송신 큐의 conflate 정책을 drop_oldest로 바꿨다가 되돌린다.
+    신호가 하나라도 나타나면 멈추고, 직전 단계의 sent_rate를 지속 가능한 최대 속도로 보고한다.
+    단계를 시작할 때마다 시뮬레이터의 지연 지표를 초기화한다.
+    """
+
+    STREAM_NAME = "load_ramp"
+    SAMPLE_INTERVAL = 0.1  # 큐 깊이, 쓰기 버퍼 샘플링 간격 (초)
+    DEFAULT_START_RATE = 100.0  # 시작 속도 (msg/s)
+
+    def __init__(self, simulator, start_rate=DEFAULT_START_RATE, factor=1.5, max_rate=100000.0, step_duration=5.0,
+                 max_latency_ms=50.0, max_rtt_ms=None, max_write_buffer=1 << 20,
+                 max_blocked_fraction=0.1, max_queue_depth=1000, min_achieved=0.9, tick=0.001):
+        if start_rate <= 0 or factor <= 1.0:
+            raise ValueError("start_rate는 0보다, factor는 1보다 커야 합니다.")
+
+        self.simulator = simulator
+        self.start_rate = start_rate
+        self.factor = factor
+        self.max_rate = max_rate
+        self.step_duration = step_duration
+        self.max_latency_ms = max_latency_ms
+        self.max_rtt_ms = max_rtt_ms
+        self.max_write_buffer = max_write_buffer
+        self.max_blocked_fraction = max_blocked_fraction
+        self.max_queue_depth = max_queue_depth
+        self.min_achieved = min_achieved
+        self.tick = tick  # 스케줄러 주기 (초), 한 주기에 여러 메시지를 보냄
+
+        self.is_running = False
+        self.steps = []
+        self.report = None
+
+    def stop(self):
+        self.is_running = False
+
+    def lost_messages(self, clients):
+        """(버린 메시지 수, 병합된 메시지 수): 송신 큐와 clients의 큐 합계"""
+        queue = self.simulator.message_queue
+        return (queue.dropped + sum(client.dropped for client in clients),
+                queue.conflated + sum(client.conflated for client in clients))
+
+    def queue_depth(self):
+        """송신 큐와 모든 클라이언트 큐에 쌓인 메시지 수"""
+        clients = list(self.simulator.server.clients)
+        return self.simulator.message_queue.qsize() + sum(len(client.queue) for client in clients)
+
+    def run(self):
+        """클라이언트 연결을 기다린 뒤 단계별로 실행하고 보고서(dict) 반환"""
+        simulator = self.simulator
+        self.is_running = True
+        self.steps = []
+
+        arms = simulator.active_arms()
+        if not arms:
+            simulator.enable_all()
+            arms = simulator.active_arms()
+
+        if not simulator.server.clients:
+            simulator.update_label("부하 테스트: 클라이언트 연결 대기중...")
+        while not simulator.server.clients and self.is_running:
+            time.sleep(0.05)
+
+        # 병합된 메시지는 GUI에 도착하지 않으므로 실행하는 동안은 병합하지 않음
+        queue = simulator.message_queue
+        queue_policy = queue.policy
+        if queue_policy == "conflate":
+            queue.policy = "drop_oldest"
+        rate = self.start_rate
+        try:
+            while self.is_running and rate <= self.max_rate:
+                step = self.run_step(rate, arms)
+                self.steps.append(step)
+                simulator.update_label(
+                    f"부하 테스트: {step['target_rate']:.0f} msg/s -> {step['sent_rate']:.0f} msg/s, "
+                    f"p99 {step['latency_p99_ms']:.2f}ms" + (" (포화)" if step["saturated"] else "")
+                )
+                if step["saturated"]:
+                    break
+                rate *= self.factor
+        finally:
+            simulator.scheduler.remove_stream(self.STREAM_NAME)
+            queue.policy = queue_policy
+            self.is_running = False
+
+        sustainable = [step for step in self.steps if not step["saturated"]]
+        saturated = [step for step in self.steps if step["saturated"]]
+        self.report = {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "parameters": {
+                "start_rate": self.start_rate,
+                "factor": self.factor,
+                "max_rate": self.max_rate,
+                "step_duration_s": self.step_duration,
+                "max_latency_ms": self.max_latency_ms,
+                "max_rtt_ms": self.max_rtt_ms,
+                "max_write_buffer": self.max_write_buffer,
+                "max_blocked_fraction": self.max_blocked_fraction,
+                "max_queue_depth": self.max_queue_depth,
+                "queue_policy": queue_policy,
+                "arms": [arm_index + 1 for arm_index in arms],
+            },
+            "sustainable_rate": sustainable[-1]["sent_rate"] if sustainable else 0.0,
+            "saturated_by": saturated[0]["reasons"] if saturated else [],
+            "steps": self.steps,
+        }
+        return self.report
+
+    def run_step(self, rate, arms):
+        """rate로 한 단계 실행하고 측정값 반환"""
+        simulator = self.simulator
+        server = simulator.server
+        simulator.metrics.reset()
+        round_trip = simulator.round_trip
+        if round_trip is not None:
+            round_trip.reset()
+
+        interval = max(1.0 / rate, self.tick)
+        per_tick = rate * interval
+        budget = [0.0]
+
+        def send_tick():
+            budget[0] += per_tick
+            count = int(budget[0])
+            budget[0] -= count
+            for _ in range(count):
+                simulator.send_arm_state(random.choice(arms))
+
+        clients = list(server.clients)
+        generated_before = simulator.message_queue.generated
+        sent_before = server.messages_sent
+        bytes_before = server.bytes_sent
+        dropped_before, conflated_before = self.lost_messages(clients)
+        blocked_before = sum(client.blocked_ns() for client in clients)
+        depth_samples = []
+        max_write_buffer = 0
+
+        start = time.perf_counter()
+        stream = simulator.scheduler.add_stream(self.STREAM_NAME, interval, send_tick)
+        while self.is_running and time.perf_counter() - start < self.step_duration:
+            time.sleep(self.SAMPLE_INTERVAL)
+            depth_samples.append(self.queue_depth())
+            write_buffer = sum(client.write_buffer_size() for client in list(server.clients))
+            max_write_buffer = max(max_write_buffer, write_buffer)
+        simulator.scheduler.remove_stream(self.STREAM_NAME)
+        elapsed = time.perf_counter() - start
+
+        generated_rate = (simulator.message_queue.generated - generated_before) / elapsed
+        sent_rate = (server.messages_sent - sent_before) / elapsed
+        bytes_per_sec = (server.bytes_sent - bytes_before) / elapsed
+        blocked_ms = (sum(client.blocked_ns() for client in clients) - blocked_before) / 1e6
+        blocked_fraction = blocked_ms / 1000.0 / elapsed / max(len(clients), 1)
+        dropped, conflated = self.lost_messages(clients)
+        dropped -= dropped_before
+        conflated -= conflated_before
+
+        # 큐 깊이 증가 추세: 앞쪽 1/4과 뒤쪽 1/4 샘플의 평균 차이
+        quarter = max(len(depth_samples) // 4, 1)
+        depth_start = sum(depth_samples[:quarter]) / quarter if depth_samples else 0.0
+        depth_end = sum(depth_samples[-quarter:]) / quarter if depth_samples else 0.0
+
+        latency = simulator.metrics.latency["end_to_end"].summary(1e-6)
+        rtt = None
+        if round_trip is not None:
+            rtt_histogram = round_trip.histograms.get("arm_state")
+            if rtt_histogram is not None:
+                rtt = rtt_histogram.summary(1e-6)
+
+        reasons = []
+        if depth_end > self.max_queue_depth or (depth_end - depth_start) > max(rate * 0.05, 10):
+            reasons.append("queue_depth")
+        if max_write_buffer > self.max_write_buffer:
+            reasons.append("write_buffer")
+        if blocked_fraction > self.max_blocked_fraction:
+            reasons.append("send_blocked")
+        if self.max_latency_ms is not None and latency["p99"] > self.max_latency_ms:
+            reasons.append("latency")
+        if self.max_rtt_ms is not None and rtt is not None and rtt["p99"] > self.max_rtt_ms:
+            reasons.append("rtt")
+        if dropped:
+            reasons.append("dropped")
+        if conflated:
+            reasons.append("conflated")
+        if generated_rate < rate * self.min_achieved:
+            reasons.append("generator")
+
+        step = {
+            "target_rate": rate,
+            "generated_rate": generated_rate,
+            "sent_rate": sent_rate,
+            "bytes_per_sec": bytes_per_sec,
+            "dropped": dropped,
+            "conflated": conflated,
+            "latency_p50_ms": latency["p50"],
+            "latency_p99_ms": latency["p99"],
+            "latency_max_ms": latency["max"],
+            "rtt_p50_ms": rtt["p50"] if rtt else None,
+            "rtt_p99_ms": rtt["p99"] if rtt else None,
+            "queue_depth_start": depth_start,
+            "queue_depth_end": depth_end,
+            "max_write_buffer": max_write_buffer,
+            "blocked_ms": blocked_ms,
+            "blocked_fraction": blocked_fraction,
+            "missed_ticks": stream.missed,
+            "saturated": bool(reasons),
+            "reasons": reasons,
+        }
+
+        # 다음 단계가 이전 단계의 밀린 메시지에 영향받지 않도록 큐가 빌 때까지 대기 (포화면 다음 단계 없음)
+        deadline = time.perf_counter() + 5.0
+        while not reasons and self.queue_depth() and time.perf_counter() < deadline and self.is_running:
+            time.sleep(0.01)
+        return step
+
+    def format_report(self):
+        """단계별 처리량 대 지연 표"""
+        lines = [f"{'target/s':>10} {'made/s':>10} {'sent/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'rtt p99':>8} "
+                 f"{'depth':>8} {'wbuf':>9} {'blocked':>8}  saturated"]
+        for step in self.steps:
+            rtt = f"{step['rtt_p99_ms']:.2f}" if step["rtt_p99_ms"] is not None else "-"
+            lines.append(
+                f"{step['target_rate']:>10.0f} {step['generated_rate']:>10.0f} {step['sent_rate']:>10.0f} "
+                f"{step['latency_p50_ms']:>8.2f} "
+                f"{step['latency_p99_ms']:>8.2f} {rtt:>8} {step['queue_depth_end']:>8.0f} "
+                f"{step['max_write_buffer']:>9} {step['blocked_fraction']:>8.1%}  {','.join(step['reasons'])}"
+            )
+        if self.report is not None:
+            lines.append(f"지속 가능한 최대 속도: {self.report['sustainable_rate']:.0f} msg/s")
+        return lines
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.report, f, indent=2)
+
+
+def start_in_thread(ramp, on_done=None):
+    """부하 테스트를 백그라운드 스레드에서 실행 (GUI용, 끝나면 on_done(ramp) 호출)"""
+    def run():
+        ramp.run()
+        if on_done:
+            on_done(ramp)
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    return thread
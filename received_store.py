@@ -0,0 +1,323 @@
+import csv
+import json
+import threading
+import time
+from array import array
+
+NO_ARM = -(1 << 31)  # arm_index가 없는 메시지
+INVALID = "<invalid>"  # JSON 객체가 아닌 메시지의 종류
+NESTED = object()  # 값 열에서 객체/배열 값 (where 비교는 원본 JSON으로)
+
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+class _Postings:
+    """오름차순 seq 목록 (앞쪽은 링 버퍼에서 밀려나면 잘라냄)"""
+
+    __slots__ = ("seqs", "start")
+
+    def __init__(self):
+        self.seqs = array('Q')
+        self.start = 0
+
+    def append(self, seq):
+        self.seqs.append(seq)
+
+    def trim(self, oldest):
+        """oldest보다 작은 seq 제거 (절반 이상 쌓이면 한 번에 잘라냄)"""
+        seqs = self.seqs
+        start = self.start
+        end = len(seqs)
+        while start < end and seqs[start] < oldest:
+            start += 1
+        if start > 1024 and start * 2 > end:
+            del seqs[:start]
+            start = 0
+        self.start = start
+
+    def snapshot(self):
+        return self.seqs[self.start:]
+
+    def __len__(self):
+        return len(self.seqs) - self.start
+
+
+class ReceivedStore:
+    """수신한 메시지를 최근 capacity개까지 열 단위로 보관하고 조건으로 찾는 저장소
+
+    메시지마다 수신 시각(array('d')), arm_index(array('i')), 최상위 키 순서(서명) 번호와
+    원본 JSON 문자열을 링 버퍼에 저장한다. 서명은 키 튜플을 번호로 바꿔 한 번만 저장하며,
+    서명의 첫 번째 키를 메시지 종류로 본다 ({"REPORT_TO_GUI": ...}, {"ack": ...} 등).
+    서명별, arm_index별 seq 목록(색인)을 유지하므로 종류/키/Arm 조건의 검색은 해당하는
+    메시지만 훑는다. 최상위 필드 값은 키별 열(list)에 파싱한 값 그대로 저장하므로 값
+    조건(where)은 JSON을 다시 파싱하지 않고 비교하며, where의 키는 서명으로, arm_index는
+    Arm 색인으로 후보를 좁힌다. 텍스트 검색은 색인으로 고른 후보에만 적용한다.
+
+    add()는 수신 스레드에서, query()는 어느 스레드에서나 호출할 수 있다. 검색은 색인의
+    복사본으로 진행하고 그 사이 덮어써진 칸은 seq로 걸러내므로 add()를 오래 막지 않는다.
+    """
+
+    def __init__(self, capacity=200000):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        capacity = self.capacity
+        self.next_seq = 0  # 다음에 저장할 메시지의 seq (지금까지 받은 메시지 수)
+
+        # 열 (slot = seq % capacity)
+        self.seqs = array('q', [-1]) * capacity
+        self.times = array('d', [0.0]) * capacity
+        self.arms = array('i', [NO_ARM]) * capacity
+        self.signatures = array('H', [0]) * capacity
+        self.texts = [None] * capacity
+        # 최상위 키 -> 값 열 (칸의 서명에 그 키가 있을 때만 유효하므로 덮어쓸 때 지우지 않음)
+        self.columns = {}
+
+        # 서명 (최상위 키 튜플) <-> 번호
+        self.signature_keys = []  # 번호 -> 키 튜플
+        self.signature_ids = {}  # 키 튜플 -> 번호
+        self.signature_sets = []  # 번호 -> 키 frozenset
+
+        # 색인
+        self.by_signature = []  # 서명 번호 -> _Postings
+        self.by_arm = {}  # arm_index -> _Postings
+
+    # ------------------------------------------------------------ 저장
+
+    def add(self, text, message, timestamp=None):
+        """수신한 JSON 문자열과 파싱한 결과 저장 (JSON 객체가 아니면 message=None)"""
+        if isinstance(message, dict):
+            keys = tuple(message)
+            arm_index = message.get("arm_index")
+            if not isinstance(arm_index, int) or isinstance(arm_index, bool) or not NO_ARM < arm_index < 1 << 31:
+                arm_index = NO_ARM
+        else:
+            keys = (INVALID,)
+            arm_index = NO_ARM
+
+        with self.lock:
+            signature = self.signature_ids.get(keys)
+            if signature is None:
+                signature = self._add_signature(keys)
+
+            seq = self.next_seq
+            self.next_seq = seq + 1
+            slot = seq % self.capacity
+            self.seqs[slot] = seq
+            self.times[slot] = time.time() if timestamp is None else timestamp
+            self.arms[slot] = arm_index
+            self.signatures[slot] = signature
+            self.texts[slot] = text
+            if keys[0] is not INVALID:
+                columns = self.columns
+                for key, value in message.items():
+                    column = columns.get(key)
+                    if column is None:
+                        column = columns[key] = [None] * self.capacity
+                    column[slot] = value if isinstance(value, SCALAR_TYPES) else NESTED
+
+            self.by_signature[signature].append(seq)
+            postings = self.by_arm.get(arm_index)
+            if postings is None:
+                postings = self.by_arm[arm_index] = _Postings()
+            postings.append(seq)
+
+            # 밀려난 메시지를 색인에서 제거 (capacity개마다 한 번)
+            if seq >= self.capacity and slot == 0:
+                self._trim(seq - self.capacity + 1)
+        return seq
+
+    def _add_signature(self, keys):
+        if len(self.signature_keys) >= 0xFFFF:
+            raise ValueError("서로 다른 키 구성이 너무 많습니다.")
+        signature = len(self.signature_keys)
+        self.signature_keys.append(keys)
+        self.signature_ids[keys] = signature
+        self.signature_sets.append(frozenset(keys))
+        self.by_signature.append(_Postings())
+        return signature
+
+    def _trim(self, oldest):
+        for postings in self.by_signature:
+            postings.trim(oldest)
+        for arm_index in list(self.by_arm):
+            postings = self.by_arm[arm_index]
+            postings.trim(oldest)
+            if not len(postings):
+                del self.by_arm[arm_index]
+
+    def clear(self):
+        with self.lock:
+            self._reset()
+
+    # ------------------------------------------------------------ 조회
+
+    def __len__(self):
+        return min(self.next_seq, self.capacity)
+
+    @property
+    def oldest_seq(self):
+        return max(self.next_seq - self.capacity, 0)
+
+    def message_types(self):
+        """지금까지 받은 메시지 종류 목록"""
+        return sorted({keys[0] for keys in self.signature_keys if keys})
+
+    def top_level_keys(self):
+        return sorted({key for keys in self.signature_keys for key in keys})
+
+    def arm_indices(self):
+        return sorted(arm_index for arm_index in self.by_arm if arm_index != NO_ARM)
+
+    def row(self, seq):
+        """seq의 (seq, 수신 시각, arm_index 또는 None, 종류, 원본 JSON) (밀려났으면 None)"""
+        slot = seq % self.capacity
+        text = self.texts[slot]
+        timestamp = self.times[slot]
+        arm_index = self.arms[slot]
+        keys = self.signature_keys[self.signatures[slot]]
+        if self.seqs[slot] != seq:
+            return None
+        return seq, timestamp, (None if arm_index == NO_ARM else arm_index), (keys[0] if keys else ""), text
+
+    def _candidates(self, message_type, keys, arm_index):
+        """색인으로 고른 후보 seq 목록 (오름차순, keys는 모두 있어야 하는 최상위 키)"""
+        with self.lock:
+            oldest = self.oldest_seq
+            signatures = None
+            if message_type is not None or keys:
+                signatures = [
+                    signature for signature, signature_keys in enumerate(self.signature_keys)
+                    if (message_type is None or signature_keys[0] == message_type)
+                    and self.signature_sets[signature].issuperset(keys)
+                ]
+                signature_lists = [self.by_signature[signature].snapshot() for signature in signatures]
+            arm_list = None
+            if arm_index is not None:
+                postings = self.by_arm.get(arm_index)
+                arm_list = postings.snapshot() if postings is not None else array('Q')
+            end = self.next_seq
+
+        if signatures is None and arm_list is None:
+            return range(oldest, end)
+        if signatures is not None:
+            if len(signature_lists) == 1:
+                candidates = signature_lists[0]
+            else:
+                candidates = sorted(seq for seqs in signature_lists for seq in seqs)
+            if arm_list is not None:
+                # 두 색인 중 작은 쪽을 훑으며 다른 쪽에 있는지 확인 (arm은 열에서 바로 비교)
+                if len(arm_list) < len(candidates):
+                    allowed = set(signatures)
+                    sig_column = self.signatures
+                    capacity = self.capacity
+                    candidates = [seq for seq in arm_list if sig_column[seq % capacity] in allowed]
+                else:
+                    arm_column = self.arms
+                    capacity = self.capacity
+                    candidates = [seq for seq in candidates if arm_column[seq % capacity] == arm_index]
+        else:
+            candidates = arm_list
+        return [seq for seq in candidates if seq >= oldest] if candidates and candidates[0] < oldest else candidates
+
+    def query(self, message_type=None, key=None, arm_index=None, text=None, where=None, since=None, until=None,
+              limit=1000, newest_first=True):
+        """조건에 맞는 메시지 row 목록 (최대 limit개, 기본은 최신 순)
+
+        message_type: 첫 번째 최상위 키, key: 최상위 키 포함, arm_index: arm_index 값,
+        text: 원본 JSON 문자열에 포함된 문자열, where: {키: 값} (모두 같아야 함),
+        since / until: 수신 시각(time.time()) 범위
+        """
+        conditions = []  # (키, 값): 값 열로 비교
+        nested = {}  # 객체/배열 값 조건은 원본 JSON으로 비교
+        for where_key, value in (where or {}).items():
+            if where_key == "arm_index" and type(value) is int and NO_ARM < value < 1 << 31:
+                # arm_index 조건은 Arm 색인으로 (add()에서 색인하는 범위만)
+                if arm_index is not None and arm_index != value:
+                    return []
+                arm_index = value
+            elif isinstance(value, SCALAR_TYPES):
+                conditions.append((where_key, value))
+            else:
+                nested[where_key] = value
+        required = set(where or ())
+        if key is not None:
+            required.add(key)
+
+        candidates = self._candidates(message_type, required, arm_index)
+        if newest_first:
+            candidates = reversed(candidates)
+        columns = [(self.columns.get(where_key), value) for where_key, value in conditions]
+        if any(column is None for column, _ in columns):
+            return []
+
+        rows = []
+        row = self.row
+        texts = self.texts
+        capacity = self.capacity
+        for seq in candidates:
+            if columns:
+                slot = seq % capacity
+                matched = True
+                for column, value in columns:
+                    found = column[slot]
+                    if found is NESTED or found != value:
+                        matched = False
+                        break
+                if not matched:
+                    continue
+            # 텍스트 조건은 row를 만들기 전에 원본 문자열로 먼저 거름
+            if text is not None:
+                candidate_text = texts[seq % capacity]
+                if candidate_text is None or text not in candidate_text:
+                    continue
+            entry = row(seq)
+            if entry is None:
+                continue
+            timestamp = entry[1]
+            if since is not None and timestamp < since:
+                continue
+            if until is not None and timestamp > until:
+                continue
+            if text is not None and text not in entry[4]:
+                continue
+            if nested and not self._matches(entry[4], nested):
+                continue
+            rows.append(entry)
+            if limit is not None and len(rows) >= limit:
+                break
+        return rows
+
+    @staticmethod
+    def _matches(text, where):
+        try:
+            message = json.loads(text)
+        except ValueError:
+            return False
+        if not isinstance(message, dict):
+            return False
+        for key, value in where.items():
+            if key not in message or message[key] != value:
+                return False
+        return True
+
+    # ------------------------------------------------------------ 내보내기
+
+    @staticmethod
+    def export(rows, path):
+        """row 목록을 .csv(시각, arm_index, 종류, 메시지) 또는 JSON Lines(그 외 확장자)로 저장"""
+        if path.endswith(".csv"):
+            with open(path, "w", newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(["seq", "time", "arm_index", "type", "message"])
+                for seq, timestamp, arm_index, message_type, text in rows:
+                    writer.writerow([seq, f"{timestamp:.6f}", "" if arm_index is None else arm_index,
+                                     message_type, text])
+        else:
+            with open(path, "w", encoding='utf-8') as f:
+                for seq, timestamp, arm_index, message_type, text in rows:
+                    f.write(json.dumps({"seq": seq, "time": timestamp, "arm_index": arm_index,
+                                        "type": message_type, "message": text}, ensure_ascii=False))
+                    f.write("\n")
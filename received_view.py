@@ -0,0 +1,176 @@
+import json
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk, filedialog
+from datetime import datetime
+
+ANY = "(전체)"
+
+
+class ReceivedView:
+    """수신 메시지 검색 창
+
+    시뮬레이터의 수신 저장소(ReceivedStore)를 종류, 최상위 키, Arm, 텍스트, 값 조건으로
+    검색해서 표로 보여주고, 검색 결과를 CSV/JSON Lines로 내보낸다. 검색은 작업 스레드에서
+    실행하고 결과만 메인 스레드에서 표에 넣으므로 색인으로 좁힐 수 없는 검색(텍스트, 객체
+    값 조건)이 오래 걸려도 화면이 멈추지 않는다. 창은 메인 스레드에서만 사용한다.
+    """
+
+    def __init__(self, parent, simulator):
+        self.store = simulator.received
+        self.rows = []  # 마지막 검색 결과
+        self.search_generation = 0  # 늦게 끝난 이전 검색 결과를 버리기 위한 번호
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("수신 메시지 검색")
+        self.window.geometry("900x500")
+
+        # 검색 조건
+        filter_frame = ttk.Frame(self.window)
+        filter_frame.pack(side=tk.TOP, fill='x', padx=10, pady=(10,5))
+
+        ttk.Label(filter_frame, text="종류").grid(row=0, column=0, sticky='w')
+        self.type_var = tk.StringVar(value=ANY)
+        self.type_box = ttk.Combobox(filter_frame, textvariable=self.type_var, width=20, state='readonly')
+        self.type_box.grid(row=0, column=1, padx=(5,10), sticky='w')
+
+        ttk.Label(filter_frame, text="키").grid(row=0, column=2, sticky='w')
+        self.key_var = tk.StringVar(value=ANY)
+        self.key_box = ttk.Combobox(filter_frame, textvariable=self.key_var, width=16, state='readonly')
+        self.key_box.grid(row=0, column=3, padx=(5,10), sticky='w')
+
+        ttk.Label(filter_frame, text="Arm").grid(row=0, column=4, sticky='w')
+        self.arm_var = tk.StringVar(value=ANY)
+        self.arm_box = ttk.Combobox(filter_frame, textvariable=self.arm_var, width=8, state='readonly')
+        self.arm_box.grid(row=0, column=5, padx=(5,10), sticky='w')
+
+        ttk.Label(filter_frame, text="최대").grid(row=0, column=6, sticky='w')
+        self.limit_var = tk.StringVar(value="1000")
+        ttk.Entry(filter_frame, textvariable=self.limit_var, width=8).grid(row=0, column=7, padx=5, sticky='w')
+
+        ttk.Label(filter_frame, text="텍스트").grid(row=1, column=0, sticky='w', pady=(5,0))
+        self.text_var = tk.StringVar()
+        text_entry = ttk.Entry(filter_frame, textvariable=self.text_var)
+        text_entry.grid(row=1, column=1, columnspan=3, padx=(5,10), pady=(5,0), sticky='we')
+        text_entry.bind('<Return>', lambda _: self.search())
+
+        # 값 조건: key=value를 공백으로 구분 (값은 JSON으로 해석, 실패하면 문자열)
+        ttk.Label(filter_frame, text="조건").grid(row=1, column=4, sticky='w', pady=(5,0))
+        self.where_var = tk.StringVar()
+        where_entry = ttk.Entry(filter_frame, textvariable=self.where_var)
+        where_entry.grid(row=1, column=5, columnspan=3, padx=5, pady=(5,0), sticky='we')
+        where_entry.bind('<Return>', lambda _: self.search())
+        filter_frame.grid_columnconfigure(1, weight=1)
+        filter_frame.grid_columnconfigure(5, weight=1)
+
+        # 검색/내보내기 버튼과 결과 수
+        button_frame = ttk.Frame(self.window)
+        button_frame.pack(side=tk.TOP, fill='x', padx=10)
+        ttk.Button(button_frame, text="검색", command=self.search).pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="내보내기", command=self.export).pack(side=tk.LEFT, padx=5)
+        self.result_label = ttk.Label(button_frame, text="")
+        self.result_label.pack(side=tk.RIGHT)
+
+        # 검색 결과 표
+        table_frame = ttk.Frame(self.window)
+        table_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=10)
+        columns = ("time", "type", "arm", "message")
+        self.table = ttk.Treeview(table_frame, columns=columns, show='headings')
+        for column, heading, width, stretch in (
+            ("time", "시각", 110, False),
+            ("type", "종류", 140, False),
+            ("arm", "Arm", 50, False),
+            ("message", "메시지", 500, True),
+        ):
+            self.table.heading(column, text=heading)
+            self.table.column(column, width=width, stretch=stretch)
+        scrollbar = ttk.Scrollbar(table_frame, command=self.table.yview)
+        self.table.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.update_choices()
+        self.search()
+
+    def update_choices(self):
+        """지금까지 받은 종류/키/Arm으로 선택 목록 갱신"""
+        self.type_box.configure(values=[ANY] + self.store.message_types())
+        self.key_box.configure(values=[ANY] + self.store.top_level_keys())
+        self.arm_box.configure(values=[ANY] + [str(arm_index + 1) for arm_index in self.store.arm_indices()])
+
+    def parse_where(self):
+        """'key=value key2=value2' 입력을 {키: 값}으로 변환"""
+        where = {}
+        for item in self.where_var.get().split():
+            key, sep, value = item.partition("=")
+            if not sep or not key:
+                raise ValueError(f"조건 형식이 잘못되었습니다: {item} (key=value)")
+            try:
+                where[key] = json.loads(value)
+            except ValueError:
+                where[key] = value
+        return where
+
+    def search(self):
+        self.update_choices()
+        try:
+            where = self.parse_where()
+            limit = int(self.limit_var.get()) if self.limit_var.get().strip() else None
+        except ValueError as e:
+            self.result_label.config(text=str(e))
+            return
+
+        message_type = self.type_var.get()
+        key = self.key_var.get()
+        arm = self.arm_var.get()
+        conditions = dict(
+            message_type=None if message_type == ANY else message_type,
+            key=None if key == ANY else key,
+            arm_index=None if arm == ANY else int(arm) - 1,  # 화면에는 1부터 표시
+            text=self.text_var.get() or None,
+            where=where,
+            limit=limit,
+        )
+        self.search_generation += 1
+        generation = self.search_generation
+        self.result_label.config(text="검색 중...")
+        threading.Thread(target=self.run_search, args=(generation, conditions), daemon=True).start()
+
+    def run_search(self, generation, conditions):
+        """작업 스레드에서 검색하고 결과는 메인 스레드로 전달"""
+        started_at = time.perf_counter()
+        rows = self.store.query(**conditions)
+        elapsed = time.perf_counter() - started_at
+        try:
+            self.window.after(0, lambda: self.show_results(generation, rows, elapsed))
+        except (RuntimeError, tk.TclError):
+            pass  # 검색 중에 창이 닫힘
+
+    def show_results(self, generation, rows, elapsed):
+        if generation != self.search_generation or not self.window.winfo_exists():
+            return
+        self.rows = rows
+        self.table.delete(*self.table.get_children())
+        for seq, timestamp, arm_index, row_type, text in self.rows:
+            self.table.insert('', tk.END, iid=str(seq), values=(
+                datetime.fromtimestamp(timestamp).strftime("%H:%M:%S.%f")[:-3],
+                row_type,
+                "" if arm_index is None else arm_index + 1,
+                text,
+            ))
+        self.result_label.config(
+            text=f"{len(self.rows)}건 / 보관 {len(self.store)}건 ({elapsed * 1000:.1f}ms)"
+        )
+
+    def export(self):
+        """마지막 검색 결과를 파일로 저장 (.csv 또는 .jsonl)"""
+        path = filedialog.asksaveasfilename(
+            parent=self.window,
+            defaultextension=".csv",
+            initialfile=datetime.now().strftime("received_%Y%m%d_%H%M%S.csv"),
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("All files", "*.*")]
+        )
+        if path:
+            self.store.export(self.rows, path)
+            self.result_label.config(text=f"{len(self.rows)}건 저장: {path}")
@@ -0,0 +1,303 @@
+"""선언형 시나리오 파일을 미리 인코딩한 프레임 타임라인으로 컴파일
+
+시나리오 파일(JSON 또는 YAML) 예:
+
+    name: rehearsal
+    seed: 42
+    phases:
+      - action: connect                  # GUI가 연결될 때까지 대기
+      - action: sr_a_config
+      - action: headin_cycle
+        count: 4
+        interval_ms: 500
+      - parallel:                        # 동시에 진행
+          - action: swap_pedal           # Arm 1, 2 스왑페달 50Hz로 30초
+            arms: [1, 2]
+            rate_hz: 50
+            duration_s: 30
+          - action: arm_state            # Arm 3의 instrument_type 무작위 변경
+            arms: [3]
+            states: {instrument_type: random}
+            rate_hz: 5
+            duration_s: 30
+      - action: wait
+        duration_s: 1
+
+Arm 번호는 화면과 같이 1부터 시작한다. sr_a_config / sr_b_config는 Arm 구성(topology)에서
+이름이 SR-A, SR-B인 로봇을, robot_configs는 모든 로봇을 설정한다. 컴파일은 seed로 재현 가능하며 결과는
+(시작 기준 시각, 프레임) 목록이므로 실행 중에는 해석 비용 없이 시각에 맞춰 보내기만 한다.
+parallel의 하위 단계는 같은 Arm의 같은 상태(또는 headin)를 함께 바꿀 수 없다.
+"""
+import hashlib
+import heapq
+import json
+import random
+import struct
+
+from messages import NUM_ARMS, STATE_OPTIONS, MessageCache
+from topology import Topology
+
+CONNECT = None  # 프레임 대신 들어가는 표시: 클라이언트가 연결될 때까지 대기
+
+
+class CompiledScenario:
+    """컴파일된 시나리오: 시작 기준 시각(초)과 헤더가 붙은 프레임 목록"""
+
+    def __init__(self, name, offsets, frames):
+        self.name = name
+        self.offsets = offsets
+        self.frames = frames
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def duration(self):
+        return self.offsets[-1] if self.offsets else 0.0
+
+    @property
+    def message_count(self):
+        return sum(1 for frame in self.frames if frame is not CONNECT)
+
+    def events(self):
+        return zip(self.offsets, self.frames)
+
+    def digest(self):
+        """시각과 프레임 전체의 SHA-256 (다른 환경에서 같은 결과인지 비교용)"""
+        digest = hashlib.sha256()
+        for offset, frame in self.events():
+            digest.update(struct.pack('<d', offset))
+            digest.update(frame if frame is not CONNECT else b"")
+        return digest.hexdigest()
+
+
+def load(path):
+    """시나리오 파일 읽기 (.yaml/.yml은 PyYAML 필요)"""
+    with open(path, encoding='utf-8') as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("YAML 시나리오를 읽으려면 PyYAML이 필요합니다.")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def compile_file(path, num_arms=NUM_ARMS, seed=None, topology=None):
+    return compile_scenario(load(path), num_arms=num_arms, seed=seed, topology=topology)
+
+
+def compile_scenario(spec, num_arms=NUM_ARMS, seed=None, topology=None):
+    """시나리오(dict)를 CompiledScenario로 컴파일 (seed를 주면 파일의 seed 대신 사용)
+
+    topology를 주면 Arm 개수는 topology를 따른다.
+    """
+    if not isinstance(spec, dict) or not isinstance(spec.get("phases"), list):
+        raise ValueError("시나리오에는 phases 목록이 있어야 합니다.")
+    if topology is None:
+        topology = Topology.uniform(num_arms)
+    compiler = _Compiler(topology, spec.get("seed") if seed is None else seed)
+
+    offsets = []
+    frames = []
+    start = 0.0
+    for index, phase in enumerate(spec["phases"]):
+        try:
+            events, duration = compiler.phase(phase, start)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"phases[{index}] 오류: {e}")
+        for offset, frame in events:
+            offsets.append(offset)
+            frames.append(frame)
+        start += duration
+    return CompiledScenario(spec.get("name", "scenario"), offsets, frames)
+
+
+class _Compiler:
+    """시나리오를 컴파일하는 동안의 Arm 상태 (이전 값, headin)와 난수 생성기"""
+
+    def __init__(self, topology, seed):
+        self.topology = topology
+        self.num_arms = num_arms = topology.num_arms
+        self.rng = random.Random(seed)
+        self.cache = MessageCache(num_arms)
+        self.previous = [{name: None for name in STATE_OPTIONS} for _ in range(num_arms)]
+        self.headin = 0
+
+    def phase(self, phase, start):
+        """한 단계의 (시각, 프레임) 목록과 길이(초)"""
+        if "parallel" in phase:
+            # 하위 단계는 차례로 컴파일하므로 같은 Arm의 같은 상태를 함께 바꾸면 이전 값 비교가 틀어짐
+            driven = set()
+            for sub_phase in phase["parallel"]:
+                states = self.driven_states(sub_phase)
+                overlap = driven & states
+                if overlap:
+                    arm_index, name = sorted(overlap, key=repr)[0]
+                    target = name if arm_index is None else f"Arm {arm_index + 1} {name}"
+                    raise ValueError(f"parallel의 하위 단계가 같은 상태를 함께 바꿉니다: {target}")
+                driven |= states
+            # 각 하위 단계를 같은 시각에 시작하고 시각 순으로 합침 (같은 시각이면 나열 순서)
+            results = [self.phase(sub_phase, start) for sub_phase in phase["parallel"]]
+            events = list(heapq.merge(*(events for events, _ in results), key=lambda event: event[0]))
+            return events, max((duration for _, duration in results), default=0.0)
+
+        action = phase["action"]
+        handler = getattr(self, f"action_{action}", None)
+        if handler is None:
+            raise ValueError(f"알 수 없는 action입니다: {action}")
+        return handler(phase, start)
+
+    def driven_states(self, phase):
+        """단계가 바꾸는 (arm_index, 상태 이름) 집합 (head_in은 arm_index가 None)"""
+        if "parallel" in phase:
+            return set().union(*(self.driven_states(sub_phase) for sub_phase in phase["parallel"]))
+        action = phase.get("action")
+        if action == "swap_pedal":
+            return {(arm_index, "is_selected") for arm_index in self.arm_indices(phase, [1, 2])}
+        if action == "arm_state":
+            states = phase.get("states") or STATE_OPTIONS
+            return {(arm_index, name)
+                    for arm_index in self.arm_indices(phase, range(1, self.num_arms + 1)) for name in states}
+        if action in ("headin", "headin_cycle"):
+            return {(None, "head_in")}
+        return set()
+
+    def arm_indices(self, phase, default):
+        arms = phase.get("arms", default)
+        indices = [int(arm) - 1 for arm in arms]
+        for arm_index in indices:
+            if not 0 <= arm_index < self.num_arms:
+                raise ValueError(f"잘못된 Arm 번호입니다: {arm_index + 1}")
+        return indices
+
+    def ticks(self, phase, start):
+        """rate_hz(또는 interval_ms)와 duration_s(또는 count)로 정한 전송 시각 목록과 단계 길이"""
+        if "interval_ms" in phase:
+            interval = float(phase["interval_ms"]) / 1000.0
+        else:
+            interval = 1.0 / float(phase.get("rate_hz", 1.0))
+        if interval <= 0:
+            raise ValueError("전송 간격은 0보다 커야 합니다.")
+        if "count" in phase:
+            count = int(phase["count"])
+        else:
+            count = int(round(float(phase["duration_s"]) / interval))
+        return [start + k * interval for k in range(count)], count * interval
+
+    # ------------------------------------------------------------ 단계 종류
+
+    def action_connect(self, phase, start):
+        return [(start, CONNECT)], 0.0
+
+    def action_wait(self, phase, start):
+        return [], float(phase["duration_s"])
+
+    def action_sr_a_config(self, phase, start):
+        return self.named_robot_config("SR-A", start)
+
+    def action_sr_b_config(self, phase, start):
+        return self.named_robot_config("SR-B", start)
+
+    def action_robot_configs(self, phase, start):
+        """구성의 모든 로봇 설정"""
+        return [
+            (start, self.cache.robot_config_frame(robot.robot_number, arm_index))
+            for robot in self.topology.robots
+            for arm_index in robot.arm_indices
+        ], 0.0
+
+    def named_robot_config(self, name, start):
+        robot = self.topology.robot(name)
+        if robot is None:
+            raise ValueError(f"{name}호기가 Arm 구성에 없습니다.")
+        return [(start, self.cache.robot_config_frame(robot.robot_number, arm_index))
+                for arm_index in robot.arm_indices], 0.0
+
+    def action_robot_config(self, phase, start):
+        robot_number = int(phase["robot_number"])
+        return [
+            (start, self.cache.robot_config_frame(robot_number, arm_index))
+            for arm_index in self.arm_indices(phase, [])
+        ], 0.0
+
+    def action_headin(self, phase, start):
+        self.headin = int(phase["value"]) % 4
+        return [(start, self.cache.headin_frame(self.headin))], 0.0
+
+    def action_headin_cycle(self, phase, start):
+        """headin 값을 0, 1, 2, 3 사이에서 순환"""
+        times, duration = self.ticks(phase, start)
+        events = []
+        for offset in times:
+            self.headin = (self.headin + 1) % 4
+            events.append((offset, self.cache.headin_frame(self.headin)))
+        return events, duration
+
+    def action_swap_pedal(self, phase, start):
+        """두 Arm의 is_selected를 매 주기 서로 교환"""
+        first, second = self.arm_indices(phase, [1, 2])
+        fragments = self.cache.field_fragments["is_selected"]
+        true_index = self.cache.value_index["is_selected"]["true"]
+        false_index = self.cache.value_index["is_selected"]["false"]
+
+        times, duration = self.ticks(phase, start)
+        events = []
+        for tick, offset in enumerate(times):
+            selected, released = (first, second) if tick % 2 == 0 else (second, first)
+            for arm_index, value in ((selected, true_index), (released, false_index)):
+                self.previous[arm_index]["is_selected"] = value
+                events.append((offset, self.cache.arm_state_frame(arm_index, [fragments[value]])))
+        return events, duration
+
+    def action_arm_state(self, phase, start):
+        """매 주기 arms 중 하나를 무작위로 골라 states 설정대로 상태 전송 (자동 전송과 같은 규칙)"""
+        arms = self.arm_indices(phase, range(1, self.num_arms + 1))
+        states = phase.get("states") or {name: "random" for name in STATE_OPTIONS}
+        for name, mode in states.items():
+            if name not in STATE_OPTIONS:
+                raise ValueError(f"알 수 없는 상태입니다: {name}")
+            if mode not in STATE_OPTIONS[name]:
+                raise ValueError(f"{name}에 없는 값입니다: {mode}")
+
+        times, duration = self.ticks(phase, start)
+        events = []
+        for offset in times:
+            arm_index = arms[0] if len(arms) == 1 else self.rng.choice(arms)
+            fragments = self.arm_state_fragments(arm_index, states)
+            if fragments:
+                events.append((offset, self.cache.arm_state_frame(arm_index, fragments)))
+        return events, duration
+
+    def arm_state_fragments(self, arm_index, states):
+        """Simulator.send_arm_state와 같은 규칙으로 변경된 필드 조각 선택"""
+        cache = self.cache
+        previous = self.previous[arm_index]
+        fragments = []
+        for state_name in STATE_OPTIONS:
+            mode = states.get(state_name)
+            if mode is None:
+                continue
+            previous_value = previous[state_name]
+            value_count = cache.value_count[state_name]
+
+            if mode == "change":
+                if previous_value is None:
+                    value = self.rng.randrange(value_count)
+                elif value_count > 1:
+                    value = self.rng.randrange(value_count - 1)
+                    if value >= previous_value:
+                        value += 1
+                else:
+                    value = 0
+            else:
+                if mode == "random":
+                    value = self.rng.randrange(value_count)
+                else:
+                    value = cache.value_index[state_name][mode]
+                if value == previous_value:
+                    continue
+
+            fragments.append(cache.field_fragments[state_name][value])
+            previous[state_name] = value
+        return fragments
@@ -0,0 +1,154 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+def sleep_until(deadline, spin_threshold=0.001):
+    """perf_counter 기준 deadline까지 대기 (마지막 spin_threshold 구간은 busy-wait)"""
+    remaining = deadline - time.perf_counter()
+    if remaining > spin_threshold:
+        time.sleep(remaining - spin_threshold)
+    while time.perf_counter() < deadline:
+        time.sleep(0)  # GIL을 내놓아 다른 스레드(이벤트 루프)가 밀리지 않도록 함
+
+
+class Stream:
+    """스케줄러에 등록된 하나의 주기 작업"""
+
+    def __init__(self, name, interval, callback):
+        self.name = name
+        self.interval = interval  # 주기 (초)
+        self.callback = callback
+        self.next_deadline = None
+        self.active = True
+
+        # 통계
+        self.ticks = 0  # 실행 횟수
+        self.missed = 0  # 건너뛴(놓친) 주기 수
+        self.max_lateness = 0.0  # 최대 지연 (초)
+        self.total_lateness = 0.0
+
+    def stats(self):
+        return {
+            "interval_ms": self.interval * 1000.0,
+            "ticks": self.ticks,
+            "missed": self.missed,
+            "max_lateness_ms": self.max_lateness * 1000.0,
+            "mean_lateness_ms": (self.total_lateness / self.ticks * 1000.0) if self.ticks else 0.0,
+        }
+
+
+class PeriodicScheduler:
+    """여러 개의 주기 작업을 하나의 스레드에서 실행하는 스케줄러
+
+    각 스트림의 실행 시각은 시작 시각 + k * interval 로 고정되어 있어 작업 시간만큼
+    주기가 밀리지 않는다. 마감까지 spin_threshold 이상 남았으면 잠들고, 그 이하는
+    busy-wait으로 맞춰 1ms 미만의 주기도 지원한다. 한 주기 이상 늦어지면 밀린 주기는
+    실행하지 않고 missed 로 집계한다.
+    """
+
+    def __init__(self, spin_threshold=0.001, on_error=None):
+        self.spin_threshold = spin_threshold
+        self.on_error = on_error
+
+        self.streams = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self.is_running = False
+
+    def add_stream(self, name, interval, callback, start_delay=0.0):
+        """주기 작업 등록 (같은 이름이 있으면 교체)"""
+        if interval <= 0:
+            raise ValueError("interval은 0보다 커야 합니다.")
+
+        with self._cond:
+            self.remove_stream(name)
+            stream = Stream(name, interval, callback)
+            stream.next_deadline = time.perf_counter() + start_delay
+            self.streams[name] = stream
+            heapq.heappush(self._heap, (stream.next_deadline, next(self._seq), stream))
+            self._cond.notify()
+        self.start()
+        return stream
+
+    def remove_stream(self, name):
+        """주기 작업 해제"""
+        with self._cond:
+            stream = self.streams.pop(name, None)
+            if stream:
+                stream.active = False  # 힙에서는 꺼낼 때 제거
+                self._cond.notify()
+            return stream
+
+    def stats(self):
+        """스트림별 실행/누락 통계"""
+        with self._cond:
+            return {name: stream.stats() for name, stream in self.streams.items()}
+
+    def start(self):
+        with self._cond:
+            if self.is_running:
+                return
+            self.is_running = True
+            self._thread = threading.Thread(target=self._run)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self.is_running = False
+            self._cond.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.1)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self.is_running and not self._heap:
+                    self._cond.wait()
+                if not self.is_running:
+                    return
+
+                deadline, _, stream = self._heap[0]
+                if not stream.active:
+                    heapq.heappop(self._heap)
+                    continue
+
+                # 마감까지 충분히 남았으면 잠들기 (새 스트림 등록 시 깨어나 다시 확인)
+                remaining = deadline - time.perf_counter()
+                if remaining > self.spin_threshold:
+                    self._cond.wait(remaining - self.spin_threshold)
+                    continue
+                heapq.heappop(self._heap)
+
+            # 남은 시간은 busy-wait으로 맞춤
+            sleep_until(deadline, 0.0)
+
+            lateness = time.perf_counter() - deadline
+            try:
+                stream.callback()
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(stream.name, e)
+
+            stream.ticks += 1
+            stream.total_lateness += lateness
+            if lateness > stream.max_lateness:
+                stream.max_lateness = lateness
+
+            # 다음 마감 시각 계산 (한 주기 이상 밀린 만큼은 건너뜀)
+            next_deadline = deadline + stream.interval
+            behind = time.perf_counter() - next_deadline
+            if behind >= stream.interval:
+                skipped = int(behind // stream.interval)
+                stream.missed += skipped
+                next_deadline += skipped * stream.interval
+            stream.next_deadline = next_deadline
+
+            with self._cond:
+                if stream.active:
+                    heapq.heappush(self._heap, (next_deadline, next(self._seq), stream))
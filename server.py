@@ -0,0 +1,696 @@
+import asyncio
+import collections
+import threading
+import time
+
+from framing import FrameDecoder
+from impairment import ImpairedLink
+from metrics import PipelineMetrics
+from transport import SocketTransport
+
+# 클라이언트 송신 큐가 가득 찼을 때의 처리 방식
+# (block은 디스패처가 그 클라이언트를 기다리므로 느린 클라이언트 하나가 모든 클라이언트를 늦춤)
+SLOW_CLIENT_POLICIES = ("block", "drop_oldest", "disconnect")
+
+# 송신 큐가 가득 찼을 때의 처리 방식 (conflate는 Arm 상태를 arm_index별로 병합)
+QUEUE_POLICIES = ("conflate", "drop_oldest", "drop_newest")
+
+
+class _ArmDelta:
+    """송신 큐에서 아직 꺼내지 않은 한 Arm의 상태 변경 (conflate 정책에서 병합 대상)"""
+
+    __slots__ = ("arm_index", "fields", "frame")
+
+    def __init__(self, arm_index, fields, frame):
+        self.arm_index = arm_index
+        self.fields = fields  # state_name -> 인코딩한 조각
+        self.frame = frame  # 병합되면 None (꺼낼 때 다시 만듦)
+
+
+class MessageQueue:
+    """워커 스레드(스케줄러, Tk)에서 넣고 이벤트 루프에서 꺼내는 송신 큐 (헤더를 붙인 프레임)
+
+    put()은 어느 스레드에서나 호출할 수 있고, 큐가 비어 있다가 채워질 때만 이벤트 루프를
+    깨우므로 메시지마다 루프 호출 비용이 들지 않는다. 각 프레임은 넣은 시각
+    (perf_counter_ns)과 함께 보관되어 단계별 지연 측정에 쓰인다.
+
+    큐는 max_size개로 제한되며, 가득 차면 policy에 따라 가장 오래된 메시지(drop_oldest,
+    conflate) 또는 새 메시지(drop_newest)를 버린다. conflate 정책에서는 put_arm_state()로
+    넣은 Arm 상태 변경을 arm_index별로 병합하여, 아직 보내지 않은 변경이 있으면 새
+    메시지를 추가하지 않고 그 자리에서 필드별 최신 값으로 덮어쓴다. 따라서 Arm 상태는
+    Arm마다 많아야 하나만 큐에 남고, GUI가 최종적으로 받는 상태는 같다. put()으로 넣은
+    일회성 메시지(robot_number 설정, head_in 등)는 병합하지 않고 순서대로 보낸다.
+    """
+
+    def __init__(self, max_size=65536, policy="conflate", build_arm_frame=None):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"알 수 없는 정책입니다: {policy}")
+
+        self.max_size = max_size
+        self.policy = policy
+        self.build_arm_frame = build_arm_frame  # (arm_index, fields) -> 병합한 프레임
+
+        self._items = collections.deque()
+        self._pending_arms = {}  # arm_index -> 큐에 있는 _ArmDelta (conflate 정책)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._event = None
+        self._wakeup_pending = False
+
+        # 통계
+        self.generated = 0  # 넣은 메시지 수 (병합되거나 버린 메시지 포함)
+        self.dropped = 0  # 큐가 가득 차서 버린 메시지 수
+        self.conflated = 0  # 병합되어 따로 보내지 않은 Arm 상태 메시지 수
+        self.max_depth = 0
+
+    def attach(self, loop):
+        """이벤트 루프에 연결 (루프 스레드에서 호출)"""
+        self._loop = loop
+        self._event = asyncio.Event()
+        self._wakeup_pending = False
+        if self._items:
+            self._event.set()
+
+    def detach(self):
+        self._loop = None
+        self._event = None
+
+    def put(self, item):
+        """일회성 프레임 추가 (병합하지 않음)"""
+        items = self._items
+        with self._lock:
+            self.generated += 1
+            if len(items) >= self.max_size and not self._make_room():
+                return
+            items.append((time.perf_counter_ns(), item))
+            if len(items) > self.max_depth:
+                self.max_depth = len(items)
+        self._notify()
+
+    def put_arm_state(self, arm_index, fields, frame):
+        """Arm 상태 변경 프레임 추가 (fields: state_name -> 조각, conflate 정책이면 병합)"""
+        if self.policy != "conflate" or self.build_arm_frame is None:
+            self.put(frame)
+            return
+
+        with self._lock:
+            self.generated += 1
+            delta = self._pending_arms.get(arm_index)
+            if delta is not None:
+                # 아직 보내지 않은 변경에 필드별 최신 값을 덮어씀 (큐 위치와 넣은 시각은 유지)
+                delta.fields.update(fields)
+                delta.frame = None
+                self.conflated += 1
+                return
+            if len(self._items) >= self.max_size and not self._make_room():
+                return
+            delta = _ArmDelta(arm_index, dict(fields), frame)
+            self._pending_arms[arm_index] = delta
+            self._items.append((time.perf_counter_ns(), delta))
+            if len(self._items) > self.max_depth:
+                self.max_depth = len(self._items)
+        self._notify()
+
+    def _make_room(self):
+        """가득 찬 큐에 새 메시지를 넣을 자리 확보 (lock을 잡은 상태에서 호출, 넣을 수 없으면 False)"""
+        self.dropped += 1
+        if self.policy == "drop_newest":
+            return False
+        try:
+            _, item = self._items.popleft()
+        except IndexError:
+            return True
+        if type(item) is _ArmDelta:
+            self._forget(item)
+        return True
+
+    def _forget(self, delta):
+        # 큐에서 꺼낸 Arm 상태 변경은 더 이상 병합 대상이 아님 (lock을 잡은 상태에서 호출)
+        if self._pending_arms.get(delta.arm_index) is delta:
+            del self._pending_arms[delta.arm_index]
+
+    def _notify(self):
+        loop = self._loop
+        if loop is not None and not self._wakeup_pending:
+            self._wakeup_pending = True
+            try:
+                loop.call_soon_threadsafe(self._wakeup)
+            except RuntimeError:
+                # 루프가 이미 종료됨
+                pass
+
+    def _wakeup(self):
+        self._wakeup_pending = False
+        if self._event is not None:
+            self._event.set()
+
+    def qsize(self):
+        return len(self._items)
+
+    def drain(self, max_items, stamps=None, deltas=None):
+        """최대 max_items개를 꺼내 프레임 리스트로 반환 (stamps가 있으면 넣은 시각을 추가)
+
+        Arm 상태 변경은 lock을 잡고 병합 대상에서 뺀 뒤에 프레임을 만들므로, 꺼내는 동안
+        병합된 값도 빠짐없이 들어간다. deltas가 있으면 프레임마다 Arm 상태 변경이면
+        (arm_index, fields), 아니면 None을 추가한다 (클라이언트 큐에서 다시 병합하는 데 사용).
+        """
+        items = []
+        popleft = self._items.popleft
+        try:
+            while len(items) < max_items:
+                stamp, item = popleft()
+                delta = None
+                if type(item) is _ArmDelta:
+                    with self._lock:
+                        self._forget(item)
+                        if item.frame is None:
+                            item.frame = self.build_arm_frame(item.arm_index, item.fields)
+                    delta = (item.arm_index, item.fields)
+                    item = item.frame
+                items.append(item)
+                if stamps is not None:
+                    stamps.append(stamp)
+                if deltas is not None:
+                    deltas.append(delta)
+        except IndexError:
+            pass
+        return items
+
+    def stats(self):
+        return {
+            "depth": len(self._items),
+            "max_depth": self.max_depth,
+            "max_size": self.max_size,
+            "policy": self.policy,
+            "generated": self.generated,
+            "dropped": self.dropped,
+            "conflated": self.conflated,
+        }
+
+    async def wait(self):
+        """꺼낼 메시지가 생길 때까지 대기 (이벤트 루프에서 호출)"""
+        while not self._items:
+            self._event.clear()
+            if self._items:
+                break
+            await self._event.wait()
+
+
+class ClientConnection(asyncio.BufferedProtocol):
+    """하나의 GUI 클라이언트 연결
+
+    수신 데이터는 FrameDecoder의 버퍼에 바로 읽어 들인다. 송신할 프레임은 클라이언트별
+    제한된 큐에 쌓이고, 클라이언트마다 별도의 송신 태스크가 transport로 내보낸다.
+    큐가 가득 차면 서버의 slow_client_policy에 따라 대기(block), 가장 오래된 프레임
+    버리기(drop_oldest), 연결 종료(disconnect) 중 하나로 처리한다.
+
+    송신 큐(conflate 정책)에서 온 Arm 상태 변경은 이 클라이언트의 큐에서도 arm_index별로
+    병합하므로, 느린 클라이언트의 큐에는 Arm마다 많아야 하나만 남는다. drop_oldest는
+    일회성 프레임부터 버리고 Arm 상태 변경은 버리지 않으므로, 느린 GUI도 밀린 뒤에는
+    마지막으로 보낸 Arm 상태와 같아진다.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.peername = None
+        self.quickack_socket = None  # 수신할 때마다 TCP_QUICKACK을 다시 설정할 소켓
+        self.link = None  # 장애 주입 단계 (서버에 impairment가 있을 때만)
+        self.decoder = FrameDecoder()
+        self._writable = asyncio.Event()
+        self._writable.set()
+
+        # 송신 큐 (프레임 또는 _ArmDelta, stamps에는 각 프레임을 송신 큐에 넣은 시각)
+        self.queue = collections.deque()
+        self.stamps = collections.deque()
+        self.pending_arms = {}  # arm_index -> 큐에 있는 _ArmDelta
+        self.queue_size = server.client_queue_size
+        self._has_items = asyncio.Event()
+        self._has_space = asyncio.Event()
+        self._has_space.set()
+        self.sender_task = None
+
+        # 통계
+        self.connected_at = time.monotonic()
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        self.batches_sent = 0
+        self.dropped = 0
+        self.conflated = 0  # 이 클라이언트의 큐에서 병합된 Arm 상태 변경 수
+        self.max_queue_depth = 0
+        self.paused_at = None  # 쓰기 버퍼가 가득 차 송신을 멈춘 시각
+        self.paused_ns = 0  # 송신을 멈춘 총 시간
+        self.pause_count = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.peername = transport.get_extra_info('peername')
+        sock = transport.get_extra_info('socket')
+        socket_transport = self.server.socket_transport
+        try:
+            socket_transport.configure(sock)
+        except OSError as e:
+            self.server.update_label(f"소켓 옵션 설정 실패: {str(e)}")
+        if socket_transport.quickack:
+            self.quickack_socket = sock
+        self.connected_at = time.monotonic()
+        index = self.server.connections_accepted
+        self.server.connections_accepted += 1
+        impairment = self.server.impairment
+        if impairment is not None:
+            self.link = ImpairedLink(self, impairment, impairment.seed + index)
+        self.sender_task = asyncio.get_running_loop().create_task(self._sender())
+        self.server.client_connected(self)
+
+    def get_buffer(self, sizehint):
+        return self.decoder.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes):
+        self.decoder.buffer_updated(nbytes)
+        self.server.bytes_received += nbytes
+        if self.quickack_socket is not None:
+            self.server.socket_transport.rearm_quickack(self.quickack_socket)
+        frames = self.decoder.frames()
+        while True:
+            try:
+                flag, payload = next(frames)
+            except StopIteration:
+                break
+            except ValueError as e:
+                # 길이 필드가 깨진 경우 더 이상 프레임 경계를 알 수 없으므로 연결 종료
+                self.server.update_label(f"메시지 수신 중 오류: {str(e)}")
+                self.transport.close()
+                return
+            try:
+                self.server.frame_received(self, flag, payload)
+            except Exception as e:
+                # 메시지 처리 오류는 그 메시지만 버리고 연결은 유지 (프레임 경계는 정상)
+                self.server.update_label(f"수신 메시지 처리 중 오류: {str(e)}")
+
+    def connection_lost(self, exc):
+        if self.sender_task:
+            self.sender_task.cancel()
+            # 태스크 -> 코루틴 프레임 -> self -> 태스크 순환 참조를 끊어 연결마다 바로 해제되도록
+            self.sender_task = None
+        if self.link is not None:
+            self.link.close()
+        self.queue.clear()
+        self.stamps.clear()
+        self.pending_arms.clear()
+        # 대기 중인 쪽이 멈추지 않도록 모든 이벤트 해제
+        self._writable.set()
+        self._has_space.set()
+        self.server.client_disconnected(self)
+
+    def pause_writing(self):
+        self._writable.clear()
+        self.paused_at = time.perf_counter_ns()
+        self.pause_count += 1
+
+    def resume_writing(self):
+        self._writable.set()
+        if self.paused_at is not None:
+            self.paused_ns += time.perf_counter_ns() - self.paused_at
+            self.paused_at = None
+
+    def write_buffer_size(self):
+        """소켓에 아직 쓰지 못하고 transport에 남아 있는 바이트 수"""
+        transport = self.transport
+        return transport.get_write_buffer_size() if transport is not None else 0
+
+    def blocked_ns(self):
+        """쓰기 버퍼가 가득 차 송신을 멈췄던 총 시간 (지금 멈춰 있으면 그 시간 포함)"""
+        paused_at = self.paused_at
+        if paused_at is None:
+            return self.paused_ns
+        return self.paused_ns + time.perf_counter_ns() - paused_at
+
+    def is_closing(self):
+        return self.transport is None or self.transport.is_closing()
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+    def abort(self):
+        """쓰기 버퍼를 비우지 않고 즉시 연결 종료"""
+        self.queue.clear()
+        self.stamps.clear()
+        self.pending_arms.clear()
+        if self.transport is not None:
+            self.transport.abort()
+
+    def put_frames(self, frames, stamps=None, deltas=None):
+        """프레임을 송신 큐에 추가하고 처리한 프레임 수를 반환
+
+        stamps는 각 프레임을 송신 큐에 넣은 시각이며, 없으면 지금 시각을 쓴다. deltas는
+        MessageQueue.drain()이 돌려준 프레임별 (arm_index, fields) 또는 None이며, Arm 상태
+        변경은 큐에 있는 같은 Arm의 변경에 병합한다.
+        block 정책에서 큐가 가득 차면 넣은 데까지의 개수를 반환한다 (호출한 쪽에서
+        wait_space() 후 나머지를 다시 넣는다). 그 외에는 len(frames)를 반환한다.
+        """
+        if self.is_closing():
+            return len(frames)
+        if stamps is None:
+            stamps = [time.perf_counter_ns()] * len(frames)
+
+        queue = self.queue
+        pending_arms = self.pending_arms
+        policy = self.server.slow_client_policy
+        for index, frame in enumerate(frames):
+            delta = deltas[index] if deltas is not None else None
+            if delta is not None:
+                pending = pending_arms.get(delta[0])
+                if pending is not None:
+                    # 아직 보내지 않은 같은 Arm의 변경에 필드별 최신 값을 덮어씀
+                    pending.fields.update(delta[1])
+                    pending.frame = None
+                    self.conflated += 1
+                    continue
+            if len(queue) >= self.queue_size:
+                if policy == "drop_oldest":
+                    self._drop_oldest()
+                elif policy == "disconnect":
+                    self.server.update_label(f"응답이 느린 클라이언트 연결 종료: {self.peername}")
+                    self.dropped += len(frames) - index + len(queue)
+                    self.abort()
+                    return len(frames)
+                else:
+                    self._has_space.clear()
+                    self._has_items.set()
+                    return index
+            if delta is not None:
+                frame = pending_arms[delta[0]] = _ArmDelta(delta[0], dict(delta[1]), frame)
+            queue.append(frame)
+            self.stamps.append(stamps[index])
+
+        if len(queue) > self.max_queue_depth:
+            self.max_queue_depth = len(queue)
+        self._has_items.set()
+        return len(frames)
+
+    def _drop_oldest(self):
+        """가장 오래된 일회성 프레임을 버림 (Arm 상태 변경은 Arm마다 하나뿐이므로 모두 그것일 때만 버림)"""
+        queue = self.queue
+        for position, item in enumerate(queue):
+            if type(item) is not _ArmDelta:
+                break
+        else:
+            position = 0
+        item = queue[position]
+        del queue[position]
+        del self.stamps[position]
+        if type(item) is _ArmDelta and self.pending_arms.get(item.arm_index) is item:
+            del self.pending_arms[item.arm_index]
+        self.dropped += 1
+
+    async def wait_space(self):
+        await self._has_space.wait()
+
+    async def wait_writable(self):
+        """transport 쓰기 버퍼가 비워질 때까지 대기 (pause_writing/resume_writing, 연결이 끊겨도 해제)"""
+        await self._writable.wait()
+
+    async def _sender(self):
+        """송신 큐의 프레임을 묶어서 transport로 전송"""
+        queue = self.queue
+        stamps = self.stamps
+        while True:
+            while not queue:
+                self._has_items.clear()
+                await self._has_items.wait()
+
+            # 쓰기 버퍼가 가득 차 있으면 비워질 때까지 대기
+            await self.wait_writable()
+            if self.is_closing():
+                return
+
+            dequeued_at = time.perf_counter_ns()
+            depth = len(queue)
+            batch = []
+            batch_stamps = []
+            batch_bytes = 0
+            while queue and len(batch) < self.server.max_batch:
+                frame = queue.popleft()
+                if type(frame) is _ArmDelta:
+                    # 꺼낸 변경은 더 이상 병합 대상이 아님 (병합되었으면 프레임을 다시 만듦)
+                    if self.pending_arms.get(frame.arm_index) is frame:
+                        del self.pending_arms[frame.arm_index]
+                    if frame.frame is None:
+                        frame.frame = self.server.message_queue.build_arm_frame(frame.arm_index, frame.fields)
+                    frame = frame.frame
+                batch.append(frame)
+                batch_stamps.append(stamps.popleft())
+                batch_bytes += len(frame)
+            self._has_space.set()
+
+            link = self.link
+            if link is not None:
+                # 장애 주입 단계에 넘김 (쓰기와 write/end_to_end 지연 기록은 ImpairedLink에서)
+                link.send(batch, batch_stamps)
+                metrics = self.server.metrics
+                if metrics:
+                    metrics.depth["client_queue_depth"].record(depth)
+                    metrics.latency["queue_wait"].record_since(dequeued_at, batch_stamps)
+                self.messages_sent += len(batch)
+                self.bytes_sent += batch_bytes
+                self.batches_sent += 1
+                await link.wait_space()
+                continue
+
+            try:
+                self.transport.writelines(batch)
+            except Exception as e:
+                self.server.update_label(f"메시지 전송 중 오류 발생: {str(e)}")
+                self.close()
+                return
+            written_at = time.perf_counter_ns()
+
+            metrics = self.server.metrics
+            if metrics:
+                metrics.depth["client_queue_depth"].record(depth)
+                metrics.latency["write"].record(written_at - dequeued_at)
+                metrics.latency["queue_wait"].record_since(dequeued_at, batch_stamps)
+                metrics.latency["end_to_end"].record_since(written_at, batch_stamps)
+
+            self.messages_sent += len(batch)
+            self.bytes_sent += batch_bytes
+            self.batches_sent += 1
+
+    def stats(self):
+        """클라이언트별 송신 통계"""
+        elapsed = max(time.monotonic() - self.connected_at, 1e-9)
+        return {
+            "peer": str(self.peername),
+            "messages": self.messages_sent,
+            "bytes": self.bytes_sent,
+            "batches": self.batches_sent,
+            "messages_per_sec": self.messages_sent / elapsed,
+            "bytes_per_sec": self.bytes_sent / elapsed,
+            "dropped": self.dropped,
+            "conflated": self.conflated,
+            "queue_depth": len(self.queue),
+            "max_queue_depth": self.max_queue_depth,
+            "write_buffer": self.write_buffer_size(),
+            "paused_ms": self.blocked_ns() / 1e6,
+            "pause_count": self.pause_count,
+            **({"impairment": self.link.stats()} if self.link is not None else {}),
+        }
+
+
+class MessageServer:
+    """asyncio 이벤트 루프 기반 메시지 서버
+
+    이벤트 루프는 별도 스레드에서 실행된다. 수신은 프로토콜 콜백으로 처리하고, 송신 큐의
+    프레임은 연결된 모든 클라이언트의 큐로 나눠 준다. 폴링이나 공유 락 없이 송수신이
+    동시에 진행되며, 느린 클라이언트는 자기 큐 안에서만 밀린다. 단, block 정책에서는
+    디스패처가 큐가 가득 찬 클라이언트에 자리가 날 때까지 기다리므로 느린 클라이언트
+    하나가 다른 모든 클라이언트의 송신도 멈춘다 (메시지를 잃으면 안 되는 단일 클라이언트
+    측정용). 기본값은 drop_oldest다.
+    """
+
+    def __init__(self, message_queue, max_batch=256, client_queue_size=4096,
+                 slow_client_policy="drop_oldest", backlog=16, metrics=True, transport=None, impairment=None):
+        if slow_client_policy not in SLOW_CLIENT_POLICIES:
+            raise ValueError(f"알 수 없는 정책입니다: {slow_client_policy}")
+
+        self.message_queue = message_queue
+        self.max_batch = max_batch  # 한 번에 묶어서 보낼 최대 메시지 수
+        self.client_queue_size = client_queue_size  # 클라이언트별 송신 큐 크기
+        self.slow_client_policy = slow_client_policy
+        self.backlog = backlog
+        self.socket_transport = transport if transport is not None else SocketTransport()  # 소켓 종류와 옵션
+        self.impairment = impairment  # 송신 장애 주입 설정 (impairment.Impairment, None이면 바로 씀)
+        self.connections_accepted = 0  # 지금까지 받은 연결 수 (장애 주입 seed에 더함)
+
+        self.loop = None
+        self.thread = None
+        self.is_running = False
+        self._stop_event = None
+
+        # 연결된 클라이언트 목록
+        self.clients = set()
+
+        # 콜백 (이벤트 루프 스레드에서 호출)
+        self.on_status = None
+        self.on_client_connected = None
+        self.on_frame = None
+        self.on_sent = None
+
+        # 송수신 통계
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        self.batches_sent = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.bytes_received = 0
+
+        # 단계별 지연과 큐 깊이 히스토그램 (metrics=False이면 기록하지 않음)
+        self.metrics = PipelineMetrics() if metrics else None
+
+    def update_label(self, text):
+        if self.on_status:
+            self.on_status(text)
+
+    def start(self, ip, port):
+        """이벤트 루프 스레드를 만들고 서버 시작"""
+        self.is_running = True
+        self._stop_event = None
+        self.thread = threading.Thread(target=self._run_loop, args=(ip, port))
+        self.thread.daemon = True
+        self.thread.start()
+        return self.thread
+
+    def stop(self):
+        """서버와 이벤트 루프 종료"""
+        self.is_running = False
+        loop = self.loop
+        if loop is not None and self._stop_event is not None:
+            try:
+                loop.call_soon_threadsafe(self._stop_event.set)
+            except RuntimeError:
+                pass
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2.0)
+        self.thread = None
+
+    def _run_loop(self, ip, port):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.loop = loop
+        try:
+            loop.run_until_complete(self._serve(ip, port))
+        finally:
+            self.loop = None
+            loop.close()
+
+    async def _serve(self, ip, port):
+        self._stop_event = asyncio.Event()
+        if not self.is_running:
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            server = await self.socket_transport.create_server(
+                loop, lambda: ClientConnection(self), ip, port, self.backlog
+            )
+        except Exception as e:
+            self.update_label(f"서버 시작 실패: {str(e)}")
+            self.is_running = False
+            return
+
+        self.update_label(f"서버가 시작되었습니다. ({self.socket_transport.describe(ip, port)}) 연결 대기중...")
+        self.message_queue.attach(loop)
+        dispatcher_task = loop.create_task(self._dispatcher())
+        try:
+            await self._stop_event.wait()
+        finally:
+            dispatcher_task.cancel()
+            server.close()
+            tasks = [dispatcher_task]
+            for client in list(self.clients):
+                client.close()
+                if client.sender_task:
+                    client.sender_task.cancel()
+                    tasks.append(client.sender_task)
+                if client.link is not None:
+                    client.link.task.cancel()
+                    tasks.append(client.link.task)
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await server.wait_closed()
+            self.socket_transport.close_server()
+            self.message_queue.detach()
+            self.is_running = False
+
+    async def _dispatcher(self):
+        """송신 큐의 프레임을 모든 클라이언트 큐에 전달"""
+        while True:
+            await self.message_queue.wait()
+
+            depth = self.message_queue.qsize()
+            stamps = []
+            deltas = []
+            frames = self.message_queue.drain(self.max_batch, stamps, deltas)
+            metrics = self.metrics
+            if metrics:
+                metrics.depth["queue_depth"].record(depth)
+                metrics.latency["dispatch"].record_since(time.perf_counter_ns(), stamps)
+
+            clients = list(self.clients)
+            if not clients:
+                # 연결된 클라이언트가 없으면 버림
+                continue
+
+            for client in clients:
+                accepted = client.put_frames(frames, stamps, deltas)
+                while accepted < len(frames):
+                    # block 정책: 이 클라이언트의 큐에 자리가 날 때까지 대기
+                    await client.wait_space()
+                    accepted += client.put_frames(frames[accepted:], stamps[accepted:], deltas[accepted:])
+
+            # 전송 통계
+            batch_size = len(frames)
+            batch_bytes = sum(len(frame) for frame in frames)
+            self.last_batch_size = batch_size
+            self.max_batch_size = max(self.max_batch_size, batch_size)
+            self.batches_sent += 1
+            self.messages_sent += batch_size
+            self.bytes_sent += batch_bytes
+
+            if self.on_sent:
+                self.on_sent(frames, batch_bytes)
+
+            # 클라이언트 송신 태스크가 실행될 기회를 줌
+            await asyncio.sleep(0)
+
+    def client_connected(self, client):
+        self.clients.add(client)
+        self.update_label(f"클라이언트가 연결되었습니다. ({client.peername}, 연결 {len(self.clients)}개)")
+        if self.on_client_connected:
+            self.on_client_connected(client)
+
+    def client_disconnected(self, client):
+        if client in self.clients:
+            self.clients.discard(client)
+            self.update_label(f"클라이언트 연결이 종료되었습니다. ({client.peername}, 연결 {len(self.clients)}개)")
+
+    def frame_received(self, client, flag, payload):
+        if self.on_frame:
+            self.on_frame(client, flag, payload)
+
+    def client_stats(self):
+        """클라이언트별 처리량과 큐 깊이 통계"""
+        return [client.stats() for client in list(self.clients)]
+
+    def stats(self):
+        """송신 배치 통계"""
+        return {
+            "messages": self.messages_sent,
+            "bytes": self.bytes_sent,
+            "batches": self.batches_sent,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "mean_batch_size": self.messages_sent / self.batches_sent if self.batches_sent else 0.0,
+            "queue": self.message_queue.stats(),
+            "clients": self.client_stats(),
+        }
@@ -0,0 +1,817 @@
+import json
+import time
+import random
+import argparse
+import signal
+import threading
+
+from capture import INCOMING, OUTGOING, CaptureReader, CaptureWriter
+from correlation import RoundTripTracker
+from framing import HEADER_SIZE
+from messages import NUM_ARMS, STATE_OPTIONS, MessageCache, with_seq
+from scheduler import PeriodicScheduler, sleep_until
+from received_store import ReceivedStore
+from server import QUEUE_POLICIES, SLOW_CLIENT_POLICIES, MessageQueue, MessageServer
+from state_store import CHANGE, NOT_SENT, RANDOM, ArmStateStore
+import impairment
+import topology
+import transport
+from topology import Topology
+
+
+class Simulator:
+    """GUI 없이 동작하는 시뮬레이터 코어 (Arm 상태, 메시지 생성, 소켓 서버)
+
+    Tk 화면(main.py)은 이 클래스를 감싸는 얇은 뷰이며, 모든 상태와 메시지 생성,
+    서버 스레드는 여기서 관리한다. 화면 갱신은 on_status / on_sent / on_received
+    콜백으로 전달되고 (워커 스레드에서 호출될 수 있음), Arm 상태는 self.states의 version을
+    보고 화면이 메인 스레드에서 맞춘다. on_sent에는
+    전송한 JSON의 바이트(memoryview)가 전달된다. 송신 경로의 단계별 지연과 큐 깊이는
+    self.metrics에 기록된다. Arm 개수와 로봇별 Arm 배치는 topology(topology.Topology)로
+    정하며, 주지 않으면 num_arms개의 Arm을 2개씩 SR-A, SR-B, ...에 배정한다. 서버 소켓
+    종류(TCP, Unix 도메인 소켓)와 소켓 옵션은 transport(transport.SocketTransport)로 정하고,
+    impairment(impairment.Impairment)를 주면 송신 경로에 네트워크 장애를 주입한다.
+
+    GUI가 (다시) 연결되면 SOCKET_ENABLE 바로 뒤에 지금까지 보낸 상태 전체(keyframe)를
+    보내므로, 변경분만 전송하는 중에도 새로 연결한 GUI가 한 번에 같은 상태가 된다.
+    """
+
+    REPLAY_QUEUE_LIMIT = 10000  # 최대 속도 재생 시 송신 큐에 쌓아 둘 최대 프레임 수
+
+    def __init__(self, num_arms=NUM_ARMS, max_batch=256, client_queue_size=4096, slow_client_policy="drop_oldest",
+                 queue_size=65536, queue_policy="conflate", topology=None, received_capacity=200000,
+                 transport=None, impairment=None):
+        if topology is None:
+            topology = Topology.uniform(num_arms)
+        self.topology = topology
+        self.num_arms = num_arms = topology.num_arms
+
+        # 자동 전송 상태
+        self.is_auto_sending = False  # 자동 전송 상태
+        self.is_swap_pedal_auto = False  # 스왑페달 자동 시작 상태
+        self.headin = 0  # headin 초기값
+        self.robot_numbers = {}  # arm_index -> 마지막으로 보낸 robot_number
+        self.keyframe_on_connect = True  # 연결 직후 상태 전체 전송 여부
+
+        # 주기 전송 스케줄러 (자동 전송, 스왑페달, headin 등 모든 주기 작업)
+        self.scheduler = PeriodicScheduler(on_error=self.scheduler_error)
+
+        # 미리 인코딩한 메시지 조각
+        self.message_cache = MessageCache(num_arms)
+
+        # 메시지 큐와 서버 생성
+        self.message_queue = MessageQueue(
+            max_size=queue_size,
+            policy=queue_policy,
+            build_arm_frame=self.message_cache.arm_state_fields_frame,
+        )
+        self.server = MessageServer(
+            self.message_queue,
+            max_batch=max_batch,
+            client_queue_size=client_queue_size,
+            slow_client_policy=slow_client_policy,
+            transport=transport,
+            impairment=impairment,
+        )
+        self.server.on_status = self.update_label
+        self.server.on_client_connected = self.handle_client
+        self.server.on_frame = self.handle_frame
+        self.server.on_sent = self.handle_sent
+        self.metrics = self.server.metrics
+
+        # 수신 통계와 수신 메시지 저장소 (종류/키/arm_index로 검색)
+        self.messages_received = 0
+        self.received = ReceivedStore(received_capacity)
+
+        # GUI 응답 왕복 시간 측정 (start_round_trip() 후에만 seq를 붙임)
+        self.round_trip = None
+
+        # 송수신 캡처와 재생
+        self.capture = None
+        self.is_replaying = False
+        self.replay_thread = None
+
+        # Arm별 상태 (선택 모드, 전송 대상 여부, 마지막으로 보낸 값)
+        self.states = ArmStateStore(num_arms)
+
+        # 필드 인덱스 순서의 조각 목록과 값 개수 (send_arm_state에서 사용)
+        self._field_fragments = [self.message_cache.field_fragments[name] for name in self.states.field_names]
+        self._value_counts = [self.message_cache.value_count[name] for name in self.states.field_names]
+
+        # 화면 갱신용 콜백
+        self.on_status = None
+        self.on_sent = None
+        self.on_received = None
+        self.on_headin_changed = None
+
+    def update_label(self, text):
+        if self.on_status:
+            self.on_status(text)
+
+    def update_sent_text(self, text):
+        if self.on_sent:
+            self.on_sent(text)
+
+    def update_received_text(self, text):
+        if self.on_received:
+            self.on_received(text)
+
+    # ---------------------------------------------------------------- 상태
+
+    def set_state(self, arm_index, state_name, value):
+        """Arm 상태의 선택 값을 변경"""
+        self.states.set_mode(arm_index, state_name, value)
+
+    def set_enabled(self, arm_index, state_name, enabled):
+        """Arm 상태의 전송 대상 여부를 변경"""
+        self.states.set_enabled(arm_index, state_name, enabled)
+
+    def enable_all(self):
+        """모든 Arm의 모든 상태를 전송 대상으로 설정"""
+        self.states.enable_all()
+
+    def active_arms(self):
+        """활성화된 상태가 하나라도 있는 Arm 인덱스 목록"""
+        return self.states.active_arms()
+
+    # ---------------------------------------------------------------- 메시지 생성
+
+    def send_arm_state(self, arm_index):
+        """특정 Arm의 변경된 상태만 전송하는 메서드"""
+        states = self.states
+        field_names = states.field_names
+        field_fragments = self._field_fragments
+        value_counts = self._value_counts
+        fields = {}
+
+        # 모드 읽기와 마지막 전송 값 갱신을 한 번에 (다른 스레드의 전송과 섞이지 않도록)
+        with states.lock:
+            mask = states.enabled[arm_index]
+            modes = states.modes
+            previous = states.previous
+            base = arm_index * states.field_count
+
+            for field in range(states.field_count):
+                # 상태가 비활성화되어 있으면 건너뛰기
+                if not mask >> field & 1:
+                    continue
+
+                mode = modes[base + field]
+                previous_value = previous[base + field]
+                value_count = value_counts[field]  # change와 random을 제외한 실제 값의 개수
+
+                if mode == CHANGE:
+                    # 이전 상태를 제외한 값들 중에서 무작위 선택
+                    if previous_value == NOT_SENT:
+                        value = random.randrange(value_count)
+                    elif value_count > 1:
+                        value = random.randrange(value_count - 1)
+                        if value >= previous_value:
+                            value += 1
+                    else:
+                        # 가능한 값이 하나밖에 없는 경우
+                        value = 0
+
+                else:
+                    if mode == RANDOM:
+                        value = random.randrange(value_count)  # change와 random을 제외한 값들 중에서 선택
+                    else:
+                        value = mode  # 고정 값의 인덱스
+
+                    # 이전 상태와 같으면 전송하지 않음
+                    if value == previous_value:
+                        continue
+
+                fields[field_names[field]] = field_fragments[field][value]
+                previous[base + field] = value
+
+        # 변경된 상태가 있는 경우에만 메시지 전송
+        if fields:
+            frame = self.message_cache.arm_state_frame(arm_index, fields.values())
+            self.send_frame(frame, "arm_state", arm_index, fields)
+
+    def send_frame(self, frame, message_type=None, arm_index=None, fields=None):
+        """프레임을 송신 큐에 넣기
+
+        fields(state_name -> 조각)가 있으면 Arm 상태 변경으로 넣어 송신 큐 정책에 따라
+        병합될 수 있다. 왕복 시간 측정 중이면 message_type이 있는 메시지에 seq를 붙이고,
+        seq마다 응답을 기다려야 하므로 병합하지 않는다.
+        """
+        round_trip = self.round_trip
+        if round_trip is not None and message_type is not None:
+            self.message_queue.put(with_seq(frame, round_trip.register(message_type, arm_index)))
+        elif fields is not None:
+            self.message_queue.put_arm_state(arm_index, fields, frame)
+        else:
+            self.message_queue.put(frame)
+
+    def swap_pedal(self):
+        """Arm1과 Arm2의 is_selected 상태를 서로 교환하고 메시지 전송"""
+        # 상태 교환 (한 번에 교환되므로 중간 상태가 전송되지 않음)
+        self.states.swap_modes(0, 1, "is_selected")
+
+        # Arm1, Arm2 메시지 전송
+        self.send_arm_state(0)
+        self.send_arm_state(1)
+
+    def toggle_headin(self):
+        """headin 값을 0, 1, 2, 3 사이에서 순환하고 메시지 전송"""
+        self.headin = (self.headin + 1) % 4
+
+        # headin 메시지 전송
+        self.send_frame(self.message_cache.headin_frame(self.headin), "head_in", -1)
+        if self.on_headin_changed:
+            self.on_headin_changed(self.headin)
+        return self.headin
+
+    def send_robot_config(self, robot_number, arm_indices):
+        """robot_number 설정 메시지를 각 Arm에 대해 전송"""
+        for arm_index in arm_indices:
+            self.robot_numbers[arm_index] = robot_number
+            self.send_frame(self.message_cache.robot_config_frame(robot_number, arm_index), "robot_config", arm_index)
+
+    def send_robot(self, robot):
+        """topology의 로봇 한 대(topology.Robot)의 설정 메시지 전송"""
+        self.send_robot_config(robot.robot_number, robot.arm_indices)
+
+    def send_all_robot_configs(self):
+        """topology의 모든 로봇 설정 메시지 전송"""
+        for robot in self.topology.robots:
+            self.send_robot(robot)
+
+    def send_named_robot_config(self, name):
+        """이름으로 찾은 로봇의 설정 메시지 전송 (없으면 False 반환)"""
+        robot = self.topology.robot(name)
+        if robot is None:
+            self.update_label(f"{name}호기가 구성에 없습니다.")
+            return False
+        self.send_robot(robot)
+        return True
+
+    def send_sr_a_config(self):
+        """SR-A호기 설정 메시지 전송"""
+        return self.send_named_robot_config("SR-A")
+
+    def send_sr_b_config(self):
+        """SR-B호기 설정 메시지 전송"""
+        return self.send_named_robot_config("SR-B")
+
+    # ---------------------------------------------------------------- 자동 전송
+
+    def start_auto_send(self, interval):
+        """자동 전송 시작 (활성화된 Arm이 없으면 False 반환)"""
+        if not self.active_arms():
+            return False
+
+        # 활성화된 Arm들 중에서 무작위로 선택하여 상태 전송
+        # (Arm 목록은 상태 저장소의 version이 바뀔 때만 다시 구하므로 Arm 수와 무관하게 한 번에 O(1))
+        states = self.states
+        active = [None, []]  # [version, 활성화된 Arm 목록]
+
+        def send_next_arm():
+            if active[0] != states.version:
+                active[0] = states.version
+                active[1] = states.active_arms()
+            if active[1]:
+                self.send_arm_state(random.choice(active[1]))
+
+        self.scheduler.add_stream("auto_send", interval, send_next_arm)
+        self.is_auto_sending = True
+        return True
+
+    def stop_auto_send(self):
+        self.is_auto_sending = False
+        self.scheduler.remove_stream("auto_send")
+
+    def start_arm_stream(self, arm_index, interval):
+        """특정 Arm의 상태를 독립된 주기로 전송"""
+        self.scheduler.add_stream(f"arm{arm_index + 1}", interval, lambda: self.send_arm_state(arm_index))
+
+    def stop_arm_stream(self, arm_index):
+        self.scheduler.remove_stream(f"arm{arm_index + 1}")
+
+    def generate_timeline(self, steps, seed=None):
+        """현재 설정으로 seed 재현 가능한 자동 전송 순서를 NumPy로 한 번에 생성"""
+        import timeline
+
+        return timeline.generate(
+            steps,
+            timeline.modes_from_simulator(self),
+            seed=seed,
+            previous=self.states.previous_values(),
+        )
+
+    def start_timeline(self, steps_timeline, interval):
+        """미리 생성한 순서대로 interval마다 한 스텝씩 전송 (끝나면 자동으로 중지)"""
+        steps = iter(range(len(steps_timeline)))
+        field_names = steps_timeline.field_names
+
+        def send_next_step():
+            for step in steps:
+                frame = steps_timeline.frame(step, self.message_cache)
+                if frame is not None:
+                    arm_index = int(steps_timeline.arms[step])
+                    values = {
+                        name: value for name, value in zip(field_names, steps_timeline.values[step].tolist())
+                        if value != NOT_SENT
+                    }
+                    # keyframe이 실제로 보낸 값을 담도록 마지막 전송 값에 기록
+                    self.states.record_sent(arm_index, values)
+                    # 자동 전송과 같이 송신 큐 정책에 따라 병합될 수 있도록 필드 조각도 넘김
+                    fragments = self.message_cache.field_fragments
+                    fields = {name: fragments[name][value] for name, value in values.items()}
+                    self.send_frame(frame, "arm_state", arm_index, fields)
+                return
+            self.stop_timeline()
+
+        self.scheduler.add_stream("timeline", interval, send_next_step)
+        self.is_auto_sending = True
+
+    def stop_timeline(self):
+        self.is_auto_sending = False
+        self.scheduler.remove_stream("timeline")
+
+    def start_swap_pedal_auto(self, interval):
+        """스왑페달 자동 시작"""
+        self.scheduler.add_stream("swap_pedal", interval, self.swap_pedal)
+        self.is_swap_pedal_auto = True
+
+    def stop_swap_pedal_auto(self):
+        self.is_swap_pedal_auto = False
+        self.scheduler.remove_stream("swap_pedal")
+
+    def start_headin_auto(self, interval):
+        """headin 자동 순환 시작"""
+        self.scheduler.add_stream("headin", interval, self.toggle_headin)
+
+    def stop_headin_auto(self):
+        self.scheduler.remove_stream("headin")
+
+    # ---------------------------------------------------------------- keyframe
+
+    def keyframe(self):
+        """지금까지 보낸 상태 전체를 다시 보내는 (프레임, arm_index, fields) 목록
+
+        로봇 설정(보낸 적 있는 Arm), head_in, Arm별 마지막으로 보낸 상태 값 순서이며,
+        Arm 상태는 Arm마다 보낸 적 있는 필드를 모두 담은 메시지 한 개다. fields는 Arm 상태
+        메시지의 {state_name: 조각}이고 그 외에는 None이다.
+        """
+        cache = self.message_cache
+        items = [
+            (cache.robot_config_frame(robot_number, arm_index), arm_index, None)
+            for arm_index, robot_number in sorted(self.robot_numbers.items())
+        ]
+        items.append((cache.headin_frame(self.headin), -1, None))
+
+        states = self.states
+        field_names = states.field_names
+        field_fragments = self._field_fragments
+        field_count = states.field_count
+        _, _, _, previous = states.snapshot()
+        for arm_index in range(self.num_arms):
+            base = arm_index * field_count
+            fields = {
+                field_names[field]: field_fragments[field][previous[base + field]]
+                for field in range(field_count)
+                if previous[base + field] != NOT_SENT
+            }
+            if fields:
+                items.append((cache.arm_state_frame(arm_index, fields.values()), arm_index, fields))
+        return items
+
+    def send_keyframe(self):
+        """상태 전체를 모든 클라이언트에게 전송 (밀린 변경분과 같은 Arm이면 병합될 수 있음)"""
+        for frame, arm_index, fields in self.keyframe():
+            if fields is not None:
+                self.message_queue.put_arm_state(arm_index, fields, frame)
+            else:
+                self.message_queue.put(frame)
+
+    def start_keyframes(self, interval):
+        """interval마다 상태 전체를 다시 전송 (변경분 사이의 주기적 keyframe)"""
+        self.scheduler.add_stream("keyframe", interval, self.send_keyframe)
+
+    def stop_keyframes(self):
+        self.scheduler.remove_stream("keyframe")
+
+    def scheduler_error(self, name, error):
+        self.update_label(f"{name} 주기 작업 오류: {str(error)}")
+
+    # ---------------------------------------------------------------- 서버
+
+    @property
+    def is_server_running(self):
+        return self.server.is_running
+
+    def handle_client(self, client):
+        """새 클라이언트 연결 시 해당 클라이언트에게 SOCKET_ENABLE과 상태 전체(keyframe) 전송
+
+        keyframe은 클라이언트 큐 크기와 무관하게 들어가도록 한 덩어리로 이어 붙여 넣는다.
+        이미 송신 큐에 있는 변경분은 keyframe 뒤에 도착하지만, 마지막 전송 값은 큐에 넣기
+        전에 갱신되므로 도착 순서대로 적용하면 같은 상태가 된다.
+        """
+        frames = [self.message_cache.socket_enable_frame]
+        if self.keyframe_on_connect:
+            frames.extend(frame for frame, _, _ in self.keyframe())
+        client.put_frames([b"".join(frames)])
+        # 캡처와 송신 로그에는 프레임 단위로 남김 (디스패처를 거치지 않으므로 on_sent가 불리지 않음)
+        self.record_sent(frames)
+
+    def handle_frame(self, client, flag, payload):
+        """수신한 프레임 처리"""
+        self.messages_received += 1
+        capture = self.capture
+        if capture:
+            capture.record_payload(INCOMING, flag, payload)
+        try:
+            json_str = str(payload, 'utf-8')
+            # JSON 파싱 및 처리
+            json_data = json.loads(json_str)
+            round_trip = self.round_trip
+            if round_trip is not None:
+                round_trip.match_reply(json_data)
+            self.received.add(json_str, json_data)
+            self.update_received_text(f"{json_str}")
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            self.received.add(repr(bytes(payload)), None)
+            self.update_received_text(f"잘못된 JSON 형식: {bytes(payload)!r}")
+
+    def record_sent(self, frames):
+        """보낸 프레임을 캡처와 송신 로그에 기록 (모든 클라이언트에게 보낸 것과 한 클라이언트에게 보낸 것 공통)"""
+        capture = self.capture
+        if capture:
+            capture.record_frames(OUTGOING, frames)
+        # 로그에는 헤더를 뗀 JSON 바이트를 복사 없이 전달 (문자열 변환은 화면에 출력할 때)
+        for frame in frames:
+            self.update_sent_text(memoryview(frame)[HEADER_SIZE:])
+
+    def handle_sent(self, frames, batch_bytes):
+        self.record_sent(frames)
+        self.update_label(f"메시지 전송 완료 ({len(frames)}개, 크기: {batch_bytes} 바이트)")
+
+    # ---------------------------------------------------------------- 캡처 / 재생
+
+    def start_capture(self, path):
+        """송수신 프레임을 path에 기록 시작"""
+        self.stop_capture()
+        self.capture = CaptureWriter(path)
+        self.update_label(f"캡처를 시작합니다: {path}")
+
+    def stop_capture(self):
+        capture = self.capture
+        if capture:
+            self.capture = None
+            capture.close()
+            self.update_label(f"캡처를 종료했습니다: {capture.path} ({capture.records}개 프레임)")
+
+    def start_replay(self, path, speed=1.0):
+        """캡처 파일의 송신 프레임을 다시 전송 (speed: 배속, 0이면 최대한 빠르게)"""
+        self.start_player(self.replay_capture, path, speed)
+
+    def start_scenario(self, compiled_scenario, speed=1.0):
+        """컴파일한 시나리오를 기록된 시각대로 전송 (speed: 배속, 0이면 최대한 빠르게)"""
+        self.start_player(self.run_scenario, compiled_scenario, speed)
+
+    def start_player(self, target, *args):
+        """캡처 재생/시나리오 실행 스레드 시작 (한 번에 하나만 실행)"""
+        self.stop_replay()
+        self.is_replaying = True
+        self.replay_thread = threading.Thread(target=target, args=args)
+        self.replay_thread.daemon = True
+        self.replay_thread.start()
+
+    def stop_replay(self):
+        self.is_replaying = False
+        if self.replay_thread and self.replay_thread is not threading.current_thread():
+            self.replay_thread.join(timeout=1.1)
+        self.replay_thread = None
+
+    def play_frames(self, events, speed):
+        """(시작 기준 시각 초, 프레임)을 순서대로 전송하고 보낸 프레임 수 반환
+
+        프레임 대신 None이 오면 클라이언트가 연결될 때까지 기다린 뒤 그 시점을 기준으로
+        이후 시각을 계산한다. 보낸 로봇 설정, head_in, Arm 상태는 keyframe에 반영한다.
+        """
+        count = 0
+        updates = {}  # 프레임 -> sent_state_update() 결과 (시나리오는 같은 프레임을 반복해서 보냄)
+        start = time.perf_counter()
+        for offset, frame in events:
+            if not self.is_replaying:
+                break
+
+            if frame is None:
+                while not self.server.clients and self.is_replaying:
+                    time.sleep(0.01)
+                start = time.perf_counter() - (offset / speed if speed > 0 else 0.0)
+                continue
+
+            if speed > 0:
+                # 기록된 시각 간격을 배속에 맞춰 재현
+                deadline = start + offset / speed
+                while deadline - time.perf_counter() > 0.1 and self.is_replaying:
+                    time.sleep(0.1)
+                sleep_until(deadline)
+            else:
+                # 최대 속도: 송신 큐가 너무 쌓이지 않도록 조절
+                while self.message_queue.qsize() > self.REPLAY_QUEUE_LIMIT and self.is_replaying:
+                    time.sleep(0.001)
+
+            update = updates.get(frame)
+            if update is None:
+                update = self.sent_state_update(frame)
+                if len(updates) < 4096:
+                    updates[frame] = update
+            self.apply_sent_state(update)
+            self.message_queue.put(frame)
+            count += 1
+        return count
+
+    def sent_state_update(self, frame):
+        """재생/시나리오 프레임이 바꾸는 상태: ("robot", arm_index, robot_number),
+        ("head_in", 값), ("arm", arm_index, {state_name: 값 인덱스}) 또는 바뀌는 상태가 없으면 ()
+        """
+        try:
+            message = json.loads(bytes(memoryview(frame)[HEADER_SIZE:]))
+        except (UnicodeDecodeError, ValueError):
+            return ()
+        if not isinstance(message, dict) or "REPORT_TO_GUI" not in message:
+            return ()
+        arm_index = message.get("arm_index")
+        if "head_in" in message:
+            headin = message["head_in"]
+            return ("head_in", headin) if type(headin) is int and 0 <= headin < 4 else ()
+        if type(arm_index) is not int or not 0 <= arm_index < self.num_arms:
+            return ()
+        if "robot_number" in message:
+            return ("robot", arm_index, message["robot_number"])
+        value_counts = self.message_cache.value_count
+        values = {
+            name: value for name, value in message.items()
+            if name in value_counts and type(value) is int and 0 <= value < value_counts[name]
+        }
+        return ("arm", arm_index, values) if values else ()
+
+    def apply_sent_state(self, update):
+        """sent_state_update() 결과를 마지막 전송 값에 기록 (keyframe이 재생한 상태를 담도록)"""
+        if not update:
+            return
+        kind = update[0]
+        if kind == "arm":
+            self.states.record_sent(update[1], update[2])
+        elif kind == "robot":
+            self.robot_numbers[update[1]] = update[2]
+        elif self.headin != update[1]:
+            self.headin = update[1]
+            if self.on_headin_changed:
+                self.on_headin_changed(self.headin)
+
+    def replay_capture(self, path, speed):
+        try:
+            reader = CaptureReader(path)
+        except (OSError, ValueError) as e:
+            self.update_label(f"캡처 파일을 열 수 없습니다: {str(e)}")
+            self.is_replaying = False
+            return
+
+        def events():
+            first_timestamp = None
+            for timestamp, direction, frame in reader.records(OUTGOING):
+                if first_timestamp is None:
+                    first_timestamp = timestamp
+                yield timestamp - first_timestamp, bytes(frame)
+
+        frames = events()
+        try:
+            count = self.play_frames(frames, speed)
+        finally:
+            # 생성기가 들고 있는 mmap의 memoryview를 먼저 정리
+            frames.close()
+            reader.close()
+            self.is_replaying = False
+        self.update_label(f"캡처 재생 완료 ({count}개 프레임)")
+
+    def run_scenario(self, compiled_scenario, speed):
+        self.update_label(f"시나리오 실행: {compiled_scenario.name} "
+                          f"({compiled_scenario.message_count}개 메시지, {compiled_scenario.duration:.1f}초)")
+        try:
+            count = self.play_frames(compiled_scenario.events(), speed)
+        finally:
+            self.is_replaying = False
+        self.update_label(f"시나리오 완료: {compiled_scenario.name} ({count}개 메시지)")
+
+    # ---------------------------------------------------------------- 지표
+
+    def start_round_trip(self, timeout=5.0):
+        """REPORT_TO_GUI 메시지에 seq를 붙이고 GUI 응답("ack" 또는 "seq")까지의 왕복 시간 측정 시작"""
+        self.round_trip = RoundTripTracker(timeout=timeout)
+
+    def stop_round_trip(self):
+        self.round_trip = None
+
+    def metrics_lines(self):
+        """송신 지연, 큐 깊이, 왕복 시간 요약 (상태 표시줄 출력용)"""
+        lines = self.metrics.format_lines(queue_depth=self.message_queue.qsize())
+        queue = self.message_queue
+        lines.append(f"송신 큐 ({queue.policy}, 최대 {queue.max_size})  병합 {queue.conflated}, 버림 {queue.dropped}")
+        round_trip = self.round_trip
+        if round_trip is not None:
+            lines.extend(round_trip.format_lines())
+        return lines
+
+    def dump_metrics(self, path):
+        """송신 지연/큐 깊이 히스토그램과 스케줄러, 클라이언트 통계를 JSON 파일로 저장"""
+        round_trip = self.round_trip
+        self.metrics.dump(
+            path,
+            scheduler=self.scheduler.stats(),
+            sender=self.sender_stats(),
+            round_trip=round_trip.stats() if round_trip is not None else None,
+        )
+        self.update_label(f"지표를 저장했습니다: {path}")
+
+    def sender_stats(self):
+        """송신 배치 통계"""
+        return self.server.stats()
+
+    def start_server_thread(self, ip, port):
+        """서버를 백그라운드 이벤트 루프 스레드에서 시작"""
+        return self.server.start(ip, port)
+
+    def stop_server(self):
+        self.server.stop()
+
+    def shutdown(self):
+        """자동 전송, 재생, 캡처와 서버를 모두 중지"""
+        self.stop_replay()
+        self.stop_capture()
+        self.is_auto_sending = False
+        self.is_swap_pedal_auto = False
+        self.scheduler.stop()
+        self.stop_server()
+
+
+def main():
+    """GUI 없이 시뮬레이터 실행 (CI 등 디스플레이가 없는 환경용)"""
+    parser = argparse.ArgumentParser(description="Headless service message simulator")
+    parser.add_argument("--ip", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=19738)
+    transport.add_arguments(parser)
+    impairment.add_arguments(parser)
+    parser.add_argument("--interval", type=float, default=1000.0, help="자동 전송 간격 (ms)")
+    parser.add_argument("--topology", help="Arm과 로봇 구성 파일 (.json, topology.py 참고)")
+    parser.add_argument("--arms", type=int, help=f"Arm 개수 (기본값 {NUM_ARMS}, --topology가 없을 때)")
+    parser.add_argument("--arms-per-robot", type=int, help="로봇 한 대의 Arm 수 (기본값 2, --topology가 없을 때)")
+    parser.add_argument("--auto-send", action="store_true", help="모든 Arm 상태 자동 전송")
+    parser.add_argument("--seed", type=int, help="자동 전송 순서를 이 seed로 미리 생성 (NumPy 필요), --scenario 사용 시 파일의 seed 대신 사용")
+    parser.add_argument("--steps", type=int, default=1000000, help="--seed 사용 시 생성할 스텝 수")
+    parser.add_argument("--save-timeline", help="생성한 자동 전송 순서를 저장할 .npz 경로")
+    parser.add_argument("--swap-pedal-auto", action="store_true", help="스왑페달 자동 반복")
+    parser.add_argument("--swap-pedal-interval", type=float, help="스왑페달 반복 간격 (ms, 기본값은 --interval)")
+    parser.add_argument("--arm-rate", action="append", default=[], metavar="ARM:HZ",
+                        help="Arm별 독립 전송 주기 (예: 1:200), 여러 번 지정 가능")
+    parser.add_argument("--headin-interval", type=float, help="headin 자동 순환 간격 (ms)")
+    parser.add_argument("--keyframe-interval", type=float, help="상태 전체를 다시 보내는 간격 (ms)")
+    parser.add_argument("--no-keyframe", action="store_true", help="연결 직후 SOCKET_ENABLE만 보내고 상태 전체는 보내지 않음")
+    parser.add_argument("--client-queue-size", type=int, default=4096, help="클라이언트별 송신 큐 크기")
+    parser.add_argument("--slow-client-policy", choices=SLOW_CLIENT_POLICIES, default="drop_oldest",
+                        help="송신 큐가 가득 찬 클라이언트 처리 방식 (block은 느린 클라이언트 하나가 모든 클라이언트를 멈춤)")
+    parser.add_argument("--queue-size", type=int, default=65536, help="송신 큐 최대 크기")
+    parser.add_argument("--queue-policy", choices=QUEUE_POLICIES, default="conflate",
+                        help="송신 큐가 밀렸을 때 처리 방식 (conflate: Arm 상태를 arm_index별로 병합)")
+    parser.add_argument("--capture", help="송수신 프레임을 기록할 캡처 파일 경로")
+    parser.add_argument("--replay", help="송신 프레임을 다시 보낼 캡처 파일 경로")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="재생 배속 (0이면 최대한 빠르게)")
+    parser.add_argument("--metrics-file", help="종료 시(와 SIGUSR1 수신 시) 송신 지연 지표를 저장할 JSON 경로")
+    parser.add_argument("--scenario", help="실행할 시나리오 파일 (.json, .yaml)")
+    parser.add_argument("--scenario-speed", type=float, default=1.0, help="시나리오 배속 (0이면 최대한 빠르게)")
+    parser.add_argument("--compile-only", action="store_true", help="--scenario를 컴파일하고 요약만 출력한 뒤 종료")
+    parser.add_argument("--rtt", action="store_true", help="메시지에 seq를 붙여 GUI 응답까지의 왕복 시간 측정")
+    parser.add_argument("--rtt-timeout", type=float, default=5.0, help="응답을 기다리는 최대 시간 (초)")
+    parser.add_argument("--ramp", action="store_true", help="전송 속도를 단계적으로 올려 GUI 포화점을 찾는 부하 테스트 후 종료")
+    parser.add_argument("--ramp-start", type=float, default=100.0, help="부하 테스트 시작 속도 (messages/s)")
+    parser.add_argument("--ramp-factor", type=float, default=1.5, help="단계마다 곱할 속도 배수")
+    parser.add_argument("--ramp-max", type=float, default=100000.0, help="부하 테스트 최대 속도 (messages/s)")
+    parser.add_argument("--ramp-step", type=float, default=5.0, help="단계별 실행 시간 (초)")
+    parser.add_argument("--ramp-max-latency", type=float, default=50.0, help="허용하는 송신 지연 p99 (ms)")
+    parser.add_argument("--ramp-max-rtt", type=float, help="허용하는 GUI 응답 왕복 시간 p99 (ms, --rtt 필요)")
+    parser.add_argument("--ramp-report", help="부하 테스트 보고서를 저장할 JSON 경로")
+    parser.add_argument("--received-capacity", type=int, default=200000, help="보관할 최근 수신 메시지 수")
+    parser.add_argument("--received-export", help="종료 시 보관 중인 수신 메시지를 저장할 경로 (.csv 또는 .jsonl)")
+    parser.add_argument("--quiet", action="store_true", help="송수신 메시지 출력 생략")
+    args = parser.parse_args()
+    if (args.auto_send or args.swap_pedal_auto) and args.interval <= 0:
+        parser.error("--interval은 0보다 커야 합니다.")
+    if args.swap_pedal_interval is not None and args.swap_pedal_interval <= 0:
+        parser.error("--swap-pedal-interval은 0보다 커야 합니다.")
+    try:
+        link_impairment = impairment.from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    arm_topology = topology.from_args(args.topology, args.arms, args.arms_per_robot)
+
+    compiled_scenario = None
+    if args.scenario:
+        import scenario
+
+        compiled_scenario = scenario.compile_file(args.scenario, seed=args.seed, topology=arm_topology)
+        print(f"{compiled_scenario.name}: {compiled_scenario.message_count}개 메시지, "
+              f"{compiled_scenario.duration:.3f}초, sha256 {compiled_scenario.digest()}")
+        if args.compile_only:
+            return
+
+    simulator = Simulator(
+        client_queue_size=args.client_queue_size,
+        slow_client_policy=args.slow_client_policy,
+        queue_size=args.queue_size,
+        queue_policy=args.queue_policy,
+        topology=arm_topology,
+        received_capacity=args.received_capacity,
+        transport=transport.from_args(args),
+        impairment=link_impairment,
+    )
+    simulator.on_status = print
+    simulator.keyframe_on_connect = not args.no_keyframe
+    if not args.quiet:
+        simulator.on_sent = lambda payload: print(f"> {str(payload, 'utf-8')}")
+        simulator.on_received = lambda text: print(f"< {text}")
+
+    if args.metrics_file and hasattr(signal, "SIGUSR1"):
+        # kill -USR1 <pid> 로 실행 중에 지표 저장
+        signal.signal(signal.SIGUSR1, lambda *_: simulator.dump_metrics(args.metrics_file))
+
+    if args.rtt:
+        simulator.start_round_trip(args.rtt_timeout)
+    if args.capture:
+        simulator.start_capture(args.capture)
+    simulator.start_server_thread(args.ip, args.port)
+    if args.replay:
+        simulator.start_replay(args.replay, args.replay_speed)
+    elif compiled_scenario is not None:
+        simulator.start_scenario(compiled_scenario, args.scenario_speed)
+    interval = args.interval / 1000.0
+    if args.auto_send:
+        simulator.enable_all()
+        if args.seed is not None:
+            steps_timeline = simulator.generate_timeline(args.steps, seed=args.seed)
+            if args.save_timeline:
+                steps_timeline.save(args.save_timeline)
+            simulator.start_timeline(steps_timeline, interval)
+        else:
+            simulator.start_auto_send(interval)
+    if args.swap_pedal_auto:
+        swap_interval = args.swap_pedal_interval if args.swap_pedal_interval else args.interval
+        simulator.start_swap_pedal_auto(swap_interval / 1000.0)
+    for arm_rate in args.arm_rate:
+        arm, rate = arm_rate.split(":")
+        arm_index = int(arm) - 1
+        for state_name in STATE_OPTIONS:
+            simulator.set_enabled(arm_index, state_name, True)
+        simulator.start_arm_stream(arm_index, 1.0 / float(rate))
+    if args.headin_interval:
+        simulator.start_headin_auto(args.headin_interval / 1000.0)
+    if args.keyframe_interval:
+        simulator.start_keyframes(args.keyframe_interval / 1000.0)
+
+    try:
+        if args.ramp:
+            import ramp
+
+            load_ramp = ramp.LoadRamp(
+                simulator,
+                start_rate=args.ramp_start,
+                factor=args.ramp_factor,
+                max_rate=args.ramp_max,
+                step_duration=args.ramp_step,
+                max_latency_ms=args.ramp_max_latency,
+                max_rtt_ms=args.ramp_max_rtt,
+            )
+            try:
+                load_ramp.run()
+            finally:
+                for line in load_ramp.format_report():
+                    print(line)
+                if args.ramp_report and load_ramp.report is not None:
+                    load_ramp.save(args.ramp_report)
+        else:
+            while True:
+                time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # 스트림별 주기 통계 출력 (놓친 주기, 지연)
+        for name, stats in simulator.scheduler.stats().items():
+            print(f"{name}: {stats}")
+        for stats in simulator.server.client_stats():
+            print(f"client {stats['peer']}: {stats}")
+        for line in simulator.metrics_lines():
+            print(line)
+        if args.metrics_file:
+            simulator.dump_metrics(args.metrics_file)
+        simulator.shutdown()
+        if args.received_export:
+            ReceivedStore.export(simulator.received.query(limit=None, newest_first=False), args.received_export)
+
+
+if __name__ == "__main__":
+    main()
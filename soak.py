@@ -0,0 +1,309 @@
+"""장시간 실행 누수 점검 (soak test)
+
+시뮬레이터 서버를 이 프로세스 안에서 실행하고, 지정한 속도로 Arm 상태를 계속 보내면서
+테스트용 클라이언트를 주기적으로 연결했다 끊는다. sample_interval마다 순환 참조를 수거한 뒤
+RSS, tracemalloc 추적 메모리, 살아 있는 스레드와 객체 수, 송신 큐 깊이를 기록하고,
+준비 시간(warmup) 이후의 처음 구간과 마지막 구간을 비교해 증가량이 한도를 넘으면 실패로
+보고한다 (종료 코드 1).
+tracemalloc 상위 할당 위치는 준비 시간 직후의 스냅샷과 비교해 증가량 순으로 보고한다.
+
+    python soak.py --duration 28800 --rate 1000 --report soak.json
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+from bench import StandInClient
+from server import QUEUE_POLICIES
+from simulator import Simulator
+
+
+def current_rss():
+    """현재 프로세스의 RSS (바이트, 알 수 없으면 None)"""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def window_mean(samples, key, first):
+    """앞쪽(first=True) 또는 뒤쪽 1/4 샘플의 평균"""
+    values = [sample[key] for sample in samples if sample[key] is not None]
+    if not values:
+        return None
+    quarter = max(len(values) // 4, 1)
+    window = values[:quarter] if first else values[-quarter:]
+    return sum(window) / len(window)
+
+
+class SoakRunner:
+    """트래픽을 유지하며 클라이언트 연결/해제를 반복하고 자원 사용량 추세를 점검"""
+
+    STREAM_NAME = "soak"
+
+    def __init__(self, simulator, ip="127.0.0.1", port=19740, rate=1000.0, connect_time=5.0, disconnect_time=1.0,
+                 sample_interval=5.0, warmup=30.0, max_rss_growth_mb=20.0, max_traced_growth_mb=10.0,
+                 max_thread_growth=2, max_queue_depth=10000, top=10, tracemalloc_frames=1, tick=0.001):
+        self.simulator = simulator
+        self.ip = ip
+        self.port = port
+        self.rate = rate  # 보낼 Arm 상태 (messages/s)
+        self.connect_time = connect_time  # 클라이언트를 연결해 두는 시간 (초)
+        self.disconnect_time = disconnect_time  # 연결을 끊어 두는 시간 (초)
+        self.sample_interval = sample_interval
+        self.warmup = warmup
+        self.max_rss_growth_mb = max_rss_growth_mb
+        self.max_traced_growth_mb = max_traced_growth_mb
+        self.max_thread_growth = max_thread_growth
+        self.max_queue_depth = max_queue_depth
+        self.top = top
+        self.tracemalloc_frames = tracemalloc_frames
+        self.tick = tick
+
+        self.is_running = False
+        self.samples = []
+        self.cycles = 0
+        self.frames_received = 0
+        self.baseline_snapshot = None
+        self.report = None
+
+    def stop(self):
+        self.is_running = False
+
+    def queue_depth(self):
+        """송신 큐와 모든 클라이언트 큐에 쌓인 메시지 수"""
+        clients = list(self.simulator.server.clients)
+        return self.simulator.message_queue.qsize() + sum(len(client.queue) for client in clients)
+
+    def start_traffic(self):
+        """rate에 맞춰 tick마다 활성화된 Arm들의 상태 전송"""
+        simulator = self.simulator
+        simulator.enable_all()
+        arms = simulator.active_arms()
+        interval = max(1.0 / self.rate, self.tick)
+        per_tick = self.rate * interval
+        budget = [0.0]
+        next_arm = [0]
+
+        def send_tick():
+            budget[0] += per_tick
+            count = int(budget[0])
+            budget[0] -= count
+            for _ in range(count):
+                simulator.send_arm_state(arms[next_arm[0]])
+                next_arm[0] = (next_arm[0] + 1) % len(arms)
+
+        simulator.scheduler.add_stream(self.STREAM_NAME, interval, send_tick)
+
+    def cycle_clients(self):
+        """클라이언트 연결/해제 반복 (별도 스레드)"""
+        while self.is_running:
+            try:
+                client = StandInClient(self.ip, self.port)
+            except OSError:
+                time.sleep(0.1)
+                continue
+            self.sleep(self.connect_time)
+            client.close()
+            client.thread.join(timeout=1.0)
+            self.frames_received += client.frames
+            self.cycles += 1
+            self.sleep(self.disconnect_time)
+
+    def sleep(self, duration):
+        deadline = time.perf_counter() + duration
+        while self.is_running and time.perf_counter() < deadline:
+            time.sleep(min(0.05, max(deadline - time.perf_counter(), 0)))
+
+    def sample(self, start):
+        # 순환 참조 쓰레기를 먼저 수거해 실제로 살아 있는 메모리만 비교
+        gc.collect()
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        server = self.simulator.server
+        return {
+            "elapsed_s": time.perf_counter() - start,
+            "rss": current_rss(),
+            "traced": traced,
+            "traced_peak": traced_peak,
+            "threads": threading.active_count(),
+            "objects": len(gc.get_objects()),
+            "queue_depth": self.queue_depth(),
+            "clients": len(server.clients),
+            "messages_sent": server.messages_sent,
+            "cycles": self.cycles,
+        }
+
+    def run(self, duration, on_sample=None):
+        """duration초 동안 실행하고 보고서(dict) 반환"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.tracemalloc_frames)
+        self.is_running = True
+        self.samples = []
+        simulator = self.simulator
+        simulator.start_server_thread(self.ip, self.port)
+        self.start_traffic()
+        cycler = threading.Thread(target=self.cycle_clients, name="soak-client")
+        cycler.daemon = True
+        cycler.start()
+
+        start = time.perf_counter()
+        try:
+            while self.is_running and time.perf_counter() - start < duration:
+                self.sleep(self.sample_interval)
+                sample = self.sample(start)
+                if sample["elapsed_s"] < self.warmup:
+                    continue
+                if self.baseline_snapshot is None:
+                    self.baseline_snapshot = tracemalloc.take_snapshot()
+                self.samples.append(sample)
+                if on_sample:
+                    on_sample(sample)
+        finally:
+            self.is_running = False
+            cycler.join(timeout=self.connect_time + 2.0)
+            simulator.scheduler.remove_stream(self.STREAM_NAME)
+
+        self.report = self.make_report(duration)
+        return self.report
+
+    def top_allocations(self):
+        """준비 시간 직후 대비 증가량이 큰 할당 위치"""
+        if self.baseline_snapshot is None:
+            return []
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot()
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = snapshot.filter_traces(filters).compare_to(self.baseline_snapshot.filter_traces(filters), "lineno")
+        return [
+            {"location": str(stat.traceback), "size_diff": stat.size_diff, "size": stat.size,
+             "count_diff": stat.count_diff}
+            for stat in stats[:self.top]
+        ]
+
+    def make_report(self, duration):
+        samples = self.samples
+        growth = {}
+        for key in ("rss", "traced", "threads", "objects", "queue_depth"):
+            first = window_mean(samples, key, True)
+            last = window_mean(samples, key, False)
+            growth[key] = (last - first) if first is not None and last is not None else None
+
+        failures = []
+        mb = 1024.0 * 1024.0
+        if growth["rss"] is not None and growth["rss"] / mb > self.max_rss_growth_mb:
+            failures.append(f"RSS 증가 {growth['rss'] / mb:.1f}MB > {self.max_rss_growth_mb}MB")
+        if growth["traced"] is not None and growth["traced"] / mb > self.max_traced_growth_mb:
+            failures.append(f"tracemalloc 증가 {growth['traced'] / mb:.1f}MB > {self.max_traced_growth_mb}MB")
+        if growth["threads"] is not None and growth["threads"] > self.max_thread_growth:
+            failures.append(f"스레드 증가 {growth['threads']:.1f}개 > {self.max_thread_growth}개")
+        max_depth = max((sample["queue_depth"] for sample in samples), default=0)
+        if max_depth > self.max_queue_depth:
+            failures.append(f"큐 깊이 {max_depth} > {self.max_queue_depth}")
+        if not samples:
+            failures.append("준비 시간 이후의 샘플이 없습니다 (duration이 warmup보다 짧음)")
+
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "parameters": {
+                "duration_s": duration,
+                "rate": self.rate,
+                "connect_time_s": self.connect_time,
+                "disconnect_time_s": self.disconnect_time,
+                "sample_interval_s": self.sample_interval,
+                "warmup_s": self.warmup,
+                "max_rss_growth_mb": self.max_rss_growth_mb,
+                "max_traced_growth_mb": self.max_traced_growth_mb,
+                "max_thread_growth": self.max_thread_growth,
+                "max_queue_depth": self.max_queue_depth,
+            },
+            "cycles": self.cycles,
+            "frames_received": self.frames_received,
+            "messages_sent": self.simulator.server.messages_sent,
+            "growth": growth,
+            "max_queue_depth": max_depth,
+            "top_allocations": self.top_allocations(),
+            "passed": not failures,
+            "failures": failures,
+            "samples": samples,
+        }
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.report, f, indent=2)
+
+
+def format_sample(sample):
+    rss = f"{sample['rss'] / 1048576.0:.1f}MB" if sample["rss"] is not None else "-"
+    return (f"{sample['elapsed_s']:>8.0f}s  RSS {rss:>9}  traced {sample['traced'] / 1048576.0:>7.2f}MB  "
+            f"threads {sample['threads']:>3}  objects {sample['objects']:>7}  depth {sample['queue_depth']:>6}  "
+            f"sent {sample['messages_sent']:>10}  cycles {sample['cycles']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulator soak test")
+    parser.add_argument("--ip", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=19740)
+    parser.add_argument("--duration", type=float, default=3600.0, help="실행 시간 (초)")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Arm 상태 전송 속도 (messages/s)")
+    parser.add_argument("--connect", type=float, default=5.0, help="클라이언트 연결 유지 시간 (초)")
+    parser.add_argument("--disconnect", type=float, default=1.0, help="클라이언트 연결 해제 시간 (초)")
+    parser.add_argument("--sample-interval", type=float, default=5.0, help="샘플링 간격 (초)")
+    parser.add_argument("--warmup", type=float, default=30.0, help="기준값을 잡기 전 준비 시간 (초)")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=20.0)
+    parser.add_argument("--max-traced-growth-mb", type=float, default=10.0)
+    parser.add_argument("--max-thread-growth", type=int, default=2)
+    parser.add_argument("--max-queue-depth", type=int, default=10000)
+    parser.add_argument("--queue-policy", choices=QUEUE_POLICIES, default="conflate", help="송신 큐 정책")
+    parser.add_argument("--top", type=int, default=10, help="보고할 tracemalloc 상위 할당 위치 수")
+    parser.add_argument("--tracemalloc-frames", type=int, default=1, help="할당 위치마다 기록할 스택 깊이")
+    parser.add_argument("--report", help="보고서를 저장할 JSON 경로")
+    args = parser.parse_args()
+
+    simulator = Simulator(queue_policy=args.queue_policy)
+    runner = SoakRunner(
+        simulator,
+        ip=args.ip,
+        port=args.port,
+        rate=args.rate,
+        connect_time=args.connect,
+        disconnect_time=args.disconnect,
+        sample_interval=args.sample_interval,
+        warmup=args.warmup,
+        max_rss_growth_mb=args.max_rss_growth_mb,
+        max_traced_growth_mb=args.max_traced_growth_mb,
+        max_thread_growth=args.max_thread_growth,
+        max_queue_depth=args.max_queue_depth,
+        top=args.top,
+        tracemalloc_frames=args.tracemalloc_frames,
+    )
+    try:
+        runner.run(args.duration, on_sample=lambda sample: print(format_sample(sample)))
+    except KeyboardInterrupt:
+        runner.stop()
+        runner.report = runner.make_report(args.duration)
+    finally:
+        simulator.shutdown()
+
+    report = runner.report
+    for allocation in report["top_allocations"]:
+        print(f"{allocation['size_diff'] / 1024.0:>+10.1f}KB  {allocation['count_diff']:>+8}  {allocation['location']}")
+    if args.report:
+        runner.save(args.report)
+    print("통과" if report["passed"] else "실패: " + ", ".join(report["failures"]))
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
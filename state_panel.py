@@ -0,0 +1,80 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class StateSection:
+    """Arm 한 개의 상태 하나를 표시하는 접이식 영역 (헤더 + 라디오 버튼)
+
+    헤더의 [+]/[-] 버튼은 상태의 전송 대상 여부를 바꾸고, 전송 대상이면 펼쳐서 라디오
+    버튼을 보여준다. 라디오 버튼은 처음 펼칠 때 만들고 이후에는 보였다 숨기기만 하므로
+    시작할 때는 헤더 위젯만 생성된다. 위젯은 모두 직접 참조로 들고 있어 토글할 때 위젯
+    트리를 검색하지 않는다. 메인 스레드에서만 사용한다.
+    """
+
+    def __init__(self, parent, simulator, arm_index, state_name, options):
+        self.simulator = simulator
+        self.arm_index = arm_index
+        self.state_name = state_name
+        self.options = options
+        self.expanded = False
+
+        # 상태 컨테이너 프레임
+        self.container = ttk.Frame(parent)
+        self.container.pack(pady=(0,2), padx=5, fill='x')
+
+        # 상태 헤더 프레임 (스타일 적용)
+        header = ttk.Frame(self.container, style='StateHeader.TFrame')
+        header.pack(fill='x')
+
+        # 트레이 아이콘 버튼 (활성화/비활성화 상태도 함께 표시)
+        self.tray_button = ttk.Button(header, text="[+]", width=3, style='Tray.TButton', command=self.toggle)
+        self.tray_button.pack(side=tk.LEFT, padx=(5,0))
+
+        # 상태 레이블
+        ttk.Label(header, text=state_name).pack(side=tk.LEFT, padx=5)
+
+        # 라디오 버튼용 변수 (선택 값은 시뮬레이터의 상태 저장소에 반영)
+        self.variable = tk.StringVar(value=simulator.states.get_mode(arm_index, state_name))
+        self.variable.trace_add('write', self.on_variable_write)
+
+        # 라디오 버튼을 포함할 컨텐츠 프레임 (처음 펼칠 때 생성)
+        self.content_frame = None
+
+        # 스크롤로 다시 만든 경우 전송 대상이면 펼친 상태로 시작
+        self.show(simulator.states.is_enabled(arm_index, state_name))
+
+    def on_variable_write(self, *_):
+        self.simulator.set_state(self.arm_index, self.state_name, self.variable.get())
+
+    def build_content(self):
+        self.content_frame = ttk.Frame(self.container)
+        for i, option in enumerate(self.options):
+            radio = ttk.Radiobutton(self.content_frame, text=option, value=option, variable=self.variable)
+            radio.grid(row=i//3, column=i%3, padx=5, sticky='w')
+
+    def toggle(self):
+        """상태 영역 확장/축소 및 활성화/비활성화 토글"""
+        enabled = not self.simulator.states.is_enabled(self.arm_index, self.state_name)
+        self.simulator.set_enabled(self.arm_index, self.state_name, enabled)
+        self.show(enabled)
+
+    def show(self, expanded):
+        if expanded == self.expanded:
+            return
+        self.expanded = expanded
+        if expanded:
+            if self.content_frame is None:
+                self.build_content()
+            self.content_frame.pack(fill='x', padx=20)
+            self.tray_button.configure(text="[-]")
+        else:
+            self.content_frame.pack_forget()
+            self.tray_button.configure(text="[+]")
+
+    def sync(self, states, modes, enabled):
+        """상태 저장소 스냅샷(states.snapshot()의 모드, 전송 대상 비트마스크)을 위젯에 반영"""
+        field = states.field_index[self.state_name]
+        mode = states.decode_mode(field, modes[self.arm_index * states.field_count + field])
+        if self.variable.get() != mode:
+            self.variable.set(mode)
+        self.show(bool(enabled[self.arm_index] >> field & 1))
@@ -0,0 +1,146 @@
+import threading
+from array import array
+
+from messages import STATE_OPTIONS
+
+# 모드 값: 0 이상은 실제 값의 인덱스
+CHANGE = -2
+RANDOM = -1
+
+NOT_SENT = -1  # previous: 아직 보내지 않음
+
+
+class ArmStateStore:
+    """Arm x 상태 필드의 선택 모드, 전송 대상 여부, 마지막으로 보낸 값을 담는 배열 기반 저장소
+
+    모드는 arms x fields 크기의 array('b')에 CHANGE(-2), RANDOM(-1) 또는 실제 값의
+    인덱스로 저장하고, 전송 대상 여부는 Arm마다 필드 비트마스크, 마지막으로 보낸 값은
+    같은 크기의 array('b')(NOT_SENT는 아직 보내지 않음)에 저장한다. 값을 바꾸거나 여러
+    칸을 함께 읽고 쓰는 작업은 lock 안에서 하므로 어느 스레드에서나 호출할 수 있다.
+    version은 모드나 전송 대상 여부가 바뀔 때마다 증가하며, 화면은 메인 스레드에서 이 값을
+    보고 바뀐 경우에만 위젯을 다시 맞춘다.
+    """
+
+    def __init__(self, num_arms, state_options=STATE_OPTIONS):
+        self.num_arms = num_arms
+        self.field_names = list(state_options)
+        self.field_count = len(self.field_names)
+        self.field_index = {name: index for index, name in enumerate(self.field_names)}
+        self.values = [options[2:] for options in state_options.values()]  # 필드별 실제 값 목록
+        self.value_index = [{value: index for index, value in enumerate(values)} for values in self.values]
+        self.all_fields_mask = (1 << self.field_count) - 1
+
+        size = num_arms * self.field_count
+        self.modes = array('b', [RANDOM]) * size
+        self.previous = array('b', [NOT_SENT]) * size
+        self.enabled = array('Q', [0]) * num_arms  # Arm별 필드 비트마스크
+
+        self.lock = threading.Lock()
+        self.version = 0
+
+    # ------------------------------------------------------------ 모드 <-> 문자열
+
+    def encode_mode(self, field, mode):
+        if mode == "change":
+            return CHANGE
+        if mode == "random":
+            return RANDOM
+        return self.value_index[field][mode]
+
+    def decode_mode(self, field, code):
+        if code == CHANGE:
+            return "change"
+        if code == RANDOM:
+            return "random"
+        return self.values[field][code]
+
+    # ------------------------------------------------------------ 읽기 / 쓰기
+
+    def set_mode(self, arm_index, state_name, mode):
+        field = self.field_index[state_name]
+        code = self.encode_mode(field, mode)
+        with self.lock:
+            position = arm_index * self.field_count + field
+            if self.modes[position] != code:
+                self.modes[position] = code
+                self.version += 1
+
+    def get_mode(self, arm_index, state_name):
+        field = self.field_index[state_name]
+        return self.decode_mode(field, self.modes[arm_index * self.field_count + field])
+
+    def set_enabled(self, arm_index, state_name, enabled):
+        bit = 1 << self.field_index[state_name]
+        with self.lock:
+            mask = self.enabled[arm_index]
+            new_mask = (mask | bit) if enabled else (mask & ~bit)
+            if new_mask != mask:
+                self.enabled[arm_index] = new_mask
+                self.version += 1
+
+    def is_enabled(self, arm_index, state_name):
+        return bool(self.enabled[arm_index] >> self.field_index[state_name] & 1)
+
+    def enable_all(self):
+        with self.lock:
+            for arm_index in range(self.num_arms):
+                self.enabled[arm_index] = self.all_fields_mask
+            self.version += 1
+
+    def active_arms(self):
+        """활성화된 상태가 하나라도 있는 Arm 인덱스 목록"""
+        enabled = self.enabled
+        return [arm_index for arm_index in range(self.num_arms) if enabled[arm_index]]
+
+    def swap_modes(self, first_arm, second_arm, state_name):
+        """두 Arm의 한 필드 모드를 한 번에 교환하고 교환 후의 (첫 번째, 두 번째) 모드 반환"""
+        field = self.field_index[state_name]
+        first = first_arm * self.field_count + field
+        second = second_arm * self.field_count + field
+        with self.lock:
+            modes = self.modes
+            modes[first], modes[second] = modes[second], modes[first]
+            if modes[first] != modes[second]:
+                self.version += 1
+            return self.decode_mode(field, modes[first]), self.decode_mode(field, modes[second])
+
+    # ------------------------------------------------------------ 스냅샷
+
+    def snapshot(self):
+        """(version, 모드, 전송 대상 비트마스크, 마지막 전송 값) 배열 복사본
+
+        화면 동기화와 keyframe처럼 여러 칸을 함께 읽는 쪽은 이 복사본을 읽는다.
+        """
+        with self.lock:
+            return self.version, array('b', self.modes), array('Q', self.enabled), array('b', self.previous)
+
+    def arm_modes(self, arm_index, enabled_only=True):
+        """한 Arm의 {state_name: 모드 문자열} (enabled_only이면 전송 대상 필드만)"""
+        with self.lock:
+            mask = self.enabled[arm_index]
+            base = arm_index * self.field_count
+            return {
+                name: self.decode_mode(field, self.modes[base + field])
+                for field, name in enumerate(self.field_names)
+                if not enabled_only or mask >> field & 1
+            }
+
+    def record_sent(self, arm_index, values):
+        """다른 경로(미리 생성한 순서 등)로 보낸 {state_name: 값 인덱스}를 마지막 전송 값으로 기록"""
+        base = arm_index * self.field_count
+        with self.lock:
+            for name, value in values.items():
+                self.previous[base + self.field_index[name]] = value
+
+    def previous_values(self):
+        """{arm_index: {state_name: 마지막으로 보낸 값의 인덱스}} (보낸 적 없는 필드는 제외)"""
+        with self.lock:
+            result = {}
+            for arm_index in range(self.num_arms):
+                base = arm_index * self.field_count
+                result[arm_index] = {
+                    name: self.previous[base + field]
+                    for field, name in enumerate(self.field_names)
+                    if self.previous[base + field] != NOT_SENT
+                }
+            return result
@@ -0,0 +1,60 @@
+import time
+
+from bench import StandInClient
+from capture import OUTGOING, CaptureReader, CaptureWriter
+from simulator import Simulator
+
+PORT = 19863
+
+
+def test_capture_contains_every_frame_a_client_received(tmp_path):
+    """SOCKET_ENABLE과 keyframe처럼 한 클라이언트에게만 보낸 프레임도 캡처에 남아야 함"""
+    path = str(tmp_path / "session.gsc")
+    simulator = Simulator()
+    simulator.on_status = lambda text: None
+    sent_log = []
+    simulator.on_sent = lambda payload: sent_log.append(bytes(payload))
+    simulator.start_capture(path)
+    simulator.send_all_robot_configs()
+    simulator.start_server_thread("127.0.0.1", PORT)
+    deadline = time.perf_counter() + 5.0
+    client = None
+    while client is None and time.perf_counter() < deadline:
+        try:
+            client = StandInClient("127.0.0.1", PORT)
+        except OSError:
+            time.sleep(0.01)
+    try:
+        client.wait_for(6, 5.0)  # SOCKET_ENABLE, robot_number x 4, head_in
+        simulator.toggle_headin()
+        client.wait_for(7, 5.0)
+        time.sleep(0.1)
+    finally:
+        client.close()
+        simulator.shutdown()
+
+    reader = CaptureReader(path)
+    try:
+        records = [bytes(frame) for _, _, frame in reader.records(OUTGOING)]
+    finally:
+        reader.close()
+    assert client.frames == 7
+    assert len(records) == client.frames
+    assert b"SOCKET_ENABLE" in records[0]
+    assert len(sent_log) == client.frames
+
+
+def test_capture_file_starts_a_new_session(tmp_path):
+    """같은 경로에 다시 기록하면 이전 세션을 덮어써 시각 기준이 섞이지 않아야 함"""
+    path = str(tmp_path / "session.gsc")
+    for payload in (b"first", b"second"):
+        writer = CaptureWriter(path)
+        writer.record_frames(OUTGOING, [b"\x05\x00\x00\x00\x00" + payload[:5]])
+        writer.close()
+
+    reader = CaptureReader(path)
+    try:
+        frames = [bytes(frame) for _, _, frame in reader.records()]
+    finally:
+        reader.close()
+    assert frames == [b"\x05\x00\x00\x00\x00secon"]
@@ -0,0 +1,41 @@
+import time
+
+from correlation import RoundTripTracker, rtt_key
+
+
+def test_reply_matches_registered_seq():
+    tracker = RoundTripTracker()
+    first = tracker.register("arm_state", 2)
+    second = tracker.register("head_in", -1)
+    assert second == first + 1
+
+    assert tracker.match_reply({"ack": first}) is not None
+    assert tracker.match_reply({"seq": second}) is not None
+    assert tracker.match_reply({"ack": first}) is None  # 중복 응답
+    assert tracker.match_reply({"other": 1}) is None
+    assert tracker.match_reply([first]) is None
+
+    stats = tracker.stats()
+    assert (stats["matched"], stats["unmatched"], stats["pending"]) == (2, 1, 0)
+    assert set(stats["rtt_us"]) == {"arm_state", rtt_key("arm_state", 2), "head_in"}
+    assert rtt_key("arm_state", 2) == "arm_state/arm3"
+
+
+def test_unanswered_seq_times_out():
+    tracker = RoundTripTracker(timeout=0.01)
+    seq = tracker.register("arm_state", 0)
+    time.sleep(0.02)
+    tracker.expire()
+
+    assert tracker.pending == {}
+    assert tracker.timeouts["arm_state"] == 1 and tracker.timeouts["arm_state/arm1"] == 1
+    assert tracker.match(seq) is None
+
+
+def test_max_pending_evicts_oldest():
+    tracker = RoundTripTracker(max_pending=3)
+    seqs = [tracker.register("robot_config", None) for _ in range(5)]
+
+    assert sorted(tracker.pending) == seqs[2:]
+    assert tracker.timeouts["robot_config"] == 2
+    assert tracker.format_lines() == ["RTT 응답 대기 3개, 타임아웃 2개"]
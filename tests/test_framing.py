@@ -0,0 +1,37 @@
+import pytest
+
+from framing import FrameDecoder, create_message_with_header
+
+
+def test_frames_split_at_every_byte():
+    payloads = [b'{"a": 1}', b'{"b": "' + b"x" * 5000 + b'"}', b'{}']
+    stream = b"".join(create_message_with_header(payload.decode()) for payload in payloads)
+    decoder = FrameDecoder(initial_size=16, min_read=1)
+    received = []
+    for index in range(len(stream)):
+        decoder.feed(stream[index:index + 1])
+        received.extend(bytes(payload) for _, payload in decoder.frames())
+    assert received == payloads
+    assert decoder.pending_bytes() == 0
+
+
+def test_frames_across_buffer_updates():
+    stream = create_message_with_header('{"a": 1}') * 3
+    decoder = FrameDecoder(initial_size=8, min_read=4)
+    received = []
+    position = 0
+    while position < len(stream):
+        buffer = decoder.get_buffer()
+        chunk = stream[position:position + min(len(buffer), 7)]
+        buffer[:len(chunk)] = chunk
+        decoder.buffer_updated(len(chunk))
+        position += len(chunk)
+        received.extend(bytes(payload) for _, payload in decoder.frames())
+    assert received == [b'{"a": 1}'] * 3
+
+
+def test_oversized_frame_is_rejected():
+    decoder = FrameDecoder(max_frame_size=100)
+    decoder.feed(create_message_with_header('"' + "x" * 200 + '"'))
+    with pytest.raises(ValueError):
+        list(decoder.frames())
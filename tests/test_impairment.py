@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+
+import pytest
+
+import impairment
+from framing import create_message_with_header
+from impairment import Impairment, ImpairedLink
+
+FRAMES = [create_message_with_header('{"index": %d, "pad": "%s"}' % (index, "x" * (index % 50)))
+          for index in range(200)]
+
+
+def planned_writes(impairment, seed, batch):
+    """프레임을 batch개씩 보냈을 때 장애 단계가 정한 (첫 쓰기 기준 시각, 바이트) 목록"""
+
+    async def plan():
+        link = ImpairedLink(None, impairment, seed)
+        for start in range(0, len(FRAMES), batch):
+            frames = FRAMES[start:start + batch]
+            link.send(frames, [0] * len(frames))
+        first = link.pending[0].deliver_at
+        writes = [(write.deliver_at - first, bytes(write.data)) for write in link.pending]
+        link.close()
+        return writes, link.stats()
+
+    return asyncio.run(plan())
+
+
+IMPAIRMENT = Impairment(latency=10.0, jitter=0.05, split_probability=0.5, max_splits=3, split_gap=0.001,
+                        stall_probability=0.05, stall_min=0.01, stall_max=0.02)
+
+
+def test_same_seed_same_writes_regardless_of_batch_size():
+    writes, stats = planned_writes(IMPAIRMENT, 3, 200)
+    again = planned_writes(IMPAIRMENT, 3, 200)[0]
+    assert [data for _, data in again] == [data for _, data in writes]
+    assert [offset for offset, _ in again] == pytest.approx([offset for offset, _ in writes], abs=1e-3)
+    assert [data for _, data in planned_writes(IMPAIRMENT, 3, 7)[0]] == [data for _, data in writes]
+    assert [data for _, data in planned_writes(IMPAIRMENT, 4, 200)[0]] != [data for _, data in writes]
+
+    assert b"".join(data for _, data in writes) == b"".join(FRAMES)
+    assert stats["split_frames"] and stats["stalls"]
+    offsets = [offset for offset, _ in writes]
+    assert offsets == sorted(offsets)
+
+
+def test_invalid_impairment():
+    with pytest.raises(ValueError):
+        Impairment(split_probability=2.0)
+    with pytest.raises(ValueError):
+        Impairment(stall_min=0.2, stall_max=0.1)
+
+
+def test_from_args():
+    parser = argparse.ArgumentParser()
+    impairment.add_arguments(parser)
+    assert impairment.from_args(parser.parse_args([])) is None
+    link = impairment.from_args(parser.parse_args(["--impair-stall", "0.1", "--impair-stall-ms", "20"]))
+    assert (link.stall_min, link.stall_max) == (0.02, 0.02)
+    for argv in (["--impair-stall-ms", "abc"], ["--impair-split", "2"]):
+        with pytest.raises(ValueError):
+            impairment.from_args(parser.parse_args(argv))
@@ -0,0 +1,60 @@
+import json
+
+import scenario
+from framing import HEADER_SIZE
+from simulator import Simulator
+
+SPEC = {
+    "seed": 9,
+    "phases": [
+        {"action": "robot_configs"},
+        {"action": "headin", "value": 2},
+        {"parallel": [
+            {"action": "swap_pedal", "arms": [1, 2], "count": 3},
+            {"action": "arm_state", "arms": [3, 4], "count": 20},
+        ]},
+    ],
+}
+
+
+def fold(frames):
+    """프레임들을 차례로 적용한 (robot_number, head_in, Arm별 상태) 결과"""
+    robots, headin, arms = {}, None, {}
+    for frame in frames:
+        message = json.loads(bytes(frame[HEADER_SIZE:]))
+        if "head_in" in message:
+            headin = message["head_in"]
+        elif "robot_number" in message:
+            robots[message["arm_index"]] = message["robot_number"]
+        else:
+            fields = {name: value for name, value in message.items() if name not in ("REPORT_TO_GUI", "arm_index")}
+            arms.setdefault(message["arm_index"], {}).update(fields)
+    return robots, headin, arms
+
+
+def test_keyframe_includes_scenario_frames():
+    simulator = Simulator()
+    simulator.on_status = lambda text: None
+    headins = []
+    simulator.on_headin_changed = headins.append
+    compiled = scenario.compile_scenario(SPEC)
+
+    simulator.is_replaying = True
+    simulator.run_scenario(compiled, 0)
+
+    keyframe = [frame for frame, arm_index, fields in simulator.keyframe()]
+    assert fold(keyframe) == fold(compiled.frames)
+    assert simulator.headin == 2 and headins == [2]
+
+
+def test_frames_without_state_are_ignored():
+    simulator = Simulator()
+    simulator.on_status = lambda text: None
+    frames = [simulator.message_cache.socket_enable_frame, b"\x00" * HEADER_SIZE + b"not json"]
+
+    simulator.is_replaying = True
+    simulator.play_frames([(0.0, frame) for frame in frames], 0)
+
+    assert simulator.robot_numbers == {}
+    assert simulator.headin == 0
+    assert all(not values for values in simulator.states.previous_values().values())
@@ -0,0 +1,28 @@
+import json
+
+from framing import create_message_with_header
+from messages import STATE_OPTIONS, MessageCache
+
+
+def test_arm_state_frame_matches_json_dumps():
+    cache = MessageCache()
+    for arm_index in range(cache.num_arms + 2):
+        for value in range(2):
+            fields = {name: cache.field_fragments[name][value % cache.value_count[name]] for name in STATE_OPTIONS}
+            message = {"REPORT_TO_GUI": 0, "arm_index": arm_index}
+            message.update({name: value % cache.value_count[name] for name in STATE_OPTIONS})
+            assert cache.arm_state_fields_frame(arm_index, fields) == create_message_with_header(json.dumps(message))
+
+    # 일부 필드만 (STATE_OPTIONS 순서)
+    fields = {"esu_state": cache.field_fragments["esu_state"][2], "is_connected": cache.field_fragments["is_connected"][1]}
+    expected = json.dumps({"REPORT_TO_GUI": 0, "arm_index": 1, "is_connected": 1, "esu_state": 2})
+    assert cache.arm_state_fields_frame(1, fields) == create_message_with_header(expected)
+
+
+def test_fixed_frames_match_json_dumps():
+    cache = MessageCache()
+    assert cache.socket_enable_frame == create_message_with_header(json.dumps({"SOCKET_ENABLE": True}))
+    assert cache.headin_frame(2) == create_message_with_header(
+        json.dumps({"REPORT_TO_GUI": 1, "arm_index": -1, "head_in": 2}))
+    assert cache.robot_config_frame(3, 1) == create_message_with_header(
+        json.dumps({"REPORT_TO_GUI": 0, "robot_number": 3, "arm_index": 1}))
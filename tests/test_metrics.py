@@ -0,0 +1,30 @@
+import pytest
+
+from metrics import Histogram
+
+
+def test_percentiles_within_bucket_error():
+    histogram = Histogram()
+    for value in range(1, 100001):
+        histogram.record(value)
+    tolerance = 1.0 / (1 << histogram.sub_bucket_bits)
+    for percent, expected in ((50, 50000), (90, 90000), (99, 99000), (99.9, 99900)):
+        assert histogram.percentile(percent) == pytest.approx(expected, rel=tolerance)
+    assert histogram.percentile(100) == 100000
+    assert histogram.min == 1
+    assert histogram.count == 100000
+
+
+def test_small_values_are_exact_and_merge_adds_counts():
+    first = Histogram()
+    second = Histogram()
+    for value in (1, 2, 3):
+        first.record(value)
+    second.record_since(10, [9, 8])  # 1, 2
+    first.merge(second)
+    assert first.count == 5
+    assert first.percentile(50) == 2
+    assert first.buckets() == [(1, 2), (2, 2), (3, 1)]
+    assert Histogram().percentile(99) == 0
+    with pytest.raises(ValueError):
+        first.merge(Histogram(sub_bucket_bits=3))
@@ -0,0 +1,75 @@
+import socket
+import time
+
+from bench import StandInClient
+from ramp import LoadRamp
+from server import MessageQueue
+from simulator import Simulator
+from transport import SocketTransport
+
+PORT = 19861
+SLOW_PORT = 19867
+
+
+def test_generated_counts_conflated_arm_states():
+    queue = MessageQueue(policy="conflate", build_arm_frame=lambda arm_index, fields: b"")
+    for _ in range(10):
+        queue.put_arm_state(0, {"is_selected": b""}, b"")
+    assert queue.qsize() == 1
+    assert queue.conflated == 9
+    assert queue.generated == 10
+
+
+def start_ramp_simulator(port, **kwargs):
+    simulator = Simulator(queue_policy="conflate", **kwargs)
+    simulator.on_status = lambda text: None
+    simulator.start_server_thread("127.0.0.1", port)
+    deadline = time.perf_counter() + 5.0
+    while time.perf_counter() < deadline:
+        try:
+            return simulator, StandInClient("127.0.0.1", port)
+        except OSError:
+            time.sleep(0.01)
+    simulator.shutdown()
+    raise OSError("서버에 연결할 수 없습니다.")
+
+
+def test_ramp_measures_sent_messages_without_conflation():
+    """처리량은 보낸 메시지로 재고, 실행하는 동안 병합된 메시지가 처리량으로 잡히지 않아야 함"""
+    simulator, client = start_ramp_simulator(PORT)
+    try:
+        ramp = LoadRamp(simulator, start_rate=500, factor=2.0, max_rate=1000, step_duration=0.5,
+                        max_latency_ms=None, min_achieved=0.5)
+        report = ramp.run()
+        assert simulator.message_queue.policy == "conflate"
+        assert simulator.message_queue.conflated == 0
+        steps = [step for step in report["steps"] if not step["saturated"]]
+        assert steps, report["steps"]
+        assert report["sustainable_rate"] == steps[-1]["sent_rate"]
+        for step in report["steps"]:
+            assert step["conflated"] == 0
+    finally:
+        client.close()
+        simulator.shutdown()
+
+
+def test_ramp_stops_when_a_client_drops_messages():
+    """읽지 않는 클라이언트의 큐에서 메시지를 버리면 포화로 봐야 함"""
+    simulator, client = start_ramp_simulator(SLOW_PORT, client_queue_size=16,
+                                             transport=SocketTransport(send_buffer=4096))
+    stalled = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    stalled.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    stalled.connect(("127.0.0.1", SLOW_PORT))
+    try:
+        deadline = time.perf_counter() + 5.0
+        while len(simulator.server.clients) < 2 and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        ramp = LoadRamp(simulator, start_rate=8000, max_rate=8000, step_duration=0.5,
+                        max_latency_ms=None, max_queue_depth=100000, max_write_buffer=1 << 30,
+                        max_blocked_fraction=1.0, min_achieved=0.0)
+        report = ramp.run()
+        assert "dropped" in report["saturated_by"], report["steps"]
+    finally:
+        stalled.close()
+        client.close()
+        simulator.shutdown()
@@ -0,0 +1,71 @@
+import json
+
+from received_store import ReceivedStore
+
+
+def make_store(count, capacity):
+    store = ReceivedStore(capacity)
+    messages = []
+    for index in range(count):
+        if index % 3 == 0:
+            message = {"ack": index, "arm_index": index % 4}
+        else:
+            message = {"REPORT_TO_GUI": {"x": index}, "arm_index": index % 4, "v": index % 5}
+        store.add(json.dumps(message), message)
+        messages.append(message)
+    return store, messages
+
+
+def seqs(rows):
+    return [row[0] for row in rows]
+
+
+def test_where_uses_parsed_values_and_arm_index():
+    store, messages = make_store(300, 1000)
+
+    expected = [index for index, message in enumerate(messages) if message.get("v") == 3]
+    assert seqs(store.query(where={"v": 3}, limit=None, newest_first=False)) == expected
+
+    expected = [index for index, message in enumerate(messages) if message["arm_index"] == 2]
+    assert seqs(store.query(where={"arm_index": 2}, limit=None, newest_first=False)) == expected
+    assert store.query(arm_index=1, where={"arm_index": 2}) == []
+
+    expected = [index for index, message in enumerate(messages)
+                if message["arm_index"] == 1 and message.get("v") == 4]
+    assert seqs(store.query(where={"arm_index": 1, "v": 4}, limit=None, newest_first=False)) == expected
+
+    # 객체 값 조건은 원본 JSON으로 비교
+    assert seqs(store.query(where={"REPORT_TO_GUI": {"x": 7}})) == [7]
+    assert store.query(where={"missing": 1}) == []
+
+
+def test_keeps_only_the_newest_capacity_messages():
+    store, messages = make_store(230, 50)
+    assert len(store) == 50
+    assert store.oldest_seq == 180
+    assert seqs(store.query(limit=None, newest_first=False)) == list(range(180, 230))
+    assert seqs(store.query(limit=3)) == [229, 228, 227]
+    assert store.row(179) is None
+
+    expected = [index for index in range(180, 230) if "ack" in messages[index]]
+    assert seqs(store.query(message_type="ack", limit=None, newest_first=False)) == expected
+    expected = [index for index in range(180, 230) if messages[index]["arm_index"] == 3]
+    assert seqs(store.query(arm_index=3, limit=None, newest_first=False)) == expected
+
+    # 색인도 capacity 단위로 잘려 나감
+    for postings in store.by_arm.values():
+        assert len(postings) <= 2 * store.capacity
+
+
+def test_query_filters():
+    store = ReceivedStore(100)
+    store.add('{"ack": 1, "arm_index": 0}', {"ack": 1, "arm_index": 0}, timestamp=10.0)
+    store.add('{"HEARTBEAT": 1}', {"HEARTBEAT": 1}, timestamp=20.0)
+    store.add('not json', None, timestamp=30.0)
+
+    assert [row[3] for row in store.query()] == ["<invalid>", "HEARTBEAT", "ack"]
+    assert seqs(store.query(text="HEART")) == [1]
+    assert seqs(store.query(since=15.0, until=25.0)) == [1]
+    assert seqs(store.query(key="arm_index")) == [0]
+    assert store.query(arm_index=0)[0][2] == 0
+    assert store.message_types() == ["<invalid>", "HEARTBEAT", "ack"]
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+import scenario
+
+REHEARSAL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scenarios", "rehearsal.yaml")
+
+SPEC = {
+    "seed": 5,
+    "phases": [
+        {"action": "connect"},
+        {"action": "robot_configs"},
+        {"parallel": [
+            {"action": "swap_pedal", "arms": [1, 2], "rate_hz": 50, "duration_s": 1},
+            {"action": "arm_state", "arms": [3, 4], "rate_hz": 20, "duration_s": 1},
+        ]},
+        {"action": "wait", "duration_s": 0.5},
+    ],
+}
+
+
+def test_same_seed_same_frames():
+    first = scenario.compile_scenario(SPEC)
+    second = scenario.compile_scenario(SPEC)
+    assert first.digest() == second.digest()
+    assert first.frames == second.frames
+    assert first.offsets == sorted(first.offsets)
+    assert first.frames[0] is scenario.CONNECT
+    assert scenario.compile_scenario(SPEC, seed=6).digest() != first.digest()
+
+
+def test_rehearsal_file_is_reproducible():
+    pytest.importorskip("yaml")
+    assert scenario.compile_file(REHEARSAL).digest() == scenario.compile_file(REHEARSAL).digest()
+
+
+def test_invalid_phase():
+    with pytest.raises(ValueError):
+        scenario.compile_scenario({"phases": [{"action": "unknown"}]})
+    with pytest.raises(ValueError):
+        scenario.compile_scenario({"phases": [{"action": "arm_state", "arms": [9], "count": 1}]})
+
+
+def test_parallel_phases_cannot_drive_the_same_state():
+    overlapping = {"phases": [{"parallel": [
+        {"action": "swap_pedal", "arms": [1, 2], "count": 10},
+        {"action": "arm_state", "arms": [2], "states": {"is_selected": "random"}, "count": 10},
+    ]}]}
+    with pytest.raises(ValueError, match="Arm 2 is_selected"):
+        scenario.compile_scenario(overlapping)
+
+    with pytest.raises(ValueError, match="head_in"):
+        scenario.compile_scenario({"phases": [{"parallel": [
+            {"action": "headin_cycle", "count": 2},
+            {"parallel": [{"action": "headin", "value": 1}]},
+        ]}]})
+
+    # 같은 Arm이어도 다른 상태는 허용
+    scenario.compile_scenario({"phases": [{"parallel": [
+        {"action": "swap_pedal", "arms": [1, 2], "count": 10},
+        {"action": "arm_state", "arms": [2], "states": {"esu_state": "random"}, "count": 10},
+    ]}]})
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+
+from scheduler import PeriodicScheduler, sleep_until
+
+
+def test_streams_tick_at_their_interval():
+    scheduler = PeriodicScheduler()
+    ticks = {"fast": 0, "slow": 0}
+    done = threading.Event()
+
+    def tick(name):
+        ticks[name] += 1
+        if ticks["fast"] >= 50:
+            done.set()
+
+    try:
+        scheduler.add_stream("fast", 0.002, lambda: tick("fast"))
+        scheduler.add_stream("slow", 0.02, lambda: tick("slow"))
+        assert done.wait(5.0)
+        # 빠른 스트림 50회(약 0.1초) 동안 느린 스트림은 약 5회
+        assert 2 <= ticks["slow"] <= 10
+        assert set(scheduler.stats()) == {"fast", "slow"}
+    finally:
+        scheduler.stop()
+
+
+def test_removed_stream_stops_and_errors_are_reported():
+    errors = []
+    scheduler = PeriodicScheduler(on_error=lambda name, error: errors.append((name, str(error))))
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise RuntimeError("boom")
+
+    try:
+        scheduler.add_stream("fail", 0.001, fail)
+        deadline = time.perf_counter() + 5.0
+        while not errors and time.perf_counter() < deadline:
+            time.sleep(0.001)
+        assert scheduler.remove_stream("fail") is not None
+        count = len(calls)
+        time.sleep(0.02)
+        assert len(calls) <= count + 1
+        assert errors[0] == ("fail", "boom")
+        assert scheduler.remove_stream("fail") is None
+    finally:
+        scheduler.stop()
+
+
+def test_interval_must_be_positive():
+    scheduler = PeriodicScheduler()
+    with pytest.raises(ValueError):
+        scheduler.add_stream("zero", 0.0, lambda: None)
+    assert not scheduler.is_running
+
+
+def test_sleep_until_reaches_deadline():
+    deadline = time.perf_counter() + 0.005
+    sleep_until(deadline)
+    assert time.perf_counter() >= deadline
@@ -0,0 +1,194 @@
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from bench import StandInClient
+from framing import FrameDecoder, create_message_with_header
+from messages import STATE_OPTIONS, MessageCache
+from server import MessageQueue
+from simulator import Simulator
+from transport import SocketTransport
+
+PORT = 19862
+HANDLER_PORT = 19865
+SLOW_CLIENT_PORT = 19866
+
+
+def test_conflate_merges_pending_arm_state():
+    cache = MessageCache()
+    queue = MessageQueue(policy="conflate", build_arm_frame=cache.arm_state_fields_frame)
+    fragments = cache.field_fragments
+    first = {"is_selected": fragments["is_selected"][1]}
+    queue.put_arm_state(0, first, cache.arm_state_fields_frame(0, first))
+    queue.put(cache.headin_frame(1))
+    queue.put_arm_state(0, {"esu_state": fragments["esu_state"][2]}, b"")
+    queue.put_arm_state(0, {"is_selected": fragments["is_selected"][0]}, b"")
+    queue.put_arm_state(1, first, cache.arm_state_fields_frame(1, first))
+
+    merged = {"is_selected": fragments["is_selected"][0], "esu_state": fragments["esu_state"][2]}
+    assert queue.drain(10) == [
+        cache.arm_state_fields_frame(0, merged),
+        cache.headin_frame(1),
+        cache.arm_state_fields_frame(1, first),
+    ]
+    assert (queue.generated, queue.conflated) == (5, 2)
+
+    # 꺼낸 뒤의 변경은 새 메시지
+    queue.put_arm_state(0, first, cache.arm_state_fields_frame(0, first))
+    assert queue.drain(10) == [cache.arm_state_fields_frame(0, first)]
+
+
+@pytest.mark.parametrize("policy, kept", [
+    ("drop_oldest", [b"2", b"3", b"4"]),
+    ("drop_newest", [b"0", b"1", b"2"]),
+    ("conflate", [b"2", b"3", b"4"]),
+])
+def test_full_queue_drops_by_policy(policy, kept):
+    queue = MessageQueue(max_size=3, policy=policy)
+    for index in range(5):
+        queue.put(str(index).encode())
+    stamps = []
+    assert queue.drain(10, stamps) == kept
+    assert len(stamps) == 3
+    assert queue.dropped == 2
+    assert queue.max_depth == 3
+
+
+def test_concurrent_puts_keep_counters_and_capacity():
+    queue = MessageQueue(max_size=100, policy="drop_oldest")
+
+    def put_many():
+        for _ in range(20000):
+            queue.put(b"x")
+
+    threads = [threading.Thread(target=put_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert queue.generated == 80000
+    assert queue.qsize() == 100
+    assert queue.max_depth == 100
+    assert queue.dropped == 80000 - 100
+
+
+def test_unknown_queue_policy():
+    with pytest.raises(ValueError):
+        MessageQueue(policy="block")
+
+
+def wait_for_clients(simulator, count, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while len(simulator.server.clients) < count and time.perf_counter() < deadline:
+        time.sleep(0.01)
+
+
+def test_stalled_client_does_not_stall_others():
+    """기본 정책(drop_oldest)에서 읽지 않는 클라이언트가 다른 클라이언트의 수신을 막지 않아야 함"""
+    simulator = Simulator(client_queue_size=1024)
+    simulator.on_status = lambda text: None
+    simulator.start_server_thread("127.0.0.1", PORT)
+    wait_for_clients(simulator, 0)
+    time.sleep(0.2)
+
+    stalled = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    stalled.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    stalled.connect(("127.0.0.1", PORT))
+    reader = StandInClient("127.0.0.1", PORT)
+    try:
+        wait_for_clients(simulator, 2)
+        reader.wait_for(2, 5.0)  # SOCKET_ENABLE, keyframe(head_in)
+        reader.frames = 0
+
+        frame = create_message_with_header('{"pad": "' + "x" * 1000 + '"}')
+        count = 20000
+        for index in range(count):
+            simulator.message_queue.put(frame)
+            if index % 100 == 99:
+                time.sleep(0.002)
+        reader.wait_for(count, 10.0)
+        assert reader.frames == count
+    finally:
+        reader.close()
+        stalled.close()
+        simulator.shutdown()
+
+
+def test_frame_handler_error_keeps_connection():
+    """수신 메시지 처리 중 오류가 나도 연결은 유지하고 다음 메시지를 처리해야 함"""
+    simulator = Simulator()
+    simulator.on_status = lambda text: None
+    received = []
+
+    def on_frame(client, flag, payload):
+        if bytes(payload) == b'"bad"':
+            raise ValueError("처리 실패")
+        received.append(bytes(payload))
+
+    simulator.server.on_frame = on_frame
+    simulator.start_server_thread("127.0.0.1", HANDLER_PORT)
+    time.sleep(0.2)
+
+    sock = socket.create_connection(("127.0.0.1", HANDLER_PORT))
+    try:
+        wait_for_clients(simulator, 1)
+        sock.sendall(create_message_with_header('"bad"') + create_message_with_header('"good"'))
+        deadline = time.perf_counter() + 5.0
+        while not received and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        assert received == [b'"good"']
+        assert len(simulator.server.clients) == 1
+    finally:
+        sock.close()
+        simulator.shutdown()
+
+
+def test_slow_client_ends_with_the_last_sent_arm_states():
+    """밀린 클라이언트도 클라이언트 큐에서 Arm 상태를 병합하므로 마지막 전송 값과 같아져야 함"""
+    # 양쪽 소켓 버퍼를 작게 해서 클라이언트 큐가 바로 밀리도록
+    simulator = Simulator(client_queue_size=64, transport=SocketTransport(send_buffer=4096))
+    simulator.on_status = lambda text: None
+    simulator.enable_all()
+    simulator.start_server_thread("127.0.0.1", SLOW_CLIENT_PORT)
+    time.sleep(0.2)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.connect(("127.0.0.1", SLOW_CLIENT_PORT))
+    try:
+        wait_for_clients(simulator, 1)
+        for arm_indices in ([1] * 3000, [0], [1] * 3000):
+            for index, arm_index in enumerate(arm_indices):
+                simulator.send_arm_state(arm_index)
+                if index % 5 == 4:
+                    time.sleep(0.0005)  # 송신 큐에서 병합되기 전에 클라이언트 큐로 넘어가도록
+        time.sleep(0.2)
+
+        # 이제 읽기 시작해서 받은 Arm 상태를 차례로 적용
+        received = {}
+        decoder = FrameDecoder()
+        sock.settimeout(0.5)
+        while True:
+            try:
+                if not decoder.recv_from(sock):
+                    break
+            except socket.timeout:
+                break
+            for _, payload in decoder.frames():
+                message = json.loads(bytes(payload))
+                if message.get("REPORT_TO_GUI") == 0 and "robot_number" not in message:
+                    fields = received.setdefault(message["arm_index"], {})
+                    fields.update({name: value for name, value in message.items() if name in STATE_OPTIONS})
+
+        previous = simulator.states.previous_values()
+        assert received[0] == previous[0]
+        assert received[1] == previous[1]
+        client = next(iter(simulator.server.clients))
+        assert client.conflated
+        assert client.dropped == 0
+    finally:
+        sock.close()
+        simulator.shutdown()
@@ -0,0 +1,76 @@
+import threading
+
+from state_store import CHANGE, NOT_SENT, RANDOM, ArmStateStore
+
+
+def test_modes_and_enabled():
+    store = ArmStateStore(3)
+    assert store.get_mode(0, "esu_state") == "random"
+    store.set_mode(1, "esu_state", "cut")
+    store.set_mode(2, "esu_state", "change")
+    store.set_enabled(1, "esu_state", True)
+
+    assert store.get_mode(1, "esu_state") == "cut"
+    assert store.is_enabled(1, "esu_state") and not store.is_enabled(2, "esu_state")
+    assert store.arm_modes(1) == {"esu_state": "cut"}
+    assert store.arm_modes(2, enabled_only=False)["esu_state"] == "change"
+    assert store.active_arms() == [1]
+
+
+def test_version_changes_only_on_change():
+    store = ArmStateStore(2)
+    version = store.version
+    store.set_mode(0, "is_selected", "random")
+    store.set_enabled(0, "is_selected", False)
+    assert store.version == version
+    store.set_mode(0, "is_selected", "true")
+    assert store.version == version + 1
+    store.set_enabled(0, "is_selected", True)
+    assert store.version == version + 2
+
+
+def test_swap_modes():
+    store = ArmStateStore(3)
+    store.set_mode(1, "is_selected", "true")
+    store.set_mode(2, "is_selected", "false")
+    assert store.swap_modes(1, 2, "is_selected") == ("false", "true")
+    assert store.get_mode(1, "is_selected") == "false"
+
+
+def test_snapshot_is_a_copy():
+    store = ArmStateStore(2)
+    store.set_mode(0, "is_selected", "change")
+    store.record_sent(1, {"is_selected": 1})
+    version, modes, enabled, previous = store.snapshot()
+
+    field = store.field_index["is_selected"]
+    assert version == store.version
+    assert modes[field] == CHANGE and modes[store.field_count + field] == RANDOM
+    assert previous[store.field_count + field] == 1 and previous[field] == NOT_SENT
+
+    store.enable_all()
+    store.record_sent(0, {"is_selected": 0})
+    assert enabled[0] == 0 and previous[field] == NOT_SENT
+    assert store.previous_values() == {0: {"is_selected": 0}, 1: {"is_selected": 1}}
+
+
+def test_snapshot_is_consistent_with_concurrent_swaps():
+    store = ArmStateStore(2)
+    store.set_mode(0, "is_selected", "true")
+    store.set_mode(1, "is_selected", "false")
+    field = store.field_index["is_selected"]
+    running = True
+
+    def swap():
+        while running:
+            store.swap_modes(0, 1, "is_selected")
+
+    thread = threading.Thread(target=swap)
+    thread.start()
+    try:
+        for _ in range(2000):
+            _, modes, _, _ = store.snapshot()
+            assert {modes[field], modes[store.field_count + field]} == {0, 1}
+    finally:
+        running = False
+        thread.join()
@@ -0,0 +1,60 @@
+import time
+
+import numpy as np
+
+from messages import MessageCache
+from simulator import Simulator
+from timeline import FIELD_NAMES, NOT_SENT, generate
+
+
+def column(timeline, arm_index, name):
+    values = timeline.values[timeline.arms == arm_index, FIELD_NAMES.index(name)]
+    return values.tolist()
+
+
+def test_change_always_differs_from_previous():
+    timeline = generate(2000, {0: {"instrument_type": "change"}, 1: {"is_selected": "change"}}, seed=1,
+                        previous={1: {"is_selected": 0}})
+    values = column(timeline, 0, "instrument_type")
+    assert NOT_SENT not in values
+    assert all(a != b for a, b in zip(values, values[1:]))
+    values = column(timeline, 1, "is_selected")
+    assert values[:4] == [1, 0, 1, 0]
+
+
+def test_random_skips_unchanged_values():
+    timeline = generate(2000, {0: {"esu_state": "random"}}, seed=2, previous={0: {"esu_state": 1}})
+    sent = [value for value in column(timeline, 0, "esu_state") if value != NOT_SENT]
+    assert sent and sent[0] != 1
+    assert all(a != b for a, b in zip(sent, sent[1:]))
+    assert set(sent) == {0, 1, 2}
+
+
+def test_fixed_value_is_sent_once():
+    timeline = generate(100, {0: {"is_drape": "true"}}, seed=3)
+    assert column(timeline, 0, "is_drape") == [1] + [NOT_SENT] * 99
+    assert len(list(timeline.frames(MessageCache()))) == 1
+
+
+def test_same_seed_same_timeline():
+    modes = {0: {"instrument_type": "random"}, 2: {"is_clutched": "change"}}
+    first = generate(500, modes, seed=7)
+    second = generate(500, modes, seed=7)
+    assert np.array_equal(first.arms, second.arms)
+    assert np.array_equal(first.values, second.values)
+
+
+def test_timeline_steps_are_conflated():
+    simulator = Simulator(queue_policy="conflate")
+    simulator.on_status = lambda text: None
+    timeline = generate(200, {0: {"is_selected": "change", "esu_state": "random"}}, seed=4)
+    try:
+        simulator.start_timeline(timeline, 0.0001)
+        deadline = time.perf_counter() + 5.0
+        while simulator.is_auto_sending and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        assert simulator.message_queue.generated == 200
+        assert simulator.message_queue.conflated == 199
+        assert simulator.message_queue.qsize() == 1
+    finally:
+        simulator.shutdown()
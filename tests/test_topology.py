@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+import topology
+from simulator import Simulator
+from topology import Topology, robot_name
+
+
+def test_uniform():
+    arms = Topology.uniform(5, 2)
+    assert arms.num_arms == 5
+    assert [(robot.name, robot.robot_number, robot.arm_indices) for robot in arms.robots] == [
+        ("SR-A", 1, [0, 1]), ("SR-B", 2, [2, 3]), ("SR-C", 3, [4]),
+    ]
+    assert arms.robot_of(3).name == "SR-B"
+    assert robot_name(27) == "SR-27"
+
+
+def test_spec_round_trip(tmp_path):
+    spec = {"num_arms": 6, "robots": [
+        {"name": "left", "robot_number": 7, "arms": [2, 1]},
+        {"name": "SR-B", "robot_number": 2, "arms": [5]},
+    ]}
+    path = tmp_path / "topology.json"
+    path.write_text(json.dumps(spec), encoding="utf-8")
+
+    arms = topology.from_args(str(path), num_arms=32)
+    assert arms.to_spec() == spec
+    assert arms.robot("left").arm_indices == [1, 0]
+    assert arms.robot_of(3) is None and arms.robot("SR-A") is None
+    assert topology.from_args(None, 8, 4).to_spec() == Topology.uniform(8, 4).to_spec()
+
+
+@pytest.mark.parametrize("spec", [
+    {},
+    {"robots": []},
+    {"robots": [{"robot_number": 1}]},
+    {"robots": [{"robot_number": 1, "arms": [0]}]},
+    {"robots": [{"robot_number": 1, "arms": [3]}], "num_arms": 2},
+    {"robots": [{"robot_number": 1, "arms": [1]}, {"robot_number": 2, "arms": [1]}]},
+    {"robots": [{"name": "A", "robot_number": 1, "arms": [1]}, {"name": "A", "robot_number": 2, "arms": [2]}]},
+])
+def test_invalid_spec(spec):
+    with pytest.raises(ValueError):
+        Topology.from_spec(spec)
+
+
+def test_simulator_follows_topology():
+    simulator = Simulator(topology=Topology.uniform(8, 4))
+    simulator.on_status = lambda text: None
+    assert simulator.num_arms == 8 and simulator.states.num_arms == 8
+
+    simulator.send_named_robot_config("SR-B")
+    assert simulator.robot_numbers == {4: 2, 5: 2, 6: 2, 7: 2}
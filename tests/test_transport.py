@@ -0,0 +1,70 @@
+import argparse
+import os
+import socket
+import tempfile
+import time
+
+import pytest
+
+import transport
+from bench import StandInClient
+from simulator import Simulator
+from transport import HAS_UNIX, SocketTransport
+
+
+def test_label_and_describe():
+    assert SocketTransport().label() == "tcp"
+    assert SocketTransport(nodelay=False, send_buffer=4096).label() == "tcp-nagle-buf4096/0"
+    assert SocketTransport(nodelay=False).describe("127.0.0.1", 5000) == "127.0.0.1:5000, Nagle"
+    assert SocketTransport().describe("127.0.0.1", 5000) == "127.0.0.1:5000"
+    if HAS_UNIX:
+        unix = SocketTransport("unix", path="/tmp/x.sock", quickack=True)
+        assert (unix.label(), unix.describe("127.0.0.1", 5000), unix.quickack) == ("unix", "unix:/tmp/x.sock", False)
+
+
+def test_from_args():
+    parser = argparse.ArgumentParser()
+    transport.add_arguments(parser)
+    options = transport.from_args(parser.parse_args(["--nagle", "--sndbuf", "8192"])).to_dict()
+    assert options["kind"] == "tcp" and options["path"] is None
+    assert (options["nodelay"], options["send_buffer"], options["receive_buffer"]) == (False, 8192, None)
+    with pytest.raises(ValueError):
+        SocketTransport(kind="udp")
+
+
+def test_configure_sets_tcp_options():
+    server = socket.create_server(("127.0.0.1", 0))
+    try:
+        sock = SocketTransport(nodelay=False, receive_buffer=8192).connect(*server.getsockname(), timeout=5.0)
+        try:
+            assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY) == 0
+            assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF) >= 8192
+        finally:
+            sock.close()
+    finally:
+        server.close()
+
+
+@pytest.mark.skipif(not HAS_UNIX, reason="Unix 도메인 소켓 없음")
+def test_unix_socket_round_trip():
+    path = os.path.join(tempfile.mkdtemp(), "sim.sock")
+    unix = SocketTransport("unix", path=path)
+    simulator = Simulator(transport=unix)
+    simulator.on_status = lambda text: None
+    simulator.start_server_thread("127.0.0.1", 0)
+    client = None
+    try:
+        deadline = time.perf_counter() + 5.0
+        while not os.path.exists(path) and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        client = StandInClient("127.0.0.1", 0, transport=unix)
+        client.wait_for(2, 5.0)
+        assert client.frames == 2  # SOCKET_ENABLE, head_in keyframe
+        simulator.toggle_headin()
+        client.wait_for(3, 5.0)
+        assert client.frames == 3
+    finally:
+        if client:
+            client.close()
+        simulator.stop_server()
+    assert not os.path.exists(path)
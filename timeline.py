@@ -0,0 +1,118 @@
+import numpy as np
+
+from messages import STATE_OPTIONS
+
+FIELD_NAMES = list(STATE_OPTIONS)
+NOT_SENT = -1  # values 배열에서 전송하지 않는 필드 표시
+
+
+class Timeline:
+    """미리 생성한 Arm 상태 전송 순서
+
+    arms[i]는 i번째 전송의 arm_index, values[i, f]는 FIELD_NAMES[f] 필드의 값 인덱스이며
+    NOT_SENT(-1)이면 그 필드는 메시지에 넣지 않는다. 모든 필드가 NOT_SENT인 스텝은
+    자동 전송에서 변경된 상태가 없었던 경우와 같이 아무것도 보내지 않는다.
+    """
+
+    def __init__(self, arms, values, field_names=FIELD_NAMES):
+        self.arms = arms
+        self.values = values
+        self.field_names = list(field_names)
+
+    def __len__(self):
+        return len(self.arms)
+
+    def frame(self, step, cache):
+        """step번째 스텝의 프레임 (보낼 필드가 없으면 None)"""
+        row = self.values[step].tolist()
+        fragments = [
+            cache.field_fragments[name][value]
+            for name, value in zip(self.field_names, row)
+            if value != NOT_SENT
+        ]
+        if not fragments:
+            return None
+        return cache.arm_state_frame(int(self.arms[step]), fragments)
+
+    def frames(self, cache):
+        """보낼 내용이 있는 스텝의 프레임을 순서대로 반환"""
+        for step in range(len(self)):
+            frame = self.frame(step, cache)
+            if frame is not None:
+                yield frame
+
+    def save(self, path):
+        np.savez_compressed(path, arms=self.arms, values=self.values, fields=np.array(self.field_names))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["arms"], data["values"], [str(name) for name in data["fields"]])
+
+
+def modes_from_simulator(simulator):
+    """시뮬레이터의 현재 설정을 generate()의 modes 형식으로 변환"""
+    return {arm_index: simulator.states.arm_modes(arm_index) for arm_index in range(simulator.num_arms)}
+
+
+def _field_column(rng, mode, options, count, previous):
+    """한 Arm의 한 필드에 대한 count개 스텝의 값 (보내지 않는 스텝은 NOT_SENT)"""
+    value_count = len(options) - 2
+
+    if mode == "change":
+        # 매번 이전 값과 다른 값: 이전 값에 1 ~ value_count-1을 더한 나머지
+        if value_count == 1:
+            return np.zeros(count, dtype=np.int8)
+        offsets = rng.integers(1, value_count, size=count)
+        if previous is None:
+            offsets[0] = rng.integers(0, value_count)
+            start = 0
+        else:
+            start = previous
+        return ((start + np.cumsum(offsets)) % value_count).astype(np.int8)
+
+    if mode == "random":
+        # 무작위 값, 직전 값과 같으면 보내지 않음
+        drawn = rng.integers(0, value_count, size=count).astype(np.int8)
+        changed = np.empty(count, dtype=bool)
+        changed[0] = previous is None or drawn[0] != previous
+        changed[1:] = drawn[1:] != drawn[:-1]
+        return np.where(changed, drawn, NOT_SENT).astype(np.int8)
+
+    # 고정 값: 처음 한 번만 (이전 값과 다를 때) 전송
+    column = np.full(count, NOT_SENT, dtype=np.int8)
+    value = options[2:].index(mode)
+    if previous != value:
+        column[0] = value
+    return column
+
+
+def generate(steps, modes, seed=None, previous=None, arms=None):
+    """seed로 재현 가능한 자동 전송 순서를 한 번에 생성
+
+    modes는 {arm_index: {state_name: "change" | "random" | 실제 값}} 형식이며 포함되지
+    않은 필드는 보내지 않는다. 각 스텝의 Arm은 arms(기본값: 설정된 필드가 있는 Arm)에서
+    무작위로 고르고, previous({arm_index: {state_name: 값 인덱스}})가 있으면 그 값에서
+    이어서 "change"/"random" 규칙을 적용한다.
+    """
+    rng = np.random.default_rng(seed)
+    if arms is None:
+        arms = [arm_index for arm_index, fields in sorted(modes.items()) if fields]
+    if not arms:
+        raise ValueError("활성화된 상태가 있는 Arm이 없습니다.")
+
+    arm_column = rng.choice(np.asarray(arms, dtype=np.int16), size=steps)
+    values = np.full((steps, len(FIELD_NAMES)), NOT_SENT, dtype=np.int8)
+
+    for arm_index in arms:
+        rows = np.flatnonzero(arm_column == arm_index)
+        if not len(rows):
+            continue
+        arm_previous = (previous or {}).get(arm_index, {})
+        for field, name in enumerate(FIELD_NAMES):
+            mode = modes.get(arm_index, {}).get(name)
+            if mode is None:
+                continue
+            values[rows, field] = _field_column(rng, mode, STATE_OPTIONS[name], len(rows), arm_previous.get(name))
+
+    return Timeline(arm_column, values)
@@ -0,0 +1,129 @@
+"""Arm과 로봇(robot_number) 구성
+
+구성 파일(JSON) 예:
+
+    {
+      "robots": [
+        {"name": "SR-A", "robot_number": 1, "arms": [1, 2]},
+        {"name": "SR-B", "robot_number": 2, "arms": [3, 4]}
+      ]
+    }
+
+Arm 번호는 화면과 같이 1부터 시작한다. "num_arms"를 주면 어느 로봇에도 속하지 않는
+Arm을 둘 수 있고, 없으면 가장 큰 Arm 번호까지가 Arm 개수다. 구성 파일 대신
+Topology.uniform(num_arms, arms_per_robot)으로 Arm을 로봇마다 같은 개수씩 나눌 수 있다.
+"""
+import json
+
+from messages import NUM_ARMS
+
+ARMS_PER_ROBOT = 2  # 기본 구성에서 로봇 한 대의 Arm 수 (SR-A: Arm 1, 2 / SR-B: Arm 3, 4)
+
+
+def robot_name(robot_number):
+    """robot_number의 기본 이름 (1 -> SR-A, 2 -> SR-B, ..., 27 -> SR-27)"""
+    if 1 <= robot_number <= 26:
+        return f"SR-{chr(ord('A') + robot_number - 1)}"
+    return f"SR-{robot_number}"
+
+
+class Robot:
+    """로봇 한 대 (robot_number 설정 메시지를 받을 Arm 인덱스 목록)"""
+
+    def __init__(self, name, robot_number, arm_indices):
+        self.name = name
+        self.robot_number = robot_number
+        self.arm_indices = list(arm_indices)
+
+    def __repr__(self):
+        return f"Robot({self.name!r}, {self.robot_number}, {self.arm_indices})"
+
+
+class Topology:
+    """Arm 개수와 로봇별 Arm 배치"""
+
+    def __init__(self, robots, num_arms=None):
+        self.robots = list(robots)
+        arm_indices = [arm_index for robot in self.robots for arm_index in robot.arm_indices]
+        if num_arms is None:
+            num_arms = max(arm_indices, default=-1) + 1
+        if num_arms <= 0:
+            raise ValueError("Arm이 하나 이상 있어야 합니다.")
+        self.num_arms = num_arms
+
+        # arm_index -> Robot (로봇에 속하지 않은 Arm은 None)
+        self.arm_robots = [None] * num_arms
+        for robot in self.robots:
+            for arm_index in robot.arm_indices:
+                if not 0 <= arm_index < num_arms:
+                    raise ValueError(f"잘못된 Arm 번호입니다: {arm_index + 1}")
+                if self.arm_robots[arm_index] is not None:
+                    raise ValueError(f"Arm {arm_index + 1}이 여러 로봇에 속해 있습니다.")
+                self.arm_robots[arm_index] = robot
+
+        names = [robot.name for robot in self.robots]
+        if len(set(names)) != len(names):
+            raise ValueError("로봇 이름이 중복되었습니다.")
+
+    @classmethod
+    def uniform(cls, num_arms=NUM_ARMS, arms_per_robot=ARMS_PER_ROBOT):
+        """Arm을 앞에서부터 arms_per_robot개씩 robot_number 1, 2, ...에 배정"""
+        if arms_per_robot <= 0:
+            raise ValueError("arms_per_robot은 0보다 커야 합니다.")
+        robots = []
+        for start in range(0, num_arms, arms_per_robot):
+            robot_number = len(robots) + 1
+            robots.append(Robot(robot_name(robot_number), robot_number,
+                                range(start, min(start + arms_per_robot, num_arms))))
+        return cls(robots, num_arms)
+
+    @classmethod
+    def from_spec(cls, spec):
+        """구성(dict)으로 Topology 생성"""
+        if not isinstance(spec, dict) or not isinstance(spec.get("robots"), list):
+            raise ValueError("구성에는 robots 목록이 있어야 합니다.")
+        robots = []
+        for index, robot in enumerate(spec["robots"]):
+            try:
+                robot_number = int(robot["robot_number"])
+                robots.append(Robot(
+                    robot.get("name", robot_name(robot_number)),
+                    robot_number,
+                    [int(arm) - 1 for arm in robot["arms"]],
+                ))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"robots[{index}] 오류: {e}")
+        return cls(robots, spec.get("num_arms"))
+
+    def robot(self, name):
+        """이름으로 로봇 찾기 (없으면 None)"""
+        for robot in self.robots:
+            if robot.name == name:
+                return robot
+        return None
+
+    def robot_of(self, arm_index):
+        return self.arm_robots[arm_index]
+
+    def to_spec(self):
+        return {
+            "num_arms": self.num_arms,
+            "robots": [
+                {"name": robot.name, "robot_number": robot.robot_number,
+                 "arms": [arm_index + 1 for arm_index in robot.arm_indices]}
+                for robot in self.robots
+            ],
+        }
+
+
+def load(path):
+    """구성 파일(JSON) 읽기"""
+    with open(path, encoding='utf-8') as f:
+        return Topology.from_spec(json.load(f))
+
+
+def from_args(path=None, num_arms=None, arms_per_robot=None):
+    """명령행 옵션으로 Topology 생성 (구성 파일이 있으면 우선)"""
+    if path:
+        return load(path)
+    return Topology.uniform(num_arms or NUM_ARMS, arms_per_robot or ARMS_PER_ROBOT)
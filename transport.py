@@ -0,0 +1,153 @@
+"""서버 소켓 종류(TCP, Unix 도메인 소켓)와 소켓 옵션
+
+GUI가 같은 호스트에서 실행되면 Unix 도메인 소켓(--transport unix)으로 TCP/IP 스택을
+거치지 않고 연결할 수 있다. TCP는 TCP_NODELAY(기본 켜짐, 작은 REPORT_TO_GUI 프레임이
+Nagle 알고리즘으로 묶여 늦게 나가지 않도록), 송수신 버퍼 크기(SO_SNDBUF/SO_RCVBUF),
+quick-ack(TCP_QUICKACK, Linux에서만, 수신할 때마다 다시 설정)을 지정할 수 있다.
+프레임 형식은 어느 쪽이든 같다. 모드별 지연 비교는 `python bench.py --transports`.
+"""
+import os
+import socket
+import stat
+
+TRANSPORTS = ("tcp", "unix")
+DEFAULT_UNIX_PATH = "/tmp/gui_event_simulator.sock"
+
+HAS_UNIX = hasattr(socket, "AF_UNIX")
+HAS_QUICKACK = hasattr(socket, "TCP_QUICKACK")
+
+
+class SocketTransport:
+    """서버 소켓 종류와 연결마다 적용할 소켓 옵션
+
+    kind가 "unix"이면 path의 Unix 도메인 소켓에서 연결을 받고 (ip, port는 쓰지 않음),
+    "tcp"이면 ip:port에서 받는다. quickack은 지원하지 않는 플랫폼에서는 무시한다.
+    """
+
+    def __init__(self, kind="tcp", path=DEFAULT_UNIX_PATH, nodelay=True, send_buffer=None, receive_buffer=None,
+                 quickack=False):
+        if kind not in TRANSPORTS:
+            raise ValueError(f"알 수 없는 전송 방식입니다: {kind}")
+        if kind == "unix" and not HAS_UNIX:
+            raise ValueError("이 플랫폼에서는 Unix 도메인 소켓을 사용할 수 없습니다.")
+        self.kind = kind
+        self.path = path
+        self.nodelay = nodelay
+        self.send_buffer = send_buffer
+        self.receive_buffer = receive_buffer
+        self.quickack = quickack and kind == "tcp" and HAS_QUICKACK
+
+    @property
+    def is_unix(self):
+        return self.kind == "unix"
+
+    def describe(self, ip, port):
+        """상태 표시줄에 출력할 주소 문자열"""
+        if self.is_unix:
+            return f"unix:{self.path}"
+        options = [] if self.nodelay else ["Nagle"]
+        if self.quickack:
+            options.append("quickack")
+        return f"{ip}:{port}" + (f", {' '.join(options)}" if options else "")
+
+    def label(self):
+        """벤치마크 결과에 쓰는 짧은 이름 (예: tcp, tcp-nagle, tcp-quickack, unix)"""
+        if self.is_unix:
+            return "unix"
+        name = "tcp" if self.nodelay else "tcp-nagle"
+        if self.quickack:
+            name += "-quickack"
+        if self.send_buffer or self.receive_buffer:
+            name += f"-buf{self.send_buffer or 0}/{self.receive_buffer or 0}"
+        return name
+
+    # ------------------------------------------------------------ 서버
+
+    async def create_server(self, loop, protocol_factory, ip, port, backlog):
+        """asyncio 서버 생성 (Unix 소켓은 이전 실행에서 남은 소켓 파일을 지우고 만듦)"""
+        if self.is_unix:
+            self._remove_stale_socket()
+            return await loop.create_unix_server(protocol_factory, self.path, backlog=backlog)
+        return await loop.create_server(protocol_factory, ip, port, reuse_address=True, backlog=backlog)
+
+    def close_server(self):
+        """서버를 닫은 뒤 Unix 소켓 파일 삭제"""
+        if self.is_unix:
+            self._remove_stale_socket()
+
+    def _remove_stale_socket(self):
+        try:
+            if stat.S_ISSOCK(os.stat(self.path).st_mode):
+                os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def configure(self, sock):
+        """연결된 소켓에 옵션 적용 (asyncio가 기본으로 켜는 TCP_NODELAY도 설정대로 맞춤)"""
+        if sock is None:
+            return
+        if self.send_buffer:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer)
+        if self.receive_buffer:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.receive_buffer)
+        if self.is_unix:
+            return
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 if self.nodelay else 0)
+        self.rearm_quickack(sock)
+
+    def rearm_quickack(self, sock):
+        """TCP_QUICKACK은 커널이 다시 끄므로 수신할 때마다 다시 설정"""
+        if self.quickack:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+
+    # ------------------------------------------------------------ 클라이언트
+
+    def connect(self, ip, port, timeout=None):
+        """같은 방식과 옵션으로 서버에 연결한 소켓 (테스트 클라이언트, 벤치마크용)"""
+        if self.is_unix:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.settimeout(timeout)
+                sock.connect(self.path)
+                sock.settimeout(None)
+            except OSError:
+                sock.close()
+                raise
+        else:
+            sock = socket.create_connection((ip, port), timeout=timeout)
+            sock.settimeout(None)
+        self.configure(sock)
+        return sock
+
+    def to_dict(self):
+        return {
+            "kind": self.kind,
+            "path": self.path if self.is_unix else None,
+            "nodelay": self.nodelay,
+            "send_buffer": self.send_buffer,
+            "receive_buffer": self.receive_buffer,
+            "quickack": self.quickack,
+        }
+
+
+def add_arguments(parser):
+    """전송 방식과 소켓 옵션 명령행 옵션 추가 (main.py, simulator.py 공통)"""
+    parser.add_argument("--transport", choices=TRANSPORTS, default="tcp",
+                        help="tcp 또는 unix (같은 호스트의 GUI용 Unix 도메인 소켓)")
+    parser.add_argument("--unix-path", default=DEFAULT_UNIX_PATH, help="--transport unix의 소켓 파일 경로")
+    parser.add_argument("--nagle", action="store_true", help="TCP_NODELAY를 끄고 Nagle 알고리즘 사용 (비교용)")
+    parser.add_argument("--sndbuf", type=int, help="연결별 송신 버퍼 크기 (SO_SNDBUF, 바이트)")
+    parser.add_argument("--rcvbuf", type=int, help="연결별 수신 버퍼 크기 (SO_RCVBUF, 바이트)")
+    parser.add_argument("--quickack", action="store_true", help="TCP_QUICKACK 사용 (Linux)")
+
+
+def from_args(args):
+    """add_arguments()로 추가한 옵션으로 SocketTransport 생성"""
+    return SocketTransport(
+        kind=args.transport,
+        path=args.unix_path,
+        nodelay=not args.nagle,
+        send_buffer=args.sndbuf,
+        receive_buffer=args.rcvbuf,
+        quickack=args.quickack,
+    )